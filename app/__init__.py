@@ -13,11 +13,35 @@ def create_app():
                 template_folder='../templates',
                 static_folder='../static')
     
+    # Registos (antes de qualquer import que possa escrever neles)
+    from .config import LOGGING_CONFIG
+    from .utils.logs import configure_logging
+    configure_logging(LOGGING_CONFIG)
+    
     # Load configuration
     from .config import SECRET_KEY
     app.secret_key = SECRET_KEY
     app.permanent_session_lifetime = timedelta(hours=8)
     
+    # Sessões guardadas no servidor; o cookie leva apenas um identificador
+    from .config import SESSION_CONFIG
+    if SESSION_CONFIG.get('server_side', True):
+        from .utils.sessions import ServerSessionInterface, SqliteSessionStore
+        app.session_interface = ServerSessionInterface(SqliteSessionStore(
+            SESSION_CONFIG.get('db_path') or os.path.join(app.instance_path, 'mobile_sales_sessions.sqlite3'),
+            purge_interval=SESSION_CONFIG.get('purge_interval', 3600)
+        ))
+    
+    # Templates: cache de bytecode partilhada; em produção compiladas no arranque e sem auto-reload
+    from .config import TEMPLATE_CONFIG
+    from .utils.templates import configure_templates
+    configure_templates(app, TEMPLATE_CONFIG)
+    
+    # Estáticos com impressão digital (scripts/build_static.py) e cache de longa duração
+    from .config import STATIC_CONFIG
+    from .utils.assets import configure_static
+    configure_static(app, STATIC_CONFIG)
+    
     # Register blueprints
     from .routes import auth_bp, dashboard_bp, existencias_bp, pedidos_bp, cotacoes_bp, api_bp
     
@@ -28,4 +52,19 @@ def create_app():
     app.register_blueprint(cotacoes_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Invalidação de caches (o listener arranca no primeiro pedido de cada worker)
+    from .services import invalidation_bus
+    app.before_request(invalidation_bus.start)
+    
+    # Modo só de leitura enquanto a base de dados estiver indisponível
+    from .utils.degraded import block_writes, template_status
+    app.before_request(block_writes)
+    app.context_processor(template_status)
+    
+    # Compressão gzip/brotli das páginas grandes
+    from .config import COMPRESSION_CONFIG
+    if COMPRESSION_CONFIG.get('enabled', True):
+        from .utils.compression import ResponseCompressor
+        app.after_request(ResponseCompressor(COMPRESSION_CONFIG))
+    
     return app
\ No newline at end of file
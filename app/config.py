@@ -17,3 +17,147 @@ WAREHOUSE_CONFIG = {
 # Configuração Flask
 SECRET_KEY = 'chave-flask-mobile-sales'
 DEBUG = True
+
+# Configuração de Cache (segundos)
+CACHE_CONFIG = {
+    'client_list_ttl': 300,   # Lista de clientes por vendedor
+    'lab_pdf_dir': '/tmp/mobile_sales_lab_pdf',   # Cache de PDFs de laboratório
+    'sales_analytics_ttl': 600,  # Análise de vendas por (vendedor, período)
+    'db_state_ttl': 30,          # Estado da BD (BD_ESTADO) verificado no login
+    'access_scope_ttl': 900,     # Âmbito de acesso por vendedor (invalidado por Locais_Entrega / Rel_Cli_Vend2)
+    'fragment_ttl': 60,          # Fragmentos HTML (detalhes de lote) no servidor
+    'fragment_max_age': 10       # Cache-Control max-age dos fragmentos no browser
+}
+
+# Fila de trabalhos em background (PDFs, emails)
+JOBS_CONFIG = {
+    'db_path': '/tmp/mobile_sales_jobs.sqlite3',
+    'workers': 2,
+    'max_attempts': 3,
+    'retry_delay': 30,     # segundos (multiplicado pela tentativa)
+    'poll_interval': 1.0,
+    'lease': 600           # segundos; trabalho 'running' há mais tempo (worker morto) volta à fila
+}
+
+# Servidor SMTP para envio de emails
+SMTP_CONFIG = {
+    'host': 'localhost',
+    'port': 25,
+    'user': '',
+    'password': '',
+    'use_tls': False,
+    'sender': 'mobile_sales@localhost',
+    'timeout': 30
+}
+
+# Estatísticas de vendas (agregados diários/mensais por vendedor)
+STATS_CONFIG = {
+    'db_path': '/tmp/mobile_sales_stats.sqlite3',
+    'refresh_interval': 60,   # segundos entre sincronizações com o Firebird
+    'reopen_days': 2          # dias anteriores recalculados em cada sincronização
+}
+
+# Notificações em tempo real (Server-Sent Events)
+NOTIFY_CONFIG = {
+    'poll_interval': 5,          # segundos entre consultas (uma por worker, para todos os utilizadores)
+    'orders_window_days': 30,    # pedidos recentes vigiados para mudanças de estado
+    'keepalive': 15,             # segundos entre comentários keep-alive
+    # Ligações SSE por worker. Cada uma ocupa uma thread do gunicorn (gthread);
+    # None = metade das threads do worker. Acima do limite o browser usa polling
+    'max_subscribers': None
+}
+
+# Invalidação de caches por eventos Firebird (POST_EVENT) ou, em alternativa,
+# por consulta periódica dos contadores por tabela.
+# Ativar depois de correr scripts/install_invalidation_triggers.py
+INVALIDATION_CONFIG = {
+    'enabled': False,
+    'use_events': True,      # fdb event conduits
+    'use_polling': True,     # contadores (generators) se os eventos não estiverem disponíveis
+    'poll_interval': 10,     # segundos
+    'retry_delay': 30        # segundos antes de voltar a ligar após erro
+}
+
+# Pool de ligações Firebird (por processo/worker)
+# max_size é repartido por: threads de pedidos do gunicorn, threads de parallel()
+# e threads de fundo (ver executor.request_threads)
+POOL_CONFIG = {
+    'enabled': True,
+    'max_size': 16,          # ligações abertas por worker
+    'parallel_workers': 4,   # threads (e ligações) de parallel() / run_in_pool por worker
+    'acquire_timeout': 10,   # segundos à espera de uma ligação livre (e de vez em parallel())
+    'max_idle': 300,         # segundos até fechar uma ligação parada
+    'max_lifetime': 3600,    # segundos até renovar uma ligação
+    'parallel_timeout': 15   # segundos por consulta em parallel(), contados desde o início da consulta
+}
+
+# Tempo máximo (segundos) por método de repositório, "Classe.metodo"; ao exceder,
+# a instrução é cancelada no servidor e a ligação descartada. 0 = sem limite
+STATEMENT_TIMEOUT_CONFIG = {
+    'default': 0,
+    'ExistenciasRepository.search_products': 20,
+    'ExistenciasRepository.get_product_details': 20,
+    'ExistenciasRepository.get_lot_available': 10,
+    'ReservasRepository.get_reservations': 20,
+    'RequisicoesRepository.get_requisitions': 20,
+    'ClientesRepository.get_customer_dashboard_data': 20
+}
+
+# Disjuntor das ligações à base de dados: após falhas seguidas deixa de tentar
+# ligar e a aplicação passa a modo só de leitura com dados em cache
+BREAKER_CONFIG = {
+    'enabled': True,
+    'failure_threshold': 3,   # falhas de ligação seguidas até abrir
+    'reset_timeout': 30       # segundos até tentar uma nova ligação de teste
+}
+
+# Sessões no servidor (SQLite partilhado pelos workers)
+SESSION_CONFIG = {
+    'server_side': True,
+    'db_path': None,         # None = <instance>/mobile_sales_sessions.sqlite3 (criado com modo 0600)
+    'purge_interval': 3600   # segundos entre limpezas de sessões expiradas
+}
+
+# Templates Jinja: cache de bytecode partilhada pelos workers.
+# None = segue o modo debug (run.py / main.py recarregam templates; gunicorn não)
+TEMPLATE_CONFIG = {
+    'bytecode_cache_dir': '/tmp/mobile_sales_jinja',
+    'auto_reload': None,     # verificar alterações dos ficheiros em cada render
+    'precompile': None       # compilar todos os templates no arranque de cada processo
+}
+
+# Compressão das respostas e ficheiros estáticos
+COMPRESSION_CONFIG = {
+    'enabled': True,
+    'min_size': 1024,        # bytes; respostas mais pequenas seguem sem compressão
+    'gzip_level': 6,
+    'brotli_quality': 5,     # só usado se o módulo brotli estiver instalado
+    'mimetypes': ('text/html', 'text/css', 'text/plain', 'application/json', 'application/javascript',
+                  'text/javascript')
+}
+
+STATIC_CONFIG = {
+    'manifest': 'dist/manifest.json',   # gerado por scripts/build_static.py (relativo a static/)
+    'immutable_max_age': 31536000,      # ficheiros com impressão digital: um ano
+    'max_age': 3600                     # restantes ficheiros estáticos
+}
+
+# Registos (configurados em create_app)
+LOGGING_CONFIG = {
+    'sql_log': '/var/log/apache2/mobile_sales_sql.log',   # None = apenas stderr
+    'sql_level': 'INFO',
+    'format': '%(asctime)s - %(levelname)s - %(message)s'
+}
+
+# Servidor de produção (gunicorn.conf.py); workers/threads None = calculados
+SERVER_CONFIG = {
+    'bind': '0.0.0.0:8000',
+    'workers': None,             # min(2 x CPUs + 1, max_db_connections / ligações por worker)
+    'threads': None,             # None = ligações do pool que sobram de parallel() e das threads de fundo
+    'max_db_connections': 60,    # ligações ao Firebird para todos os workers
+    'max_requests': 2000,        # reciclar cada worker ao fim de N pedidos...
+    'max_requests_jitter': 200,  # ...com variação, para não reiniciarem todos ao mesmo tempo
+    'timeout': 60,
+    'graceful_timeout': 30,
+    'keepalive': 5
+}
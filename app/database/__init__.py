@@ -1,31 +1,48 @@
 """
 Database layer for Mobile Sales application
 Centralized database connection and repository access
+Repository singletons are created on first access (PEP 562 module
+__getattr__), so only the repositories a process actually uses are imported
+and built.
 """
 
+import importlib
+import threading
+
 from .connection import get_db_connection, DatabaseError
-from .repositories import (
-    AuthRepository, 
-    ExistenciasRepository, 
-    PedidosRepository, 
-    ReservasRepository,
-    RequisicoesRepository,
-    LaboratorioRepository,
-    ArtigosRepository,
-    ClientesRepository,
-    UserPreferencesRepository
-)
-
-# Initialize repository instances
-auth_repo = AuthRepository()
-existencias_repo = ExistenciasRepository()
-pedidos_repo = PedidosRepository()
-reservas_repo = ReservasRepository()
-requisicoes_repo = RequisicoesRepository()
-laboratorio_repo = LaboratorioRepository()
-artigos_repo = ArtigosRepository()
-clientes_repo = ClientesRepository()
-user_preferences_repo = UserPreferencesRepository()
+
+# Singleton name -> (module in .repositories, class)
+_REPOSITORIES = {
+    'auth_repo': ('auth', 'AuthRepository'),
+    'existencias_repo': ('existencias', 'ExistenciasRepository'),
+    'pedidos_repo': ('pedidos', 'PedidosRepository'),
+    'reservas_repo': ('reservas', 'ReservasRepository'),
+    'requisicoes_repo': ('requisicoes', 'RequisicoesRepository'),
+    'laboratorio_repo': ('laboratorio', 'LaboratorioRepository'),
+    'artigos_repo': ('artigos', 'ArtigosRepository'),
+    'clientes_repo': ('clientes', 'ClientesRepository'),
+    'user_preferences_repo': ('user_preferences', 'UserPreferencesRepository'),
+    'cotacoes_repo': ('cotacoes', 'CotacoesRepository'),
+    'lembretes_repo': ('lembretes', 'LembretesRepository'),
+    'alteracoes_repo': ('alteracoes', 'AlteracoesRepository')
+}
+_lock = threading.Lock()
+
+
+def __getattr__(name):
+    if name not in _REPOSITORIES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _lock:
+        if name not in globals():
+            module_name, class_name = _REPOSITORIES[name]
+            module = importlib.import_module(f'.repositories.{module_name}', __name__)
+            globals()[name] = getattr(module, class_name)()
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_REPOSITORIES))
+
 
 __all__ = [
     'get_db_connection',
@@ -38,5 +55,8 @@ __all__ = [
     'laboratorio_repo',
     'artigos_repo',
     'clientes_repo',
-    'user_preferences_repo'
-]
\ No newline at end of file
+    'user_preferences_repo',
+    'cotacoes_repo',
+    'lembretes_repo',
+    'alteracoes_repo'
+]
@@ -3,9 +3,10 @@ Base repository class with common database operations
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from .connection import get_db_connection, log_sql_execution, get_session_context, DatabaseError
-from ..config import WAREHOUSE_CONFIG
+from typing import Optional, List, Dict, Any, Iterator
+from .connection import (get_db_connection, log_sql_execution, get_session_context, DatabaseError,
+                         StatementTimeout, DatabaseUnavailable, statement_watchdog)
+from ..config import WAREHOUSE_CONFIG, STATEMENT_TIMEOUT_CONFIG
 
 class BaseRepository:
     """Base repository class with common database operations"""
@@ -20,23 +21,80 @@ class BaseRepository:
             self.warehouse_config.get('arm_fim', 999)
         )
     
-    def execute_query(self, sql: str, params: tuple = None, fetchall: bool = True) -> Optional[List]:
-        """Execute SELECT query and return results with proper logging"""
+    def statement_timeout(self, statement: str = None) -> float:
+        """Timeout (seconds, 0 = none) configured for a method of this repository"""
+        key = f"{type(self).__name__}.{statement}"
+        return STATEMENT_TIMEOUT_CONFIG.get(key, STATEMENT_TIMEOUT_CONFIG.get('default', 0))
+    
+    def execute_query(self, sql: str, params: tuple = None, fetchall: bool = True,
+                      statement: str = None) -> Optional[List]:
+        """Execute SELECT query and return results with proper logging
+        
+        statement names the calling method; its configured timeout cancels
+        the query on the server (StatementTimeout) when exceeded.
+        """
         conn = None
         cursor = None
+        watch = None
         try:
             start_time = datetime.now()
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            cursor.execute(sql, params or ())
-            result = cursor.fetchall() if fetchall else cursor.fetchone()
+            label = f"{type(self).__name__}.{statement or 'execute_query'}"
+            with statement_watchdog.watch(conn, self.statement_timeout(statement), label) as watch:
+                cursor.execute(sql, params or ())
+                result = cursor.fetchall() if fetchall else cursor.fetchone()
             
             execution_time = (datetime.now() - start_time).total_seconds()
             log_sql_execution(sql, params, execution_time)
             
             return result
             
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            if watch and watch.cancelled:
+                message = f"{watch.label} cancelled after {watch.timeout}s"
+                log_sql_execution(sql, params, None, message)
+                raise StatementTimeout(message)
+            log_sql_execution(sql, params, None, str(e))
+            raise DatabaseError(f"Query execution failed: {str(e)}")
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass
+            if conn:
+                try:
+                    conn.close()
+                except:
+                    pass
+    
+    def stream_query(self, sql: str, params: tuple = None, batch_size: int = 1000) -> Iterator[List]:
+        """Execute SELECT query and yield result rows in batches of batch_size"""
+        conn = None
+        cursor = None
+        try:
+            start_time = datetime.now()
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(sql, params or ())
+            row_count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                row_count += len(rows)
+                yield rows
+            
+            execution_time = (datetime.now() - start_time).total_seconds()
+            log_sql_execution(f"{sql} [{row_count} rows]", params, execution_time)
+            
+        except DatabaseError:
+            raise
         except Exception as e:
             log_sql_execution(sql, params, None, str(e))
             raise DatabaseError(f"Query execution failed: {str(e)}")
@@ -69,6 +127,8 @@ class BaseRepository:
             
             return True
             
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             if conn:
                 conn.rollback()
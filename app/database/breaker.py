@@ -0,0 +1,92 @@
+"""
+Circuit breaker for database connections
+After failure_threshold consecutive connection failures the circuit opens and
+callers fail fast instead of each waiting for the connect timeout. Once
+reset_timeout has passed a single probe is let through (half-open): success
+closes the circuit, failure opens it again.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open state machine"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_at = None
+        self._trips = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def is_degraded(self) -> bool:
+        """True while the circuit is not closed"""
+        return self.state != CLOSED
+
+    def allow(self) -> bool:
+        """May the caller try the resource now? In half-open only one probe at a time"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._probe_at = None
+                logger.info(f"Circuit {self.name} half-open, probing")
+
+            # A probe that never reported back is replaced after reset_timeout
+            if self._state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.reset_timeout):
+                self._probe_at = now
+                return True
+
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                if self._state == CLOSED:
+                    self._trips += 1
+                logger.warning(f"Circuit {self.name} open after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self._state,
+                'failures': self._failures,
+                'trips': self._trips,
+                'rejected': self._rejected
+            }
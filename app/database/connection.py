@@ -3,7 +3,6 @@ Database connection management for Mobile Sales
 Handles Firebird database connections and SQL logging
 """
 
-import fdb
 import logging
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any, Union
@@ -11,15 +10,13 @@ import re
 from datetime import datetime
 
 # Import config from parent app module
-from ..config import FIREBIRD_CONFIG, WAREHOUSE_CONFIG
+from ..config import FIREBIRD_CONFIG, WAREHOUSE_CONFIG, POOL_CONFIG, BREAKER_CONFIG
+from .breaker import CircuitBreaker, HALF_OPEN
+from .pool import ConnectionPool
+from .watchdog import StatementWatchdog
 
-# Configure SQL logger
+# SQL logger (handlers are configured in create_app, see utils.logs)
 sql_logger = logging.getLogger('mobile_sales_sql')
-sql_handler = logging.FileHandler('/var/log/apache2/mobile_sales_sql.log')
-sql_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-sql_handler.setFormatter(sql_formatter)
-sql_logger.addHandler(sql_handler)
-sql_logger.setLevel(logging.INFO)
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +24,24 @@ class DatabaseError(Exception):
     """Custom exception for database operations"""
     pass
 
+class StatementTimeout(DatabaseError):
+    """A statement exceeded its timeout and was cancelled"""
+    pass
+
+class DatabaseUnavailable(DatabaseError):
+    """The connection circuit breaker is open; no connection was attempted"""
+    pass
+
 def get_session_context():
-    """Get context information from Flask session if available"""
+    """Get context information from Flask session if available
+
+    A server-side session not yet loaded by the request is left alone, so SQL
+    logging never adds a session store read of its own.
+    """
     try:
         from flask import session
+        if not getattr(session, 'loaded', True):
+            return None
         return {
             'user': session.get('user'),
             'vendedor': session.get('vendedor'),
@@ -88,14 +99,68 @@ def log_sql_execution(sql: str, params: tuple = None, execution_time: float = No
     except Exception as e:
         logger.error(f"Failed to log SQL execution: {e}")
 
-def get_db_connection():
-    """Create and return a database connection - restored original working version"""
+connection_breaker = CircuitBreaker(
+    'firebird',
+    failure_threshold=BREAKER_CONFIG.get('failure_threshold', 3),
+    reset_timeout=BREAKER_CONFIG.get('reset_timeout', 30)
+)
+
+def create_connection():
+    """Open a new, unpooled database connection (e.g. for long-lived event listeners)"""
+    # fdb is imported on first connect, keeping it out of the startup path
+    import fdb
     try:
-        return fdb.connect(**FIREBIRD_CONFIG)
+        conn = fdb.connect(**FIREBIRD_CONFIG)
     except Exception as e:
+        connection_breaker.record_failure()
         error_msg = f"Erro na conexão à base de dados: {str(e)}"
         logger.error(error_msg)
         raise DatabaseError(error_msg)
+    connection_breaker.record_success()
+    return conn
+
+connection_pool = ConnectionPool(
+    create_connection,
+    max_size=POOL_CONFIG.get('max_size', 10),
+    acquire_timeout=POOL_CONFIG.get('acquire_timeout', 10),
+    max_idle=POOL_CONFIG.get('max_idle', 300),
+    max_lifetime=POOL_CONFIG.get('max_lifetime', 3600)
+)
+
+def cancel_statements(attachment_id):
+    """Cancel the running statements of another attachment (Firebird monitoring tables)"""
+    if attachment_id is None:
+        raise DatabaseError("Attachment id unknown, statement cannot be cancelled")
+    conn = create_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM MON$STATEMENTS WHERE MON$ATTACHMENT_ID = ? AND MON$STATE = 1",
+                       (attachment_id,))
+        conn.commit()
+        log_sql_execution(f"STATEMENTS CANCELLED [Attachment: {attachment_id}]", None)
+    finally:
+        conn.close()
+
+statement_watchdog = StatementWatchdog(cancel_statements)
+
+def get_db_connection():
+    """Return a database connection; close() gives pooled connections back to the pool
+
+    Raises DatabaseUnavailable without trying while the circuit breaker is open.
+    """
+    if BREAKER_CONFIG.get('enabled', True):
+        if not connection_breaker.allow():
+            raise DatabaseUnavailable("Base de dados indisponível, a mostrar dados guardados")
+        if connection_breaker.state == HALF_OPEN:
+            # The probe must really connect, not reuse a connection from before the outage
+            connection_pool.close_all()
+    if not POOL_CONFIG.get('enabled', True):
+        return create_connection()
+    try:
+        return connection_pool.acquire()
+    except TimeoutError as e:
+        logger.error(str(e))
+        raise DatabaseError(f"Base de dados ocupada, tente novamente: {str(e)}")
 
 @contextmanager
 def database_transaction():
@@ -0,0 +1,149 @@
+"""
+Thread pool for database calls
+Runs independent repository calls concurrently, either from plain code with
+parallel(call(...), ...) or from asyncio (run_in_pool / run_async). Every call
+borrows its own connection from the pool, so the executor threads, the request
+threads and the background threads are sized together to fit the pool.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, List
+
+from ..config import POOL_CONFIG, SERVER_CONFIG, JOBS_CONFIG, INVALIDATION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def parallel_workers() -> int:
+    """Executor threads, i.e. pool connections parallel() may hold at once"""
+    return POOL_CONFIG.get('parallel_workers', 4)
+
+
+def background_connections() -> int:
+    """Pool connections of the background threads: change feed, job workers, invalidation polling"""
+    polling = INVALIDATION_CONFIG.get('enabled') and INVALIDATION_CONFIG.get('use_polling', True)
+    return 1 + JOBS_CONFIG.get('workers', 2) + (1 if polling else 0)
+
+
+def request_threads() -> int:
+    """Request threads per worker (gunicorn threads) that fit the pool next to the others"""
+    if SERVER_CONFIG.get('threads'):
+        return SERVER_CONFIG['threads']
+    if not POOL_CONFIG.get('enabled', True):
+        return 1
+    return max(1, POOL_CONFIG.get('max_size', 10) - parallel_workers() - background_connections())
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared per-process executor with parallel_workers() threads"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=parallel_workers(), thread_name_prefix='db')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _with_context(fn: Callable) -> Callable:
+    """Carry the Flask request context (used by SQL logging) into pool threads"""
+    try:
+        from flask import has_request_context, copy_current_request_context
+        if has_request_context():
+            return copy_current_request_context(fn)
+    except ImportError:
+        pass
+    return fn
+
+
+async def run_in_pool(fn: Callable, *args, **kwargs) -> Any:
+    """Await a blocking call executed on the database thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _with_context(functools.partial(fn, *args, **kwargs)))
+
+
+_RAISE = object()
+
+
+class Call:
+    """A deferred repository call for parallel()"""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, timeout: float = None, default: Any = _RAISE):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+        self.default = default
+        self.started = threading.Event()
+        self.started_at = None
+
+    def run(self) -> Any:
+        self.started_at = time.monotonic()
+        self.started.set()
+        return self.fn(*self.args, **self.kwargs)
+
+    @property
+    def name(self) -> str:
+        return getattr(self.fn, '__qualname__', repr(self.fn))
+
+
+def call(fn: Callable, *args, timeout: float = None, default: Any = _RAISE, **kwargs) -> Call:
+    """Describe fn(*args, **kwargs) for parallel(); with default, errors and timeouts return it"""
+    return Call(fn, args, kwargs, timeout, default)
+
+
+def parallel(*calls: Call, timeout: float = None) -> List[Any]:
+    """Run calls concurrently on the pool and return their results in order
+
+    timeout (default POOL_CONFIG['parallel_timeout']) applies to calls without
+    their own and counts from the moment a call starts running; waiting for a
+    free executor thread is bounded separately by POOL_CONFIG['acquire_timeout'],
+    like waiting for a pool connection. A call that fails or times out returns
+    its default when it has one, otherwise the error is raised (TimeoutError for
+    timeouts). A timed-out query keeps running in its thread until the database
+    answers.
+    """
+    if timeout is None:
+        timeout = POOL_CONFIG.get('parallel_timeout')
+    queue_timeout = POOL_CONFIG.get('acquire_timeout', 10)
+    executor = get_executor()
+    queued = time.monotonic()
+    futures = [executor.submit(_with_context(c.run)) for c in calls]
+
+    results = []
+    for c, future in zip(calls, futures):
+        limit = c.timeout if c.timeout is not None else timeout
+        try:
+            if not c.started.wait(max(queue_timeout - (time.monotonic() - queued), 0)):
+                if future.cancel():
+                    raise FutureTimeout()
+                c.started.wait()   # picked up by a thread just now
+            remaining = None if limit is None else max(limit - (time.monotonic() - c.started_at), 0)
+            results.append(future.result(remaining))
+        except FutureTimeout:
+            future.cancel()
+            reason = f"did not finish within {limit}s" if c.started.is_set() else f"waited {queue_timeout}s to start"
+            if c.default is _RAISE:
+                raise TimeoutError(f"{c.name} {reason}")
+            logger.warning(f"{c.name} {reason}, using default")
+            results.append(c.default)
+        except Exception as e:
+            if c.default is _RAISE:
+                raise
+            logger.warning(f"{c.name} failed, using default: {e}")
+            results.append(c.default)
+    return results
+
+
+def run_async(coroutine: Awaitable) -> Any:
+    """Run a coroutine to completion from synchronous code (e.g. a Flask view)"""
+    return asyncio.run(coroutine)
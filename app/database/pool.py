@@ -0,0 +1,155 @@
+"""
+Connection pool for Mobile Sales
+Keeps open fdb connections per worker process and hands them out exclusively.
+Closing a pooled connection rolls back its open transaction and returns it to
+the pool instead of disconnecting.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """Proxy to a pooled connection; close() gives it back to the pool"""
+
+    def __init__(self, pool: 'ConnectionPool', raw, created_at: float):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._broken = False
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def discard(self):
+        """Mark the connection unusable (e.g. after a cancelled statement)"""
+        self._broken = True
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, self._created_at, self._broken)
+
+    def __del__(self):
+        # Safety net for code paths that forget to close
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded, fork-aware pool of database connections"""
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 10, acquire_timeout: float = 10,
+                 max_idle: float = 300, max_lifetime: float = 3600):
+        self.connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+
+        self._idle: List[Tuple[Any, float, float]] = []   # (raw, created_at, released_at)
+        self._size = 0
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+
+    def _check_fork(self):
+        # Connections inherited from the parent process must not be reused
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = []
+            self._size = 0
+
+    def acquire(self, timeout: float = None) -> PooledConnection:
+        """Borrow a connection; raises TimeoutError when the pool stays exhausted"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            self._check_fork()
+            while True:
+                while self._idle:
+                    raw, created_at, released_at = self._idle.pop()
+                    now = time.time()
+                    if now - released_at > self.max_idle or now - created_at > self.max_lifetime:
+                        self._close_raw(raw)
+                        continue
+                    return PooledConnection(self, raw, created_at)
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(f"Connection pool exhausted ({self.max_size} in use)")
+                self._waits += 1
+                self._cond.wait(remaining)
+
+        # Connect outside the lock; give the slot back if it fails
+        try:
+            raw = self.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw, time.time())
+
+    def release(self, raw, created_at: float, broken: bool = False):
+        """Return a connection (called by PooledConnection.close)"""
+        if not broken:
+            try:
+                raw.rollback()
+            except Exception as e:
+                logger.warning(f"Discarding pooled connection after failed rollback: {e}")
+                broken = True
+
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            if broken:
+                self._discarded += 1
+                self._close_raw(raw)
+            else:
+                self._idle.append((raw, created_at, time.time()))
+            self._cond.notify()
+
+    def _close_raw(self, raw):
+        # Called with self._cond held
+        self._size -= 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Disconnect idle connections (borrowed ones close when released)"""
+        with self._cond:
+            while self._idle:
+                raw, _, _ = self._idle.pop()
+                self._close_raw(raw)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'discarded': self._discarded
+            }
@@ -3,16 +3,32 @@ Repository classes for database operations
 Each repository handles a specific domain
 """
 
+import importlib
+
 from ..base import BaseRepository
-from .auth import AuthRepository
-from .existencias import ExistenciasRepository
-from .pedidos import PedidosRepository
-from .reservas import ReservasRepository
-from .requisicoes import RequisicoesRepository
-from .laboratorio import LaboratorioRepository
-from .artigos import ArtigosRepository
-from .clientes import ClientesRepository
-from .user_preferences import UserPreferencesRepository
+
+# Class -> module; imported on first access so one repository does not pull in all of them
+_MODULES = {
+    'AuthRepository': 'auth',
+    'ExistenciasRepository': 'existencias',
+    'PedidosRepository': 'pedidos',
+    'ReservasRepository': 'reservas',
+    'RequisicoesRepository': 'requisicoes',
+    'LaboratorioRepository': 'laboratorio',
+    'ArtigosRepository': 'artigos',
+    'ClientesRepository': 'clientes',
+    'UserPreferencesRepository': 'user_preferences',
+    'CotacoesRepository': 'cotacoes',
+    'LembretesRepository': 'lembretes',
+    'AlteracoesRepository': 'alteracoes'
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f'.{_MODULES[name]}', __name__), name)
+
 
 __all__ = [
     'BaseRepository',
@@ -24,5 +40,8 @@ __all__ = [
     'LaboratorioRepository',
     'ArtigosRepository',
     'ClientesRepository',
-    'UserPreferencesRepository'
+    'UserPreferencesRepository',
+    'CotacoesRepository',
+    'LembretesRepository',
+    'AlteracoesRepository'
 ]
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Repository for change notifications (cache invalidation)
+Triggers on the watched tables POST_EVENT a per-table event on commit and bump
+a per-table generator. Generators are non-transactional, so the polling
+fallback can read them without contending with ERP writes.
+"""
+
+from typing import Dict, List
+from ..base import BaseRepository
+from ..connection import DatabaseError
+
+# Tables whose changes invalidate in-process caches
+WATCHED_TABLES = ['Artigos', 'Locais_Entrega', 'Lotes', 'Ficha_Lab_Lote', 'Pda_Pedidos', 'Parametros_GC',
+                  'Rel_Cli_Vend2']
+
+
+def event_name(table: str) -> str:
+    """Firebird event posted by the table's trigger"""
+    return f"MS_{table.upper()}"
+
+
+def generator_name(table: str) -> str:
+    """Generator bumped by the table's trigger (polling fallback)"""
+    return f"MS_GEN_{table.upper()}"
+
+
+class AlteracoesRepository(BaseRepository):
+    """Repository for change notification triggers and counters"""
+
+    def create_schema(self, tables: List[str] = None):
+        """Create generators and AFTER INSERT/UPDATE/DELETE triggers (one-off migration)"""
+        for table in tables or WATCHED_TABLES:
+            try:
+                self.execute_command(f"CREATE GENERATOR {generator_name(table)}")
+            except DatabaseError:
+                # Generator might already exist, that's ok
+                pass
+
+            self.execute_command(f"""
+                CREATE OR ALTER TRIGGER MS_{table.upper()}_ALT FOR {table}
+                ACTIVE AFTER INSERT OR UPDATE OR DELETE POSITION 100
+                AS
+                DECLARE VARIABLE contador BIGINT;
+                BEGIN
+                    contador = GEN_ID({generator_name(table)}, 1);
+                    POST_EVENT '{event_name(table)}';
+                END
+            """)
+
+    def drop_schema(self, tables: List[str] = None):
+        """Remove the triggers (generators are left in place)"""
+        for table in tables or WATCHED_TABLES:
+            try:
+                self.execute_command(f"DROP TRIGGER MS_{table.upper()}_ALT")
+            except DatabaseError:
+                pass
+
+    def get_counters(self, tables: List[str] = None) -> Dict[str, int]:
+        """Current change counter of each table, read in one round trip"""
+        tables = tables or WATCHED_TABLES
+        columns = ', '.join(f"GEN_ID({generator_name(table)}, 0)" for table in tables)
+        result = self.execute_query(f"SELECT {columns} FROM RDB$DATABASE", fetchall=False)
+        return dict(zip(tables, result or []))
@@ -8,6 +8,11 @@ from ..base import BaseRepository
 class AuthRepository(BaseRepository):
     """Repository for authentication operations"""
     
+    def get_db_state(self) -> Optional[str]:
+        """Value of the BD_ESTADO parameter ('MANUTENCAO' while in maintenance)"""
+        result = self.execute_query("SELECT Valor FROM Parametros_GC WHERE Chave = 'BD_ESTADO'", fetchall=False)
+        return result[0] if result else None
+    
     def authenticate_user(self, utilizador: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user data"""
         sql = """
@@ -5,31 +5,54 @@ Based on legacy PHP mapabordocli functionality
 
 from typing import Optional, List, Dict
 from ..base import BaseRepository
+from ..connection import StatementTimeout
+from ..scope import AccessScope
 
 
 class ClientesRepository(BaseRepository):
     """Repository for clients operations"""
     
-    def get_clients_for_vendor(self, vendedor: int) -> List:
-        """Get clients list for vendor - Enhanced for Mapa de Bordo"""
-        # Determine access level based on vendedor
-        nivel = 0
-        if vendedor in [1, 2]:
-            nivel = 1
-        elif vendedor in [20, 88, 99]:
-            nivel = 99
-            
+    def get_portfolio_client_ids(self, vendedor: int) -> List[str]:
+        """Clients of the vendor's portfolio (own delivery sites or Rel_Cli_Vend2)"""
         sql = """
-            SELECT l.cliente, l.Nome1, c.Situacao, rc2.vendedor 
+            SELECT cliente FROM Locais_Entrega WHERE vendedor = ?
+            UNION
+            SELECT cliente FROM Rel_Cli_Vend2 WHERE vendedor = ?
+        """
+        
+        return [row[0] for row in self.execute_query(sql, (vendedor, vendedor)) or []]
+    
+    def get_clients_for_vendor(self, scope: AccessScope, all_clients: bool = None) -> List:
+        """Get (cliente, nome) pairs visible in scope - Enhanced for Mapa de Bordo
+
+        all_clients overrides scope.all_clients (the order forms use their own rule)
+        """
+        if scope.all_clients if all_clients is None else all_clients:
+            sql = """
+                SELECT DISTINCT l.cliente, l.Nome1
+                FROM Locais_Entrega l
+                JOIN clientes c ON c.cliente = l.cliente
+                WHERE c.situacao IN ( 'ACT', 'MANUT' )
+                ORDER BY l.Nome1
+            """
+            return self.execute_query(sql)
+        
+        # One indexed branch per relation instead of OR across two joins
+        sql = """
+            SELECT l.cliente, l.Nome1
             FROM Locais_Entrega l
-            LEFT OUTER JOIN clientes c ON c.cliente = l.cliente
-            LEFT OUTER JOIN Rel_Cli_Vend2 rc2 ON rc2.cliente = l.cliente
-            WHERE ( c.situacao IN ( 'ACT', 'MANUT' ) ) 
-                AND ( ( l.vendedor = ? ) OR ( rc2.vendedor = ? ) OR ( ? > 0 ) )
-            ORDER BY l.Nome1
+            JOIN clientes c ON c.cliente = l.cliente
+            WHERE l.vendedor = ? AND c.situacao IN ( 'ACT', 'MANUT' )
+            UNION
+            SELECT l.cliente, l.Nome1
+            FROM Rel_Cli_Vend2 rc2
+            JOIN Locais_Entrega l ON l.cliente = rc2.cliente
+            JOIN clientes c ON c.cliente = l.cliente
+            WHERE rc2.vendedor = ? AND c.situacao IN ( 'ACT', 'MANUT' )
+            ORDER BY 2
         """
         
-        return self.execute_query(sql, (vendedor, vendedor, nivel))
+        return self.execute_query(sql, (scope.vendedor, scope.vendedor))
     
     def get_client_info(self, cliente: str, local: str = 'SEDE') -> Optional[Dict]:
         """Get client information"""
@@ -42,14 +65,11 @@ class ClientesRepository(BaseRepository):
         result = self.execute_query(sql, (cliente, local), fetchall=False)
         return {'nome': result[0]} if result else None
     
-    def get_customer_dashboard_data(self, cliente_id: str, vendedor_id: int, data_ref: str = "NOW") -> Optional[Dict]:
-        """Get comprehensive customer dashboard data (Mapa de Bordo)"""
-        # Determine access level
-        nivel = 0
-        if vendedor_id in [1, 2]:
-            nivel = 1
-        elif vendedor_id in [20, 88, 99]:
-            nivel = 99
+    def get_customer_dashboard_data(self, cliente_id: str, scope: AccessScope, data_ref: str = "NOW") -> Optional[Dict]:
+        """Get comprehensive customer dashboard data (Mapa de Bordo) for a client in scope"""
+        # Clients outside the portfolio never reach the stored procedure
+        if not scope.can_see_client(cliente_id):
+            return None
         
         try:
             # Execute the stored procedure/function to get dashboard data
@@ -57,14 +77,12 @@ class ClientesRepository(BaseRepository):
             SELECT R_Cliente, R_Nome, R_Data, R_Plafond, R_Plafond_Ext,
                    R_Plafond_Resp, R_Obj_Vendas, R_Perc_Obj, R_Credito_Cort,
                    R_Data_Cort, R_Val_Letras, R_Val_CC, R_Val_Factoring, R_Val_PreData,
-                   R_Val_Encom, R_Vendas_Actual, R_Vendas_Ant, R_Vendedor, R_Plafond_OCDE,
-                   rc2.Vendedor
-            FROM Busca_MapaBordo_Cli(?, ?) B
-            LEFT OUTER JOIN Rel_Cli_Vend2 rc2 ON rc2.cliente = b.R_cliente
-            WHERE (R_Vendedor = ?) OR (RC2.Vendedor = ?) OR ? > 0
+                   R_Val_Encom, R_Vendas_Actual, R_Vendas_Ant, R_Vendedor, R_Plafond_OCDE
+            FROM Busca_MapaBordo_Cli(?, ?)
             """
             
-            result = self.execute_query(sql, (cliente_id, data_ref, vendedor_id, vendedor_id, nivel), fetchall=False)
+            result = self.execute_query(sql, (cliente_id, data_ref), fetchall=False,
+                                        statement='get_customer_dashboard_data')
             
             if not result:
                 return None
@@ -107,6 +125,8 @@ class ClientesRepository(BaseRepository):
             
             return dashboard_data
             
+        except StatementTimeout:
+            raise
         except Exception as e:
             return None
 
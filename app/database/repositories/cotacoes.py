@@ -0,0 +1,206 @@
+"""
+Repository for quotations (Cotacoes) operations
+Quotation totals and item counts are maintained incrementally: every item
+insert/delete applies its delta to Cotacoes.Valor_Total / Cotacoes.Num_Itens
+in the same transaction.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..base import BaseRepository
+from ..connection import database_transaction, log_sql_execution, DatabaseError
+
+
+class CotacoesRepository(BaseRepository):
+    """Repository for quotations operations"""
+    
+    LIST_COLUMNS = ['ID', 'CLIENTE', 'NOME_CLIENTE', 'DATA_CRIACAO', 'DATA_VALIDADE',
+                    'STATUS', 'VALOR_TOTAL', 'OBSERVACOES', 'NUM_ITENS']
+
+    NULL_CURSOR = 'null'
+
+    @classmethod
+    def encode_cursor(cls, row: Dict[str, Any]) -> str:
+        """Keyset cursor for the row after which the next page starts"""
+        data_criacao = row['DATA_CRIACAO']
+        return f"{data_criacao.isoformat() if data_criacao else cls.NULL_CURSOR}_{row['ID']}"
+
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> Optional[Tuple[Optional[datetime], int]]:
+        try:
+            data_criacao, cotacao_id = cursor.rsplit('_', 1)
+            if data_criacao == cls.NULL_CURSOR:
+                return None, int(cotacao_id)
+            return datetime.fromisoformat(data_criacao), int(cotacao_id)
+        except (AttributeError, ValueError):
+            return None
+
+    def list_for_vendor(self, vendedor: int, status: str = None, antes: str = None,
+                        limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One keyset page of the vendor's quotations, newest first; returns (rows, next_cursor)"""
+        conditions = ["Vendedor = ?"]
+        params = [vendedor]
+
+        if status:
+            conditions.append("Status = ?")
+            params.append(status)
+
+        # Quotations without Data_Criacao come last (NULLS LAST), ordered by Id
+        position = self.decode_cursor(antes) if antes else None
+        if position and position[0] is None:
+            conditions.append("Data_Criacao IS NULL AND Id < ?")
+            params.append(position[1])
+        elif position:
+            conditions.append("(Data_Criacao < ? OR (Data_Criacao = ? AND Id < ?) OR Data_Criacao IS NULL)")
+            params.extend([position[0], position[0], position[1]])
+
+        # Fetch one extra row to know whether there is a next page
+        sql = f"""
+            SELECT FIRST {int(limit) + 1}
+                   Id, Cliente, Nome_Cliente, Data_Criacao, Data_Validade,
+                   Status, Valor_Total, Observacoes, Num_Itens
+            FROM Cotacoes
+            WHERE {' AND '.join(conditions)}
+            ORDER BY Data_Criacao DESC NULLS LAST, Id DESC
+        """
+
+        rows = [dict(zip(self.LIST_COLUMNS, row)) for row in self.execute_query(sql, tuple(params)) or []]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1])
+
+        return rows, next_cursor
+
+    def create_list_columns(self):
+        """Add/backfill Cotacoes.Num_Itens and the list index (one-off migration)"""
+        try:
+            self.execute_command("ALTER TABLE Cotacoes ADD Num_Itens INTEGER DEFAULT 0")
+        except DatabaseError:
+            # Column might already exist, that's ok
+            pass
+
+        self.execute_command("""
+            UPDATE Cotacoes c
+            SET Num_Itens = (SELECT COUNT(*) FROM Cotacoes_Itens ci WHERE ci.Cotacao_Id = c.Id)
+        """)
+
+        try:
+            self.execute_command("""
+                CREATE DESCENDING INDEX IX_Cotacoes_Vend_Data
+                ON Cotacoes (Vendedor, Data_Criacao, Id)
+            """)
+        except DatabaseError:
+            # Index might already exist, that's ok
+            pass
+
+    def _execute(self, cursor, sql: str, params: tuple = None):
+        """Execute inside an open transaction with SQL logging"""
+        start_time = datetime.now()
+        try:
+            cursor.execute(sql, params or ())
+        except Exception as e:
+            log_sql_execution(sql, params, None, str(e))
+            raise
+        log_sql_execution(sql, params, (datetime.now() - start_time).total_seconds())
+
+    def add_items(self, cotacao_id: int, itens: List[Dict[str, Any]], vendedor: int) -> float:
+        """Insert items and add their value to the quotation total; returns the delta"""
+        rows = []
+        delta = 0.0
+        for item in itens:
+            quantidade = float(item.get('quantidade', 0) or 0)
+            preco = float(item.get('preco', 0) or 0)
+            valor_total = quantidade * preco
+            delta += valor_total
+            rows.append((cotacao_id, item.get('codigo'), item.get('descricao'), item.get('lote'),
+                         quantidade, preco, valor_total, item.get('observacoes', '')))
+
+        if not rows:
+            return 0.0
+
+        insert_sql = """
+            INSERT INTO Cotacoes_Itens (Cotacao_Id, Codigo, Descricao, Lote,
+                                      Quantidade, Preco_Unitario, Valor_Total, Observacoes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        update_sql = """
+            UPDATE Cotacoes
+            SET Valor_Total = COALESCE(Valor_Total, 0) + ?,
+                Num_Itens = COALESCE(Num_Itens, 0) + ?
+            WHERE Id = ? AND Vendedor = ?
+        """
+
+        with database_transaction() as conn:
+            cursor = conn.cursor()
+            self._execute(cursor, update_sql, (delta, len(rows), cotacao_id, vendedor))
+            if cursor.rowcount == 0:
+                raise DatabaseError('Cotação não encontrada')
+
+            start_time = datetime.now()
+            cursor.executemany(insert_sql, rows)
+            log_sql_execution(f"{insert_sql} [x{len(rows)}]", rows[0], (datetime.now() - start_time).total_seconds())
+            cursor.close()
+
+        return delta
+
+    def remove_item(self, item_id: int, vendedor: int) -> bool:
+        """Delete an item and subtract its value from the quotation total"""
+        with database_transaction() as conn:
+            cursor = conn.cursor()
+            self._execute(cursor, """
+                SELECT ci.Cotacao_Id, ci.Valor_Total
+                FROM Cotacoes_Itens ci
+                JOIN Cotacoes c ON c.Id = ci.Cotacao_Id
+                WHERE ci.Id = ? AND c.Vendedor = ?
+            """, (item_id, vendedor))
+            result = cursor.fetchone()
+
+            if not result:
+                cursor.close()
+                return False
+
+            cotacao_id, valor_item = result
+            self._execute(cursor, "DELETE FROM Cotacoes_Itens WHERE Id = ?", (item_id,))
+            self._execute(cursor, """
+                UPDATE Cotacoes
+                SET Valor_Total = COALESCE(Valor_Total, 0) - ?,
+                    Num_Itens = COALESCE(Num_Itens, 0) - 1
+                WHERE Id = ?
+            """, (valor_item or 0, cotacao_id))
+            cursor.close()
+
+        return True
+
+    def check_totals(self, fix: bool = True) -> List[Dict[str, Any]]:
+        """Find quotations whose stored total/count drifted from their items (optionally repair)"""
+        sql = """
+            SELECT c.Id, COALESCE(c.Valor_Total, 0), COALESCE(SUM(ci.Valor_Total), 0),
+                   COALESCE(c.Num_Itens, 0), COUNT(ci.Id)
+            FROM Cotacoes c
+            LEFT JOIN Cotacoes_Itens ci ON ci.Cotacao_Id = c.Id
+            GROUP BY c.Id, c.Valor_Total, c.Num_Itens
+            HAVING ABS(COALESCE(c.Valor_Total, 0) - COALESCE(SUM(ci.Valor_Total), 0)) > 0.005
+                OR COALESCE(c.Num_Itens, 0) <> COUNT(ci.Id)
+        """
+
+        mismatches = [
+            {'id': row[0], 'stored': float(row[1]), 'actual': float(row[2]),
+             'stored_itens': row[3], 'actual_itens': row[4]}
+            for row in self.execute_query(sql) or []
+        ]
+
+        if fix:
+            # Recompute inside the UPDATE so items written since the check are counted
+            for mismatch in mismatches:
+                self.execute_command("""
+                    UPDATE Cotacoes c
+                    SET Valor_Total = (SELECT COALESCE(SUM(ci.Valor_Total), 0)
+                                       FROM Cotacoes_Itens ci WHERE ci.Cotacao_Id = c.Id),
+                        Num_Itens = (SELECT COUNT(*)
+                                     FROM Cotacoes_Itens ci WHERE ci.Cotacao_Id = c.Id)
+                    WHERE c.Id = ?
+                """, (mismatch['id'],))
+
+        return mismatches
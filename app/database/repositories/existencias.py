@@ -27,7 +27,7 @@ class ExistenciasRepository(BaseRepository):
         codigo_fim = codigo_artigo + 'z'
         params = (codigo_artigo, codigo_fim, arm_ini, arm_fim, enc_forn, codigo_artigo)
         
-        return self.execute_query(sql, params)
+        return self.execute_query(sql, params, statement='search_products')
     
     def get_product_details(self, codigo: str, enc_forn: str = 'S') -> List:
         """Get detailed product information by lot"""
@@ -43,7 +43,42 @@ class ExistenciasRepository(BaseRepository):
         """
         
         params = (codigo, codigo, arm_ini, arm_fim, enc_forn)
-        return self.execute_query(sql, params)
+        return self.execute_query(sql, params, statement='get_product_details')
+    
+    @staticmethod
+    def _map_lab_results(result) -> Dict:
+        """Format a Ficha_Lab_Lote row as in PHP"""
+        tipo_processo = result[18] if len(result) > 18 else None
+        pf_index = 3 if tipo_processo == "O" else 3
+        pg_index = 4 if tipo_processo == "O" else 4
+        np_index = 17 if tipo_processo == "O" else 5
+        
+        return {
+            'pf': result[pf_index],
+            'pg': result[pg_index], 
+            'np': result[np_index],
+            'rk': result[6]  # Rkm_Valor
+        }
+    
+    def get_lab_results_by_lot(self, codigo: str) -> Dict[str, Dict]:
+        """Latest laboratory results of every lot of a product, keyed by stripped lot (one query)"""
+        sql = """
+            SELECT L.Ne_Valor, L.Ne_Cv, L.Uster_CVM, L.Uster_PNTFinos2, L.Uster_PNTGrossos2, L.Uster_Neps_2,
+                   L.Rkm_Valor, L.Rkm_Cv, L.Rkm_Along_Valor, L.Rkm_Along_Cv, L.Tipo_Torcao, L.Torcao_TPI_Valor, L.Tipo_Torcao_S,
+                   L.Torcao_TPI_Valor_S, T.Nr_Fios, L.Uster_Pilosidade, L.Uster_Pilosidade_Cv, L.Uster_Neps_3, L.Tipo_Processo,
+                   L.Lote
+            FROM Ficha_Lab_Lote L 
+            LEFT OUTER JOIN Tipo_Torcedura T ON T.Tipo = L.Tipo_Torcedura 
+            WHERE L.Codigo = ? 
+            ORDER BY L.Lote, L.nr_relatorio DESC
+        """
+        
+        results = {}
+        for row in self.execute_query(sql, (codigo,)) or []:
+            # First row of each lot is its latest report
+            results.setdefault((row[19] or '').strip(), self._map_lab_results(row[:19]))
+        
+        return results
     
     def get_lab_results(self, codigo: str, lote: str) -> Optional[Dict]:
         """Get laboratory results for product lot"""
@@ -60,17 +95,58 @@ class ExistenciasRepository(BaseRepository):
         result = self.execute_query(sql, (codigo, lote), fetchall=False)
         
         if result:
-            # Format results as in PHP
-            tipo_processo = result[18] if len(result) > 18 else None
-            pf_index = 3 if tipo_processo == "O" else 3
-            pg_index = 4 if tipo_processo == "O" else 4
-            np_index = 17 if tipo_processo == "O" else 5
-            
-            return {
-                'pf': result[pf_index],
-                'pg': result[pg_index], 
-                'np': result[np_index],
-                'rk': result[6]  # Rkm_Valor
-            }
-        
-        return None
\ No newline at end of file
+            return self._map_lab_results(result)
+        
+        return None
+
+    def get_lot_available(self, codigo: str, lote: str, enc_forn: str = 'S', warehouses: tuple = None) -> float:
+        """Available stock of one lot (0 when none); warehouses overrides the (arm_ini, arm_fim) range"""
+        arm_ini, arm_fim = warehouses or self.get_warehouse_params()
+        
+        sql = """
+            SELECT (RExist - REncCli + REncFor) as RStkDisp 
+            FROM Inq_Exist_Lote_Pda_2(?, ?, ?, ?, 'ACT', 0, '31.12.3000', ?, '31.12.3000', 0, 'S', 1, 2, 2)
+            WHERE RLote = ?
+        """
+        
+        result = self.execute_query(sql, (codigo, codigo, arm_ini, arm_fim, enc_forn, lote), fetchall=False,
+                                    statement='get_lot_available')
+        
+        if result and result[0] and result[0] > 0:
+            return result[0]
+        
+        return 0
+    
+    def get_code_table_values(self, posicao: int) -> List:
+        """Values of the article code table at a code position (Forma_Codigo)"""
+        sql = """
+            SELECT CTV.Valor, CTV.Descricao, CTV.ID
+            FROM Forma_Codigo FC
+            LEFT OUTER JOIN codigo_tabelas CT ON CT.ID = FC.Tab_Ref
+            LEFT OUTER JOIN codigo_tab_valores CTV ON CTV.Tab_ID = CT.ID AND CTV.Activo = 1
+            WHERE FC.Posicao = ?
+            ORDER BY CTV.Descricao
+        """
+        
+        return self.execute_query(sql, (posicao,))
+    
+    def get_compositions(self) -> List:
+        """Compositions listed in the stock search filters"""
+        sql = """
+            SELECT CodArt, Desc_Pda, Composicao 
+            FROM Rel_Comp_CodArt 
+            WHERE Char_Length(Trim(Desc_Pda)) > 2 AND listar = 'S' 
+            ORDER BY Desc_Pda
+        """
+        
+        return self.execute_query(sql)
+    
+    def get_process_types(self) -> List:
+        """Process types (Tipo_Processo)"""
+        sql = """
+            SELECT Tipo, Descricao 
+            FROM Tipo_Processo 
+            ORDER BY Descricao
+        """
+        
+        return self.execute_query(sql)
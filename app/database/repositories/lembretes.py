@@ -0,0 +1,107 @@
+"""
+Repository for reminders (Lembretes) operations
+Unread reminders are read incrementally: clients keep a (Dt_Registo, Msg_id)
+cursor and only fetch messages registered after it.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..base import BaseRepository
+from ..connection import database_transaction, log_sql_execution
+
+
+class LembretesRepository(BaseRepository):
+    """Repository for reminders operations"""
+
+    COLUMNS = ['MSG_ID', 'MENSAGEM', 'REMETENTE', 'NOME_REMETENTE', 'RECIBO_LEITURA',
+               'TIPO_MSG', 'NPEDIDO', 'DT_REGISTO']
+
+    # Firebird limits IN lists, mark read in chunks
+    MARK_CHUNK = 500
+
+    @staticmethod
+    def encode_cursor(row: Dict[str, Any]) -> str:
+        """Cursor pointing at a reminder (the newest one the client has seen)"""
+        return f"{row['DT_REGISTO'].isoformat()}_{row['MSG_ID']}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+        try:
+            dt_registo, msg_id = cursor.rsplit('_', 1)
+            return datetime.fromisoformat(dt_registo), int(msg_id)
+        except (AttributeError, ValueError):
+            return None
+
+    def get_unread_ids(self, utilizador: str) -> List[int]:
+        """Ids of the user's unprocessed reminders (cheap state check for polling)"""
+        sql = """
+            SELECT Msg_id
+            FROM Lembretes
+            WHERE destinatario = ? AND Processado = 'N'
+        """
+
+        return sorted(row[0] for row in self.execute_query(sql, (utilizador,)) or [])
+
+    def get_last_id(self) -> int:
+        """Highest reminder id (starting watermark for the change feed)"""
+        result = self.execute_query("SELECT MAX(Msg_id) FROM Lembretes", fetchall=False)
+        return (result[0] if result else None) or 0
+
+    def get_new_since(self, msg_id: int) -> List[Tuple[int, str]]:
+        """(Msg_id, destinatario) of unprocessed reminders created after msg_id, for all users"""
+        sql = """
+            SELECT Msg_id, destinatario
+            FROM Lembretes
+            WHERE Msg_id > ? AND Processado = 'N'
+            ORDER BY Msg_id
+        """
+
+        return self.execute_query(sql, (msg_id,)) or []
+
+    def get_unread(self, utilizador: str, depois: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Unprocessed reminders newest first, only those after the cursor when given"""
+        conditions = ["L.destinatario = ?", "L.Processado = 'N'"]
+        params = [utilizador]
+
+        position = self.decode_cursor(depois) if depois else None
+        if position:
+            conditions.append("(L.Dt_Registo > ? OR (L.Dt_Registo = ? AND L.Msg_id > ?))")
+            params.extend([position[0], position[0], position[1]])
+
+        sql = f"""
+            SELECT FIRST {int(limit)}
+                   L.Msg_id, L.Mensagem, L.Remetente, U.Descricao, L.recibo_leitura,
+                   L.Tipo_Msg, L.NPedido, L.Dt_Registo
+            FROM Lembretes L
+            LEFT OUTER JOIN Utilizadores_GC U ON U.Utilizador = L.Remetente
+            WHERE {' AND '.join(conditions)}
+            ORDER BY L.Dt_Registo DESC, L.Msg_id DESC
+        """
+
+        return [dict(zip(self.COLUMNS, row)) for row in self.execute_query(sql, tuple(params)) or []]
+
+    def mark_read(self, utilizador: str, msg_ids: List[int]) -> int:
+        """Mark several reminders as processed in one transaction; returns rows updated"""
+        msg_ids = sorted({int(msg_id) for msg_id in msg_ids})
+        if not msg_ids:
+            return 0
+
+        updated = 0
+        with database_transaction() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(msg_ids), self.MARK_CHUNK):
+                chunk = msg_ids[i:i + self.MARK_CHUNK]
+                sql = f"""
+                    UPDATE Lembretes
+                    SET Processado = 'S', Dt_Processado = CURRENT_TIMESTAMP
+                    WHERE destinatario = ? AND Processado = 'N'
+                    AND Msg_id IN ({', '.join('?' * len(chunk))})
+                """
+                params = (utilizador, *chunk)
+                start_time = datetime.now()
+                cursor.execute(sql, params)
+                log_sql_execution(sql, params, (datetime.now() - start_time).total_seconds())
+                updated += max(cursor.rowcount, 0)
+            cursor.close()
+
+        return updated
@@ -2,30 +2,84 @@
 Repository for orders operations
 """
 
-from typing import Optional, List, Dict, Any
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterator
 from ..base import BaseRepository
+from ..scope import AccessScope
 from ...config import FIREBIRD_CONFIG
 
 
 class PedidosRepository(BaseRepository):
     """Repository for orders operations"""
     
-    def get_orders_list(self, vendedor: int) -> List:
-        """Get orders list for vendor"""
-        sql = """
+    def get_orders_list(self, scope: AccessScope) -> List:
+        """Get the latest orders visible in scope"""
+        # Plain equality (or no predicate at all) keeps the Vendedor index usable
+        where = "" if scope.all_orders else "WHERE P.Vendedor = ?"
+        params = () if scope.all_orders else (scope.vendedor,)
+        
+        sql = f"""
             SELECT FIRST 100
                 P.Pedido, P.Quantidade, P.Preco, P.Lote, A.Descricao, 
                 C.Nome1 as Cliente, P.Estado, P.Dt_Registo
             FROM Pda_Pedidos P 
             LEFT OUTER JOIN Artigos A ON A.Codigo = P.Codigo 
             LEFT OUTER JOIN Locais_Entrega C ON C.Cliente = P.Cliente AND C.local_id = 'SEDE'
-            WHERE ( ( P.Vendedor = ? ) OR ( ? = 1 ) OR ( ? = 99 ) )
+            {where}
             ORDER BY P.Dt_Registo DESC, P.Pedido DESC
         """
         
-        return self.execute_query(sql, (vendedor, vendedor, vendedor))
+        return self.execute_query(sql, params)
+    
+    def get_daily_totals(self, vendedor: int, desde: Optional[datetime] = None,
+                         ate: Optional[datetime] = None) -> List:
+        """Order count and value per day for vendor in the half-open range [desde, ate)"""
+        conditions = ["Vendedor = ?"]
+        params = [vendedor]
+        
+        # Plain range predicates on Dt_Registo so the (Vendedor, Dt_Registo) index is usable
+        if desde is not None:
+            conditions.append("Dt_Registo >= ?")
+            params.append(desde)
+        if ate is not None:
+            conditions.append("Dt_Registo < ?")
+            params.append(ate)
+        
+        sql = f"""
+            SELECT CAST(Dt_Registo AS DATE), COUNT(*), SUM(Quantidade * Preco)
+            FROM Pda_Pedidos
+            WHERE {' AND '.join(conditions)}
+            GROUP BY 1
+        """
+        
+        return self.execute_query(sql, tuple(params)) or []
+    
+    def get_recent_states(self, desde: datetime) -> List:
+        """(Pedido, Vendedor, Estado) of every order registered since desde, for all vendors"""
+        sql = """
+            SELECT Pedido, Vendedor, Estado
+            FROM Pda_Pedidos
+            WHERE Dt_Registo >= ?
+        """
+        
+        return self.execute_query(sql, (desde,)) or []
+    
+    def iter_order_lines(self, vendedor: int, desde: datetime, ate: datetime,
+                         batch_size: int = 1000) -> Iterator[List]:
+        """Stream non-cancelled order lines for vendor in [desde, ate), in batches"""
+        sql = """
+            SELECT P.Dt_Registo, P.Cliente, C.Nome1, P.Codigo, A.Descricao, P.Quantidade, P.Preco
+            FROM Pda_Pedidos P
+            LEFT OUTER JOIN Artigos A ON A.Codigo = P.Codigo
+            LEFT OUTER JOIN Locais_Entrega C ON C.Cliente = P.Cliente AND C.local_id = 'SEDE'
+            WHERE P.Vendedor = ?
+            AND P.Dt_Registo >= ? AND P.Dt_Registo < ?
+            AND COALESCE(P.Estado, '') <> 'C'
+        """
+        
+        return self.stream_query(sql, (vendedor, desde, ate), batch_size)
     
-    def cancel_order(self, pedido_num: int, vendedor: int) -> Dict[str, Any]:
+    def cancel_order(self, pedido_num: int, scope: AccessScope) -> Dict[str, Any]:
         """Cancel an order"""
         # Check if order exists and permissions
         check_sql = """
@@ -42,7 +96,7 @@ class PedidosRepository(BaseRepository):
         estado_atual, vendedor_pedido = order_data
         
         # Check permissions
-        if not ((vendedor_pedido == vendedor) or (vendedor in [1, 99])):
+        if not scope.can_manage_order(vendedor_pedido):
             return {'success': False, 'error': 'Sem permissões para anular este pedido'}
         
         # Check if already cancelled/finished
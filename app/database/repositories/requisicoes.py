@@ -24,7 +24,7 @@ class RequisicoesRepository(BaseRepository):
             ORDER BY ROrdemSitua, RDataEnt
         """
         
-        requisitions_raw = self.execute_query(sql, (codigo, lote, fornecedor_int))
+        requisitions_raw = self.execute_query(sql, (codigo, lote, fornecedor_int), statement='get_requisitions')
         
         # Filter out entries with quantity <= 0 (similar to original PHP logic)
         requisitions_filtered = []
@@ -4,13 +4,14 @@ Repository for client reservations operations
 
 from typing import List
 from ..base import BaseRepository
+from ..scope import AccessScope
 
 
 class ReservasRepository(BaseRepository):
     """Repository for client reservations operations"""
     
-    def get_reservations(self, codigo: str, lote: str, fornecedor: str = '', vendedor: int = 0) -> List:
-        """Get client reservations for product/lot"""
+    def get_reservations(self, codigo: str, lote: str, fornecedor: str, scope: AccessScope) -> List:
+        """Get client reservations for product/lot visible in scope"""
         arm_ini, arm_fim = self.get_warehouse_params()
         
         try:
@@ -27,7 +28,8 @@ class ReservasRepository(BaseRepository):
             LEFT OUTER JOIN Artigos A ON A.Codigo = I.RCodigo
         """
         
-        reservas_raw = self.execute_query(sql, (codigo, lote, arm_ini, arm_fim, fornecedor_int))
+        reservas_raw = self.execute_query(sql, (codigo, lote, arm_ini, arm_fim, fornecedor_int),
+                                          statement='get_reservations')
         
         # Apply filters like PHP original
         reservas_filtradas = []
@@ -38,7 +40,7 @@ class ReservasRepository(BaseRepository):
             quant_falta = quant_pedida - quant_entregue
             
             # Filter: authorized vendor AND quantity pending > 0.1
-            if ((vendedor_reserva == vendedor) or (vendedor in [1, 2, 99])) and (quant_falta > 0.1):
+            if scope.can_see_reservation(vendedor_reserva) and (quant_falta > 0.1):
                 reservas_filtradas.append(reserva)
         
         return reservas_filtradas
\ No newline at end of file
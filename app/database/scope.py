@@ -0,0 +1,55 @@
+"""
+Access scope of a logged-in vendor
+Built once at login (see services.access) and passed to the repositories, so
+the vendor rules live in one place and each query can use the SQL variant that
+fits the scope: no vendor predicate for the broad scopes, a plain indexed
+equality or the precomputed client portfolio for the restricted ones.
+"""
+
+from typing import FrozenSet, Iterable
+
+# Vendors that see and manage every order
+ORDERS_ALL = (1, 99)
+# Vendors that see every client reservation
+RESERVATIONS_ALL = (1, 2, 99)
+# Client access level by vendor (0 = own portfolio only)
+CLIENT_LEVELS = {1: 1, 2: 1, 20: 99, 88: 99, 99: 99}
+# Vendors that may pick any client in the order and quotation forms
+ORDER_CLIENTS_ALL = (1,)
+
+
+class AccessScope:
+    """What a vendor may see; clientes holds the portfolio when not all_clients"""
+
+    __slots__ = ('vendedor', 'nivel', 'all_orders', 'all_reservations', 'all_order_clients', 'clientes')
+
+    def __init__(self, vendedor: int, nivel: int = 0, all_orders: bool = False,
+                 all_reservations: bool = False, all_order_clients: bool = False, clientes: Iterable[str] = ()):
+        self.vendedor = vendedor
+        self.nivel = nivel
+        self.all_orders = all_orders
+        self.all_reservations = all_reservations
+        self.all_order_clients = all_order_clients
+        self.clientes: FrozenSet[str] = frozenset(str(cliente).strip() for cliente in clientes)
+
+    @classmethod
+    def for_vendor(cls, vendedor: int, clientes: Iterable[str] = ()) -> 'AccessScope':
+        return cls(vendedor,
+                   nivel=CLIENT_LEVELS.get(vendedor, 0),
+                   all_orders=vendedor in ORDERS_ALL,
+                   all_reservations=vendedor in RESERVATIONS_ALL,
+                   all_order_clients=vendedor in ORDER_CLIENTS_ALL,
+                   clientes=clientes)
+
+    @property
+    def all_clients(self) -> bool:
+        return self.nivel > 0
+
+    def can_see_client(self, cliente) -> bool:
+        return self.all_clients or str(cliente).strip() in self.clientes
+
+    def can_manage_order(self, vendedor_pedido: int) -> bool:
+        return self.all_orders or vendedor_pedido == self.vendedor
+
+    def can_see_reservation(self, vendedor_reserva: int) -> bool:
+        return self.all_reservations or vendedor_reserva == self.vendedor
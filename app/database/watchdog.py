@@ -0,0 +1,123 @@
+"""
+Statement watchdog for Mobile Sales
+One thread per worker process tracks the deadline of every watched statement.
+When a statement overruns, its connection is marked unusable (so the pool
+disconnects it on release) and the statement is cancelled on the server from
+a separate attachment.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class Watch:
+    """One watched statement"""
+
+    def __init__(self, conn, label: str, timeout: float):
+        self.conn = conn
+        self.label = label
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+        self.done = False
+        self.cancelled = False
+
+
+class StatementWatchdog:
+    """Cancels statements that run longer than their timeout"""
+
+    def __init__(self, cancel: Callable[[Any], None]):
+        # cancel(attachment_id) stops the attachment's running statements
+        self.cancel = cancel
+
+        self._heap: List[tuple] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+        self._timeouts: Dict[str, int] = {}
+        self._cancel_failures = 0
+
+    @contextmanager
+    def watch(self, conn, timeout: float, label: str = 'query') -> Iterator[Watch]:
+        """Watch the statements run inside the block; timeout 0/None disables"""
+        watch = Watch(conn, label, timeout or 0)
+        if not timeout:
+            yield watch
+            return
+
+        with self._cond:
+            self._ensure_running()
+            heapq.heappush(self._heap, (watch.deadline, next(self._order), watch))
+            self._cond.notify()
+        try:
+            yield watch
+        finally:
+            with self._cond:
+                watch.done = True
+
+    def _ensure_running(self):
+        # Called with self._cond held; restarts the thread after a fork
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        if self._pid != os.getpid():
+            # Statements of the parent process are not ours to cancel
+            self._heap = []
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='statement-watchdog', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Forget statements that already finished
+                while self._heap and self._heap[0][2].done:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    # Nothing to watch: stop until the next statement arrives
+                    self._thread = None
+                    return
+
+                deadline, _, watch = self._heap[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                if watch.done:
+                    continue
+                # Discard while the statement is still running, before its
+                # connection can go back to the pool and be reused
+                watch.cancelled = True
+                discard = getattr(watch.conn, 'discard', None)
+                if discard:
+                    discard()
+                self._timeouts[watch.label] = self._timeouts.get(watch.label, 0) + 1
+
+            self._cancel(watch)
+
+    def _cancel(self, watch: Watch):
+        logger.warning(f"Statement {watch.label} exceeded {watch.timeout}s, cancelling")
+        try:
+            self.cancel(getattr(watch.conn, 'attachment_id', None))
+        except Exception as e:
+            with self._cond:
+                self._cancel_failures += 1
+            logger.error(f"Failed to cancel statement {watch.label}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'watching': sum(1 for entry in self._heap if not entry[2].done),
+                'timeouts': sum(self._timeouts.values()),
+                'timeouts_by_statement': dict(self._timeouts),
+                'cancel_failures': self._cancel_failures
+            }
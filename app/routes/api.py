@@ -2,13 +2,28 @@
 API routes for Mobile Sales application
 """
 
-from flask import Blueprint, request, jsonify, session, render_template, current_app, make_response
+import hashlib
+import os
+import re
+import time
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify, session, render_template, current_app, make_response, url_for, Response, stream_with_context
 from ..utils import login_required
-from ..database import artigos_repo, reservas_repo, requisicoes_repo, laboratorio_repo
-from ..database.connection import get_db_connection
+from ..database import artigos_repo, reservas_repo, requisicoes_repo, laboratorio_repo, lembretes_repo
+from ..database.connection import get_db_connection, connection_pool, statement_watchdog, connection_breaker
+from ..database.executor import parallel, call
+from ..config import NOTIFY_CONFIG
+from ..services import (client_list_service, lab_report_service, job_queue, sales_analytics_service, change_feed,
+                        access_service)
+from ..services.notifications import format_sse
+from ..services.lab_reports import RISATEL, SUMMARY
+from ..services.sales_analytics import PERIODS, period_range, check_period, AnalyticsUnavailable
 
 api_bp = Blueprint('api', __name__)
 
+# Um só endereço, sem espaços nem quebras de linha (cabeçalho To do email)
+EMAIL_RE = re.compile(r"[^@\s,;<>]+@[^@\s,;<>]+\.[^@\s,;<>]+")
+
 @api_bp.route('/search_cliente')
 @login_required
 def search_cliente():
@@ -43,6 +58,155 @@ def search_cliente():
             conn.close()
         return jsonify([])
 
+@api_bp.route('/clientes')
+@login_required
+def lista_clientes():
+    """Lista paginada/filtrada dos clientes do vendedor (picker virtualizado)
+    ambito=pedido: formulários de pedido e cotação, onde só o vendedor 1 vê todos os clientes
+    """
+    q = request.args.get('q', '')
+    for_orders = request.args.get('ambito') == 'pedido'
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    
+    try:
+        vendedor = session.get('vendedor', session.get('cd_vend', ''))
+        total, items = client_list_service.search(vendedor, q, offset, limit, for_orders=for_orders)
+    except Exception as e:
+        current_app.logger.error(f"Erro ao listar clientes: {str(e)}")
+        return jsonify({'error': f'Erro ao carregar clientes: {str(e)}'}), 500
+    
+    # Compact rows: [cliente, nome]
+    response = jsonify({'total': total, 'offset': offset, 'items': [list(item) for item in items]})
+    response.headers['Cache-Control'] = 'private, max-age=60'
+    return response
+
+def _aviso_json(aviso):
+    """Lembrete em formato JSON para o dashboard"""
+    data_registo = aviso['DT_REGISTO']
+    return {
+        'id': aviso['MSG_ID'],
+        'mensagem': aviso['MENSAGEM'],
+        'remetente': aviso['NOME_REMETENTE'] or aviso['REMETENTE'],
+        'tipo': aviso['TIPO_MSG'],
+        'npedido': aviso['NPEDIDO'],
+        'data': data_registo.strftime('%d/%m/%Y %H:%M') if data_registo else ''
+    }
+
+@api_bp.route('/lembretes')
+@login_required
+def lembretes():
+    """Avisos não lidos registados depois do cursor (suporta ETag / 304)"""
+    depois = request.args.get('depois', '')
+    utilizador = session['user']
+    
+    try:
+        # Verificação barata: só os ids pendentes; as mensagens só são lidas se algo mudou
+        pendentes = lembretes_repo.get_unread_ids(utilizador)
+        etag = hashlib.sha1(f"{pendentes}|{depois}".encode()).hexdigest()[:16]
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+        
+        avisos = lembretes_repo.get_unread(utilizador, depois or None) if pendentes else []
+    except Exception as e:
+        current_app.logger.error(f"Erro ao carregar lembretes: {str(e)}")
+        return jsonify({'success': False, 'error': f'Erro ao carregar avisos: {str(e)}'}), 500
+    
+    response = jsonify({
+        'success': True,
+        'items': [_aviso_json(aviso) for aviso in avisos],
+        'cursor': lembretes_repo.encode_cursor(avisos[0]) if avisos else depois,
+        'pendentes': pendentes
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@api_bp.route('/lembretes/lidos', methods=['POST'])
+@login_required
+def marcar_lembretes_lidos():
+    """Marcar vários avisos como lidos: {"ids": [...]}"""
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        ids = [int(msg_id) for msg_id in data.get('ids', [])]
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Lista de avisos inválida'}), 400
+    
+    if not ids:
+        return jsonify({'success': False, 'error': 'Nenhum aviso indicado'}), 400
+    
+    try:
+        marcados = lembretes_repo.mark_read(session['user'], ids)
+    except Exception as e:
+        current_app.logger.error(f"Erro ao marcar lembretes: {str(e)}")
+        return jsonify({'success': False, 'error': f'Erro ao marcar avisos: {str(e)}'}), 500
+    
+    return jsonify({'success': True, 'marcados': marcados})
+
+@api_bp.route('/eventos')
+@login_required
+def eventos():
+    """Server-Sent Events: novos avisos e mudanças de estado de pedidos"""
+    vendedor = session.get('vendedor', 0)
+    subscription = change_feed.subscribe(session['user'], vendedor, ver_todos=access_service.get_scope(vendedor).all_orders)
+    if subscription is None:
+        return jsonify({'success': False, 'error': 'Demasiadas ligações, tente mais tarde'}), 503
+    
+    keepalive = NOTIFY_CONFIG.get('keepalive', 15)
+    
+    def generate():
+        try:
+            yield "retry: 10000\n\n"
+            while True:
+                message = subscription.next_event(keepalive)
+                if message is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield format_sse(*message)
+        finally:
+            change_feed.unsubscribe(subscription)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_bp.route('/vendas/analise')
+@login_required
+def analise_vendas():
+    """Análise de vendas do vendedor por período (JSON para gráficos)"""
+    periodo = request.args.get('periodo', '12m')
+    top = min(max(request.args.get('top', 10, type=int), 1), 50)
+    
+    # Só os erros do período pedido dão 400; os restantes ValueError são erros internos (500)
+    try:
+        if request.args.get('desde'):
+            # Período explícito: 'ate' é inclusivo na query string
+            desde = date.fromisoformat(request.args['desde'])
+            ate = date.fromisoformat(request.args.get('ate') or date.today().isoformat()) + timedelta(days=1)
+        elif periodo in PERIODS:
+            desde, ate = period_range(periodo)
+        else:
+            raise ValueError(periodo)
+        check_period(desde, ate)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Período inválido'}), 400
+    
+    try:
+        analise = sales_analytics_service.get_analysis(session.get('vendedor', 0), desde, ate, top)
+    except AnalyticsUnavailable as e:
+        return jsonify({'success': False, 'error': f'Análise indisponível: {str(e)}'}), 503
+    except Exception as e:
+        current_app.logger.error(f"Erro na análise de vendas: {str(e)}")
+        return jsonify({'success': False, 'error': f'Erro ao carregar análise: {str(e)}'}), 500
+    
+    response = jsonify({'success': True, **analise})
+    response.headers['Cache-Control'] = 'private, max-age=60'
+    return response
+
 @api_bp.route('/reservas/<codigo>/<lote>')
 @login_required
 def lista_reservas(codigo, lote):
@@ -57,7 +221,7 @@ def lista_reservas(codigo, lote):
         
         # Get reservations using ReservasRepository
         vendedor = session.get('cd_vend', session.get('vendedor', 0))  # Use cd_vend if available, fallback to vendedor
-        reservas = reservas_repo.get_reservations(codigo, lote, fornecedor, vendedor)
+        reservas = reservas_repo.get_reservations(codigo, lote, fornecedor, access_service.get_scope(vendedor))
         
         return render_template('reservas.html', 
                              reservas=reservas,
@@ -83,18 +247,18 @@ def lista_requisicoes(codigo, lote):
     fornecedor = request.args.get('fornecedor', '')
     
     try:
-        # Get product info using ArtigosRepository
-        info_artigo = artigos_repo.get_product_info(codigo)
+        # Artigo, requisições e fornecedor são independentes - consultas em paralelo
+        calls = [
+            call(artigos_repo.get_product_info, codigo),
+            call(requisicoes_repo.get_requisitions, codigo, lote, fornecedor)
+        ]
+        if fornecedor:
+            calls.append(call(requisicoes_repo.get_supplier_name, fornecedor, default=""))
+        
+        info_artigo, requisicoes, *nomes = parallel(*calls)
         if info_artigo:
             info_artigo = (codigo, info_artigo['descricao'])  # Convert to tuple format for template
-        
-        # Get requisitions using RequisicoesRepository
-        requisicoes = requisicoes_repo.get_requisitions(codigo, lote, fornecedor)
-        
-        # Get supplier name if fornecedor is provided
-        nome_fornecedor = ""
-        if fornecedor:
-            nome_fornecedor = requisicoes_repo.get_supplier_name(fornecedor)
+        nome_fornecedor = nomes[0] if nomes else ""
         
         return render_template('requisicoes.html', 
                              requisicoes=requisicoes,
@@ -156,273 +320,172 @@ def observacoes_laboratorio(codigo, lote):
 @login_required
 def laboratorio_pdf(codigo, lote):
     """Generate PDF for laboratory observations"""
+    layout = SUMMARY if request.args.get('layout') == SUMMARY else RISATEL
+    
     try:
-        # Get laboratory results
-        lab_data = laboratorio_repo.get_lab_results(codigo, lote)
-        
-        if not lab_data:
-            return jsonify({'error': 'Nenhum resultado laboratorial encontrado'}), 404
-        
-        # Get product info
-        info_artigo = artigos_repo.get_product_info(codigo)
-        
-        # Get process type for user
+        # Get process type for user (only used by the summary layout)
         vendedor = session.get('cd_vend', session.get('vendedor', 0))
         process_type = laboratorio_repo.get_process_type_for_user(vendedor)
         
-        # Generate RISATEL format PDF
-        from flask import make_response
-        import io
-        from datetime import datetime
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch, cm
-        from reportlab.lib import colors
-        from reportlab.graphics.shapes import Drawing, Rect
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-        
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        header_style = ParagraphStyle('Header', parent=styles['Normal'], fontSize=14, alignment=1, spaceAfter=10)
-        subheader_style = ParagraphStyle('SubHeader', parent=styles['Normal'], fontSize=12, alignment=1, spaceAfter=20)
-        
-        # Title
-        elements.append(Paragraph("ANÁLISE LABORATORIAL", header_style))
-        elements.append(Paragraph("RELATÓRIO RESUMO", subheader_style))
-        
-        # Header info table (matching PDF format)
-        header_data = [
-            ['Relatório Nº:', str(lab_data.get('nr_relatorio', 'N/A')), 'Data:', str(lab_data.get('data_registo', datetime.now().strftime('%d-%m-%Y')))],
-            ['Lote:', str(lab_data.get('lote', lote)), '', ''],
-            ['Codigo do artigo:', str(lab_data.get('codigo', codigo)), '', ''],
-            ['Descrição:', str(info_artigo.get('descricao', '') if info_artigo else ''), '', '']
-        ]
-        
-        header_table = Table(header_data, colWidths=[3*cm, 4*cm, 2*cm, 3*cm])
-        header_table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-            ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            # Span the description across 3 columns (from column 1 to 3)
-            ('SPAN', (1, 3), (3, 3)),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 20))
+        # PDF is cached per report number
+        pdf = lab_report_service.get_pdf(codigo, lote, layout, process_type)
         
-        # Main data table (exactly like RISATEL format)
-        fmt = laboratorio_repo.format_lab_value
-        
-        # Complete data sections using all available fields
-        
-        # Humidade and Ne section
-        humidade_ne_data = [
-            ['Humidade Relativa (HR%) :', fmt(lab_data.get('hr')), 'Ne :', fmt(lab_data.get('ne_valor')), 'CV% :', fmt(lab_data.get('ne_cv'))]
-        ]
-        
-        # Características de Uster section
-        uster_data = [
-            ['Características de Uster', '', '', '', '', ''],
-            ['U% :', fmt(lab_data.get('uster_u')), 'CVm% :', fmt(lab_data.get('uster_cvm')), '', ''],
-            ['Pontos Finos (-40%) :', fmt(lab_data.get('uster_pnt_finos_40')), 'Pontos Finos (-50%) :', fmt(lab_data.get('uster_pnt_finos')), '', ''],
-            ['Pontos Grossos (+35%) :', fmt(lab_data.get('uster_pnt_grossos_35')), 'Pontos Grossos (+50%) :', fmt(lab_data.get('uster_pnt_grossos')), '', ''],
-            ['Neps (+140%) :', fmt(lab_data.get('uster_neps_1')), 'Neps (+200%) :', fmt(lab_data.get('uster_neps_2')), '', ''],
-            ['Pilosidade (H) :', fmt(lab_data.get('uster_pilosidade')), 'CV% :', fmt(lab_data.get('uster_pilosidade_cv')), '', '']
-        ]
-        
-        # RKM section
-        rkm_data = [
-            ['RKM (TensoRapid) :', fmt(lab_data.get('rkm_valor')), 'CV% :', fmt(lab_data.get('rkm_cv')), 'RKM (Tenac) :', fmt(lab_data.get('rkm_valor_tenac'))],
-            ['Alongamento % :', fmt(lab_data.get('rkm_along_valor')), 'CV% :', fmt(lab_data.get('rkm_along_cv')), '', '']
-        ]
-        
-        # Torção section - only if single thread
-        torcao_data = []
-        if lab_data.get('nr_fios') == 1:
-            torcao_data = [
-                ['Torção Z (Singelo)', '', 'Retorção S', '', '', ''],
-                ['TPI :', fmt(lab_data.get('torcao_tpi_valor')), 'Alfa :', fmt(lab_data.get('torcao_tpi_alfa')), 'CV% :', fmt(lab_data.get('torcao_tpi_cv'))],
-                ['', '', 'TPI :', fmt(lab_data.get('torcao_tpi_valor_s')), 'CV% :', fmt(lab_data.get('torcao_tpi_cv_s'))]
-            ]
-        
-        # Combine all data
-        main_data = humidade_ne_data + [['', '', '', '', '', '']] + uster_data + [['', '', '', '', '', '']] + rkm_data
-        if torcao_data:
-            main_data += [['', '', '', '', '', '']] + torcao_data
+        if not pdf:
+            return jsonify({'error': 'Nenhum resultado laboratorial encontrado'}), 404
         
-        main_table = Table(main_data, colWidths=[3*cm, 1.5*cm, 2.5*cm, 1.5*cm, 2*cm, 1.5*cm])
-        main_table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-            ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-            ('ALIGN', (3, 0), (3, -1), 'CENTER'),
-            ('ALIGN', (5, 0), (5, -1), 'CENTER'),
-        ]))
-        elements.append(main_table)
+        # Return PDF response
+        response = make_response(pdf)
+        response.headers['Content-Type'] = 'application/pdf'
+        if layout == SUMMARY:
+            response.headers['Content-Disposition'] = f'attachment; filename="resultados_laboratoriais_{codigo}_{lote}.pdf"'
+        else:
+            response.headers['Content-Disposition'] = f'inline; filename="lab_data_{codigo}_{lote}.pdf"'
         
-        # Observations section - separate from main grid
-        elements.append(Spacer(1, 30))
-        obs_style = ParagraphStyle('Obs', parent=styles['Normal'], fontSize=10, spaceAfter=10)
-        elements.append(Paragraph("<b>Obs.:</b> Os resultados são valores médios actuais após acondicionamento do fio.", obs_style))
+        return response
         
-        # Additional observations if any
-        if lab_data.get('observacao'):
-            elements.append(Paragraph(f"<b>Observações:</b> {str(lab_data.get('observacao'))}", obs_style))
+    except Exception as e:
+        current_app.logger.error(f"Erro ao gerar PDF: {str(e)}")
+        return jsonify({'error': f'Erro ao gerar PDF: {str(e)}'}), 500
+
+@api_bp.route('/laboratorio/<codigo>/bundle.pdf', methods=['GET', 'POST'])
+@login_required
+def laboratorio_bundle_pdf(codigo):
+    """PDF único com os relatórios laboratoriais dos lotes indicados
+    - POST {"lotes": [...]} ou GET ?lotes=L1,L2
+    - o documento é construído em memória (uma só construção reportlab) e
+      depois enviado por partes; não é gerado página a página
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        lotes = data.get('lotes')
+        # bool é subclasse de int: True/False não são lotes
+        if not isinstance(lotes, list) or not all(
+                isinstance(lote, (str, int)) and not isinstance(lote, bool) for lote in lotes):
+            return jsonify({'error': 'lotes deve ser uma lista de lotes'}), 400
+    else:
+        lotes = request.args.get('lotes', '').split(',')
+    
+    # Sem espaços, vazios ou repetidos (mantém a ordem pedida)
+    lotes = list(dict.fromkeys(str(lote).strip() for lote in lotes if str(lote).strip()))
+    
+    if not lotes:
+        return jsonify({'error': 'Indique pelo menos um lote'}), 400
+    
+    try:
+        pdf = lab_report_service.get_bundle_pdf(codigo, lotes)
         
-        # Footer
-        elements.append(Spacer(1, 40))
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=10, alignment=1)
-        elements.append(Paragraph("Laboratório de Controlo da Qualidade", footer_style))
+        if not pdf:
+            return jsonify({'error': 'Nenhum resultado laboratorial encontrado'}), 404
         
-        # Build PDF
-        doc.build(elements)
+        # The finished document is sent in chunks instead of one large write
+        def generate(chunk_size=64 * 1024):
+            for start in range(0, len(pdf), chunk_size):
+                yield pdf[start:start + chunk_size]
         
-        # Return PDF response
-        buffer.seek(0)
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'inline; filename="lab_data_{codigo}_{lote}.pdf"'
+        response = Response(generate(), mimetype='application/pdf')
+        response.headers['Content-Length'] = str(len(pdf))
+        response.headers['Content-Disposition'] = f'inline; filename="lab_data_{codigo}_lotes.pdf"'
         
         return response
         
     except Exception as e:
-        current_app.logger.error(f"Erro ao gerar PDF: {str(e)}")
+        current_app.logger.error(f"Erro ao gerar PDF de lotes: {str(e)}")
         return jsonify({'error': f'Erro ao gerar PDF: {str(e)}'}), 500
 
 @api_bp.route('/laboratorio/<codigo>/<lote>/email', methods=['POST'])
 @login_required
 def laboratorio_email(codigo, lote):
-    """Send laboratory results by email with PDF attachment"""
+    """Queue laboratory results email (PDF attachment) and return the job id"""
     try:
         # Get email from request
         data = request.get_json()
         if not data or 'email' not in data:
             return jsonify({'error': 'Email é obrigatório'}), 400
-            
-        email_to = data['email']
-        email_message = data.get('message', '')
         
-        # Generate PDF content
-        lab_data = laboratorio_repo.get_lab_results(codigo, lote)
-        if not lab_data:
-            return jsonify({'error': 'Nenhum resultado laboratorial encontrado'}), 404
-        
-        # Get product info
-        info_artigo = artigos_repo.get_product_info(codigo)
+        email = data['email'].strip() if isinstance(data['email'], str) else ''
+        if len(email) > 254 or not EMAIL_RE.fullmatch(email):
+            return jsonify({'error': 'Email inválido'}), 400
         
         # Get process type for user
         vendedor = session.get('cd_vend', session.get('vendedor', 0))
         process_type = laboratorio_repo.get_process_type_for_user(vendedor)
         
-        # Generate PDF
-        import io
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-        
-        # Container for the 'Flowable' objects
-        elements = []
-        
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1,  # Center alignment
-        )
-        
-        # Add title
-        title = Paragraph(f"Resultados Laboratoriais", title_style)
-        elements.append(title)
-        
-        # Add product info
-        if info_artigo:
-            product_info = Paragraph(f"<b>Produto:</b> {codigo}<br/><b>Descrição:</b> {info_artigo['descricao']}<br/><b>Lote:</b> {lote}", styles['Normal'])
-            elements.append(product_info)
-            elements.append(Spacer(1, 20))
-        
-        # Create table data
-        table_data = []
-        
-        # Ne Value
-        table_data.append(['Ne', laboratorio_repo.format_lab_value(lab_data['ne_valor']), 
-                          'Cv %', laboratorio_repo.format_lab_value(lab_data['ne_cv'])])
-        
-        # CVM
-        table_data.append(['Cvm %', laboratorio_repo.format_lab_value(lab_data['uster_cvm']), '', ''])
-        
-        # Points
-        table_data.append(['PF -50%', laboratorio_repo.format_lab_value(lab_data['uster_pnt_finos']), '', ''])
-        table_data.append(['PG +50%', laboratorio_repo.format_lab_value(lab_data['uster_pnt_grossos']), '', ''])
-        
-        # Neps based on process type
-        if process_type == 'O':
-            table_data.append(['N +280%', laboratorio_repo.format_lab_value(lab_data['uster_neps_3']), '', ''])
-        else:
-            table_data.append(['N +200%', laboratorio_repo.format_lab_value(lab_data['uster_neps_2']), '', ''])
-        
-        # RKM
-        table_data.append(['Rkm', laboratorio_repo.format_lab_value(lab_data['rkm_valor']), 
-                          'Cv %', laboratorio_repo.format_lab_value(lab_data['rkm_cv'])])
-        
-        # Torsion
-        if lab_data['nr_fios'] == 1:
-            table_data.append(['Torção', laboratorio_repo.format_lab_value(lab_data['torcao_tpi_valor']), 
-                              str(lab_data['tipo_torcao'] or ''), ''])
-        else:
-            table_data.append(['Retorção', laboratorio_repo.format_lab_value(lab_data['torcao_tpi_valor_s']), 
-                              str(lab_data['tipo_torcao_s'] or ''), ''])
-        
-        # Hairiness
-        table_data.append(['Pilosidade', laboratorio_repo.format_lab_value(lab_data['uster_pilosidade']), 
-                          'Cv %', laboratorio_repo.format_lab_value(lab_data['uster_pilosidade_cv'])])
-        
-        # Create table
-        table = Table(table_data, colWidths=[1.5*inch, 1*inch, 0.8*inch, 1*inch])
-        
-        # Style the table
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-        ]))
-        
-        elements.append(table)
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        # For now, return the PDF for download (email functionality would need SMTP configuration)
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename="resultados_laboratoriais_{codigo}_{lote}.pdf"'
-        
-        return response
+        # PDF rendering and SMTP delivery run in the background job queue
+        job_id = job_queue.enqueue('lab_email', {
+            'codigo': codigo,
+            'lote': lote,
+            'email': email,
+            'message': data.get('message', ''),
+            'process_type': process_type
+        }, owner=session.get('user'))
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('api.job_status', job_id=job_id)
+        }), 202
         
     except Exception as e:
         current_app.logger.error(f"Erro ao enviar email: {str(e)}")
-        return jsonify({'error': f'Erro ao processar solicitação: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Erro ao processar solicitação: {str(e)}'}), 500
+
+@api_bp.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    """Estado de um trabalho em background (polling)"""
+    status = job_queue.get_status(job_id, owner=session.get('user'))
+    if not status:
+        return jsonify({'error': 'Trabalho não encontrado'}), 404
+    return jsonify(status)
+
+@api_bp.route('/metricas_bd')
+@login_required
+def metricas_bd():
+    """Métricas da base de dados deste worker: pool de ligações e instruções canceladas"""
+    if not session.get('nivel_acesso', 0):
+        return jsonify({'error': 'Acesso negado'}), 403
+    return jsonify({
+        'pid': os.getpid(),
+        'breaker': connection_breaker.stats(),
+        'pool': connection_pool.stats(),
+        'statements': statement_watchdog.stats()
+    })
+
+@api_bp.route('/saude')
+def saude():
+    """Health check para o balanceador / gunicorn, sem sessão
+    - 200 enquanto o worker responde ('degraded' se o circuito da base de dados estiver aberto)
+    - com ?bd=1 testa também uma ligação do pool; 503 se a base de dados não responder.
+      Só para pedidos locais (balanceador / gunicorn na mesma máquina)
+    """
+    estado = {
+        'status': 'degraded' if connection_breaker.is_degraded() else 'ok',
+        'pid': os.getpid(),
+        'breaker': connection_breaker.state
+    }
+    status_code = 200
+    if request.args.get('bd'):
+        if request.remote_addr not in ('127.0.0.1', '::1'):
+            return jsonify({'error': 'Acesso negado'}), 403
+        conn = None
+        started = time.perf_counter()
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM RDB$DATABASE")
+            cursor.fetchone()
+            cursor.close()
+            estado['bd_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            # O detalhe fica no log; a resposta não expõe a mensagem do driver
+            current_app.logger.error(f"Health check da base de dados falhou: {str(e)}")
+            estado.update(status='unavailable', bd='indisponível')
+            status_code = 503
+        finally:
+            if conn:
+                conn.close()
+    
+    response = jsonify(estado)
+    response.status_code = status_code
+    response.headers['Cache-Control'] = 'no-store'
+    return response
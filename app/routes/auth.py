@@ -2,11 +2,11 @@
 Authentication routes for Mobile Sales application
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
 from datetime import timedelta, datetime
 from ..utils import login_required
 from ..database import auth_repo
-from ..database.connection import get_db_connection
+from ..services import db_state_service, access_service
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -37,71 +37,52 @@ def login():
         # Concatenar 'U' ao número digitado
         utilizador_busca = 'U' + user_input  # Ex: 01 vira U01
         
-        conn = get_db_connection()
-        if not conn:
-            flash('Erro ao conectar à base de dados', 'danger')
-            return render_template('login.html')
-        
         try:
-            cursor = conn.cursor()
-            
-            # Verificar estado da BD
-            cursor.execute("SELECT Valor FROM Parametros_GC WHERE Chave = 'BD_ESTADO'")
-            estado = cursor.fetchone()
-            if estado and estado[0] == 'MANUTENCAO':
+            # Estado da BD em cache; a autenticação é uma única consulta numa ligação do pool
+            if db_state_service.in_maintenance():
                 flash('Base de dados em manutenção. Tente mais tarde.', 'warning')
-                cursor.close()
-                conn.close()
                 return render_template('login.html')
             
-            # Use AuthRepository for authentication
+            user_data = auth_repo.authenticate_user(utilizador_busca, password)
+        except Exception as e:
+            flash('Erro interno na autenticação. Tente novamente.', 'error')
+            print(f"DEBUG Login Erro: {str(e)}")
+            return render_template('login.html')
+        
+        if user_data:
+            # Login successful - new session id (server-side sessions) and session data
+            rotate = getattr(session, 'rotate', None)
+            if rotate:
+                rotate()
+            session.permanent = True
+            session['user'] = utilizador_busca
+            session['vendedor'] = user_data['vendedor']
+            session['validar'] = 1
+            session['login_time'] = datetime.now().isoformat()
+            session['nivel_acesso'] = user_data['nivel_acesso']
+            
+            vendedor = user_data['vendedor']
+            nivel_acesso = user_data['nivel_acesso']
+            
+            # Âmbito de acesso (regras e carteira de clientes) calculado uma vez por login
             try:
-                user_data = auth_repo.authenticate_user(utilizador_busca, password)
-                
-                if user_data:
-                    # Login successful - save session data
-                    session.permanent = True
-                    session['user'] = utilizador_busca
-                    session['vendedor'] = user_data['vendedor']
-                    session['password'] = password
-                    session['validar'] = 1
-                    session['login_time'] = datetime.now().isoformat()
-                    session['nivel_acesso'] = user_data['nivel_acesso']
-                    
-                    vendedor = user_data['vendedor']
-                    nivel_acesso = user_data['nivel_acesso']
-                    
-                    print(f"DEBUG Login - Vendedor: {vendedor} (tipo: {type(vendedor)}), Nível: {nivel_acesso}")
-                    
-                    # Welcome message
-                    flash(f'Bem-vindo, Vendedor {vendedor}!', 'success')
-                    
-                    print(f"DEBUG Login Sucesso - User: {utilizador_busca}, Vendedor: {vendedor}, Nível: {nivel_acesso}")
-                    
-                    cursor.close()
-                    conn.close()
-                    
-                    # Check if there's a next_url to redirect to
-                    next_url = session.pop('next_url', None)
-                    if next_url:
-                        return redirect(next_url)
-                    return redirect(url_for('dashboard.menu'))
-                else:
-                    flash('Utilizador ou senha inválidos', 'danger')
-                    print(f"DEBUG Login Falhou - Tentou: {utilizador_busca}")
-                    
+                access_service.refresh(vendedor)
             except Exception as e:
-                flash('Erro interno na autenticação. Tente novamente.', 'error')
-                print(f"DEBUG Login Erro: {str(e)}")
+                current_app.logger.warning(f"Login - Âmbito de acesso não calculado: {str(e)}")
             
-            cursor.close()
-            conn.close()
+            # Welcome message
+            flash(f'Bem-vindo, Vendedor {vendedor}!', 'success')
             
-        except Exception as e:
-            flash(f'Erro ao validar login: {str(e)}', 'danger')
-            print(f"DEBUG Login Erro: {str(e)}")
-            if conn:
-                conn.close()
+            print(f"DEBUG Login Sucesso - User: {utilizador_busca}, Vendedor: {vendedor}, Nível: {nivel_acesso}")
+            
+            # Check if there's a next_url to redirect to
+            next_url = session.pop('next_url', None)
+            if next_url:
+                return redirect(next_url)
+            return redirect(url_for('dashboard.menu'))
+        
+        flash('Utilizador ou senha inválidos', 'danger')
+        print(f"DEBUG Login Falhou - Tentou: {utilizador_busca}")
     
     return render_template('login.html')
 
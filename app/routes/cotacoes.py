@@ -4,50 +4,67 @@ Quotation management routes for Mobile Sales application
 
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app
 from ..utils import login_required
+from ..database import cotacoes_repo
 from ..database.connection import get_db_connection
 from datetime import datetime
 
 cotacoes_bp = Blueprint('cotacoes', __name__)
 
+# Linhas por pedido de adicionar_itens_cotacao (uma só transação)
+MAX_ITENS_POR_PEDIDO = 100
+
+
+def _is_number(value) -> bool:
+    """Número JSON ou texto numérico (não aceita True/False)"""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _validar_itens(itens) -> str:
+    """Mensagem de erro para uma lista de itens inválida, '' se válida"""
+    if not isinstance(itens, list) or not itens:
+        return 'itens deve ser uma lista não vazia'
+    if len(itens) > MAX_ITENS_POR_PEDIDO:
+        return f'No máximo {MAX_ITENS_POR_PEDIDO} itens por pedido'
+    for numero, item in enumerate(itens, 1):
+        if not isinstance(item, dict):
+            return f'Item {numero} inválido'
+        for campo in ('quantidade', 'preco'):
+            if not _is_number(item.get(campo)):
+                return f'Item {numero}: {campo} deve ser numérico'
+    return ''
+
 @cotacoes_bp.route('/cotacoes')
 @login_required
 def cotacoes():
-    """Lista de cotações"""
+    """Lista de cotações (paginada por Data_Criacao, filtrável por status)"""
     cotacoes_list = []
+    next_cursor = None
+    status = request.args.get('status', '')
+    antes = request.args.get('antes', '')
     
     try:
         vendedor = session.get('vendedor', 0)
         
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            
-            # Buscar cotações do vendedor
-            cursor.execute("""
-                SELECT c.Id, c.Cliente, c.Nome_Cliente, c.Data_Criacao, c.Data_Validade,
-                       c.Status, c.Valor_Total, c.Observacoes,
-                       COUNT(ci.Id) as Num_Itens
-                FROM Cotacoes c
-                LEFT JOIN Cotacoes_Itens ci ON c.Id = ci.Cotacao_Id
-                WHERE c.Vendedor = ? 
-                ORDER BY c.Data_Criacao DESC
-            """, (vendedor,))
-            
-            cotacoes_data = cursor.fetchall()
-            
-            # Convert to list of dicts for template use
-            columns = ['ID', 'CLIENTE', 'NOME_CLIENTE', 'DATA_CRIACAO', 'DATA_VALIDADE', 
-                      'STATUS', 'VALOR_TOTAL', 'OBSERVACOES', 'NUM_ITENS']
-            cotacoes_list = [dict(zip(columns, row)) for row in cotacoes_data]
-            
-            cursor.close()
-            conn.close()
+        # Num_Itens é mantido no cabeçalho - sem JOIN/COUNT sobre os itens
+        cotacoes_list, next_cursor = cotacoes_repo.list_for_vendor(vendedor, status or None, antes or None)
         
     except Exception as e:
         flash(f'Erro ao carregar cotações: {str(e)}', 'warning')
         current_app.logger.error(f"Erro ao carregar cotações: {str(e)}")
     
-    return render_template('cotacoes.html', cotacoes=cotacoes_list)
+    return render_template('cotacoes.html',
+                         cotacoes=cotacoes_list,
+                         next_cursor=next_cursor,
+                         status=status,
+                         antes=antes)
 
 @cotacoes_bp.route('/nova_cotacao', methods=['GET', 'POST'])
 @login_required
@@ -87,34 +104,8 @@ def nova_cotacao():
             flash(f'Erro ao criar cotação: {str(e)}', 'error')
             current_app.logger.error(f"Erro ao criar cotação: {str(e)}")
     
-    # Carregar lista de clientes para o formulário
-    clientes_list = []
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            vendedor = session.get('vendedor', session.get('cd_vend', ''))
-            
-            cursor.execute("""
-                SELECT l.cliente, l.Nome1
-                FROM Locais_Entrega l
-                LEFT OUTER JOIN clientes c ON c.cliente = l.cliente
-                LEFT OUTER JOIN Rel_Cli_Vend2 rc2 ON rc2.cliente = l.cliente
-                WHERE (c.situacao IN ('ACT', 'MANUT'))
-                AND ((l.vendedor = ?) OR (rc2.vendedor = ?) OR (? = 1))
-                ORDER BY l.Nome1
-            """, (vendedor, vendedor, vendedor))
-            
-            clientes_list = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            flash(f'Erro ao carregar clientes: {str(e)}', 'warning')
-            if conn:
-                conn.close()
-    
-    return render_template('nova_cotacao.html', clientes=clientes_list)
+    # Lista de clientes carregada a pedido via /api/clientes
+    return render_template('nova_cotacao.html')
 
 @cotacoes_bp.route('/editar_cotacao/<int:id>')
 @login_required
@@ -177,44 +168,44 @@ def adicionar_item_cotacao():
     try:
         data = request.form.to_dict()
         cotacao_id = int(data.get('cotacao_id'))
-        codigo = data.get('codigo')
-        descricao = data.get('descricao')
-        lote = data.get('lote')
-        quantidade = float(data.get('quantidade', 0))
-        preco = float(data.get('preco', 0))
-        valor_total = quantidade * preco
-        observacoes = data.get('observacoes', '')
         
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            
-            # Inserir item
-            cursor.execute("""
-                INSERT INTO Cotacoes_Itens (Cotacao_Id, Codigo, Descricao, Lote, 
-                                          Quantidade, Preco_Unitario, Valor_Total, Observacoes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (cotacao_id, codigo, descricao, lote, quantidade, preco, valor_total, observacoes))
-            
-            # Atualizar valor total da cotação
-            cursor.execute("""
-                UPDATE Cotacoes 
-                SET Valor_Total = (
-                    SELECT SUM(Valor_Total) FROM Cotacoes_Itens WHERE Cotacao_Id = ?
-                )
-                WHERE Id = ?
-            """, (cotacao_id, cotacao_id))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            return jsonify({'success': True, 'message': 'Item adicionado com sucesso'})
+        # Inserir item e somar o seu valor ao total da cotação (mesma transação)
+        cotacoes_repo.add_items(cotacao_id, [data], session.get('vendedor', 0))
+        
+        return jsonify({'success': True, 'message': 'Item adicionado com sucesso'})
     
     except Exception as e:
         current_app.logger.error(f"Erro ao adicionar item: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@cotacoes_bp.route('/adicionar_itens_cotacao', methods=['POST'])
+@login_required
+def adicionar_itens_cotacao():
+    """Adicionar vários itens à cotação numa única transação"""
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            cotacao_id = int(data.get('cotacao_id'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'cotacao_id inválido'}), 400
+        itens = data.get('itens')
+        
+        erro = _validar_itens(itens)
+        if erro:
+            return jsonify({'success': False, 'error': erro}), 400
+        
+        delta = cotacoes_repo.add_items(cotacao_id, itens, session.get('vendedor', 0))
+        
+        return jsonify({
+            'success': True,
+            'message': f'{len(itens)} itens adicionados com sucesso',
+            'valor_adicionado': delta
+        })
+    
+    except Exception as e:
+        current_app.logger.error(f"Erro ao adicionar itens: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @cotacoes_bp.route('/remover_item_cotacao', methods=['POST'])
 @login_required
 def remover_item_cotacao():
@@ -223,36 +214,11 @@ def remover_item_cotacao():
         data = request.get_json()
         item_id = data.get('item_id')
         
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            
-            # Buscar cotacao_id antes de remover
-            cursor.execute("SELECT Cotacao_Id FROM Cotacoes_Itens WHERE Id = ?", (item_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                cotacao_id = result[0]
-                
-                # Remover item
-                cursor.execute("DELETE FROM Cotacoes_Itens WHERE Id = ?", (item_id,))
-                
-                # Atualizar valor total da cotação
-                cursor.execute("""
-                    UPDATE Cotacoes 
-                    SET Valor_Total = COALESCE((
-                        SELECT SUM(Valor_Total) FROM Cotacoes_Itens WHERE Cotacao_Id = ?
-                    ), 0)
-                    WHERE Id = ?
-                """, (cotacao_id, cotacao_id))
-                
-                conn.commit()
-                cursor.close()
-                conn.close()
-                
-                return jsonify({'success': True, 'message': 'Item removido com sucesso'})
-            else:
-                return jsonify({'success': False, 'error': 'Item não encontrado'})
+        # Remover item e subtrair o seu valor ao total da cotação (mesma transação)
+        if cotacoes_repo.remove_item(item_id, session.get('vendedor', 0)):
+            return jsonify({'success': True, 'message': 'Item removido com sucesso'})
+        
+        return jsonify({'success': False, 'error': 'Item não encontrado'})
     
     except Exception as e:
         current_app.logger.error(f"Erro ao remover item: {str(e)}")
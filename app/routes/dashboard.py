@@ -4,8 +4,9 @@ Dashboard and menu routes for Mobile Sales application
 
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from ..utils import login_required
-from ..database.connection import get_db_connection
-from ..database import clientes_repo
+from ..database.connection import get_db_connection, StatementTimeout
+from ..database import clientes_repo, lembretes_repo
+from ..services import sales_stats_service, access_service
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -14,32 +15,15 @@ dashboard_bp = Blueprint('dashboard', __name__)
 def dashboard():
     """Dashboard principal com avisos"""
     avisos = []
-    conn = get_db_connection()
     
-    if conn:
-        try:
-            cursor = conn.cursor()
-            
-            # Buscar avisos/lembretes não processados
-            cursor.execute("""
-                SELECT L.Mensagem, L.Msg_id, L.Remetente, L.recibo_leitura, 
-                       U.Descricao, L.Tipo_Msg, L.NPedido, L.Dt_Registo
-                FROM Lembretes L
-                LEFT OUTER JOIN Utilizadores_GC U ON U.Utilizador = L.Remetente
-                WHERE L.destinatario = ? AND L.Processado = 'N'
-                ORDER BY L.Dt_Registo DESC
-            """, (session['user'],))
-            
-            avisos = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            flash(f'Erro ao carregar avisos: {str(e)}', 'warning')
-            if conn:
-                conn.close()
+    try:
+        # Primeira página; depois o dashboard consulta /api/lembretes a partir do cursor
+        avisos = lembretes_repo.get_unread(session['user'])
+    except Exception as e:
+        flash(f'Erro ao carregar avisos: {str(e)}', 'warning')
     
-    return render_template('dashboard.html', avisos=avisos)
+    cursor = lembretes_repo.encode_cursor(avisos[0]) if avisos else ''
+    return render_template('dashboard.html', avisos=avisos, avisos_cursor=cursor)
 
 @dashboard_bp.route('/menu')
 @login_required
@@ -104,25 +88,12 @@ def artigos():
 @dashboard_bp.route('/marcar_aviso_lido/<int:msg_id>')
 @login_required
 def marcar_aviso_lido(msg_id):
-    """Marcar aviso como lido"""
-    conn = get_db_connection()
-    
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE Lembretes 
-                SET Processado = 'S', Dt_Processado = CURRENT_TIMESTAMP
-                WHERE Msg_id = ? AND destinatario = ?
-            """, (msg_id, session['user']))
-            conn.commit()
-            cursor.close()
-            conn.close()
-            flash('Aviso marcado como lido', 'success')
-        except Exception as e:
-            flash(f'Erro ao marcar aviso: {str(e)}', 'danger')
-            if conn:
-                conn.close()
+    """Marcar aviso como lido (sem JavaScript; o dashboard usa /api/lembretes/lidos)"""
+    try:
+        lembretes_repo.mark_read(session['user'], [msg_id])
+        flash('Aviso marcado como lido', 'success')
+    except Exception as e:
+        flash(f'Erro ao marcar aviso: {str(e)}', 'danger')
     
     return redirect(url_for('dashboard.dashboard'))
 
@@ -131,43 +102,12 @@ def marcar_aviso_lido(msg_id):
 def estatisticas():
     """Página de estatísticas e relatórios"""
     stats = {}
-    conn = get_db_connection()
     
-    if conn:
-        try:
-            cursor = conn.cursor()
-            
-            # Usar vendedor (INTEGER) para as queries
-            vendedor = session.get('vendedor', 0)
-            
-            # Total de pedidos do vendedor
-            cursor.execute("""
-                SELECT COUNT(*), SUM(Quantidade * Preco)
-                FROM Pda_Pedidos
-                WHERE Vendedor = ?
-            """, (vendedor,))
-            result = cursor.fetchone()
-            stats['total_pedidos'] = result[0] or 0
-            stats['valor_total'] = result[1] or 0
-            
-            # Pedidos do mês
-            cursor.execute("""
-                SELECT COUNT(*), SUM(Quantidade * Preco)
-                FROM Pda_Pedidos
-                WHERE Vendedor = ? 
-                AND EXTRACT(MONTH FROM Dt_Registo) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM Dt_Registo) = EXTRACT(YEAR FROM CURRENT_DATE)
-            """, (vendedor,))
-            result = cursor.fetchone()
-            stats['pedidos_mes'] = result[0] or 0
-            stats['valor_mes'] = result[1] or 0
-            
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            flash(f'Erro ao carregar estatísticas: {str(e)}', 'warning')
-            if conn:
-                conn.close()
+    try:
+        # Agregados diários/mensais mantidos localmente - só os últimos dias são relidos
+        stats = sales_stats_service.get_stats(session.get('vendedor', 0))
+    except Exception as e:
+        flash(f'Erro ao carregar estatísticas: {str(e)}', 'warning')
     
     return render_template('estatisticas.html', stats=stats)
 
@@ -326,9 +266,8 @@ DEBUG = True
 @login_required
 def mapabordocli():
     """Mapa de Bordo de Clientes - Form para seleção de cliente"""
-    vendedor = session.get('vendedor', 0)
-    clientes_list = clientes_repo.get_clients_for_vendor(vendedor)
-    return render_template('mapabordocli.html', clientes=clientes_list)
+    # Lista de clientes carregada a pedido via /api/clientes
+    return render_template('mapabordocli.html')
 
 @dashboard_bp.route('/listamapabordocli', methods=['POST'])
 @login_required
@@ -342,7 +281,11 @@ def listamapabordocli():
         return redirect(url_for('dashboard.mapabordocli'))
     
     # Get customer dashboard data
-    dashboard_data = clientes_repo.get_customer_dashboard_data(cliente_id, vendedor)
+    try:
+        dashboard_data = clientes_repo.get_customer_dashboard_data(cliente_id, access_service.get_scope(vendedor))
+    except StatementTimeout:
+        flash('A consulta do mapa de bordo demorou demasiado tempo, tente novamente', 'error')
+        return redirect(url_for('dashboard.mapabordocli'))
     
     if not dashboard_data:
         flash('Não foi possível obter dados do cliente', 'error')
@@ -2,10 +2,13 @@
 Stock/inventory routes for Mobile Sales application
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app, make_response
 from ..utils import login_required
 from ..database import existencias_repo, laboratorio_repo, user_preferences_repo
 from ..database.connection import get_db_connection
+from ..database.executor import run_async, parallel, call
+from ..config import CACHE_CONFIG
+from ..services import lot_panel_service, fragment_cache
 
 existencias_bp = Blueprint('existencias', __name__)
 
@@ -52,8 +55,20 @@ def existencias():
     # Get user ID from session
     vendedor_id = session.get('vendedor', 0)
     
-    # Recuperar filtros guardados para este utilizador
-    filtros_guardados = user_preferences_repo.get_user_filters(vendedor_id, 'existencias')
+    # Filtros guardados e dados para os dropdowns - as consultas correm em paralelo
+    try:
+        filtros_guardados, tipo_artigo, tipo_ne, n_cabos, composicoes, tipo_processo = parallel(
+            call(user_preferences_repo.get_user_filters, vendedor_id, 'existencias', default={}),
+            call(existencias_repo.get_code_table_values, 1),   # Tipo de Artigo (Posição 1)
+            call(existencias_repo.get_code_table_values, 2),   # Tipo NE (Posição 2)
+            call(existencias_repo.get_code_table_values, 5),   # Número de Cabos (Posição 5)
+            call(existencias_repo.get_compositions),
+            call(existencias_repo.get_process_types)
+        )
+    except Exception as e:
+        flash(f'Erro ao carregar dados: {str(e)}', 'warning')
+        filtros_guardados = {}
+        tipo_artigo, tipo_ne, n_cabos, composicoes, tipo_processo = [], [], [], [], []
     
     # Set default values if no saved filters
     if not filtros_guardados:
@@ -67,76 +82,6 @@ def existencias():
             'utilizacao': ''
         }
     
-    # Dados para os dropdowns
-    tipo_artigo = []
-    tipo_ne = []
-    n_cabos = []
-    composicoes = []
-    tipo_processo = []
-    
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            
-            # Buscar Tipo de Artigo (Posição 1)
-            cursor.execute("""
-                SELECT CTV.Valor, CTV.Descricao, CTV.ID
-                FROM Forma_Codigo FC
-                LEFT OUTER JOIN codigo_tabelas CT ON CT.ID = FC.Tab_Ref
-                LEFT OUTER JOIN codigo_tab_valores CTV ON CTV.Tab_ID = CT.ID AND CTV.Activo = 1
-                WHERE FC.Posicao = 1
-                ORDER BY CTV.Descricao
-            """)
-            tipo_artigo = cursor.fetchall()
-            
-            # Buscar Tipo NE (Posição 2)
-            cursor.execute("""
-                SELECT CTV.Valor, CTV.Descricao, CTV.ID
-                FROM Forma_Codigo FC
-                LEFT OUTER JOIN codigo_tabelas CT ON CT.ID = FC.Tab_Ref
-                LEFT OUTER JOIN codigo_tab_valores CTV ON CTV.Tab_ID = CT.ID AND CTV.Activo = 1
-                WHERE FC.Posicao = 2
-                ORDER BY CTV.Descricao
-            """)
-            tipo_ne = cursor.fetchall()
-            
-            # Buscar Número de Cabos (Posição 5)
-            cursor.execute("""
-                SELECT CTV.Valor, CTV.Descricao, CTV.ID
-                FROM Forma_Codigo FC
-                LEFT OUTER JOIN codigo_tabelas CT ON CT.ID = FC.Tab_Ref
-                LEFT OUTER JOIN codigo_tab_valores CTV ON CTV.Tab_ID = CT.ID AND CTV.Activo = 1
-                WHERE FC.Posicao = 5
-                ORDER BY CTV.Descricao
-            """)
-            n_cabos = cursor.fetchall()
-            
-            # Buscar Composições
-            cursor.execute("""
-                SELECT CodArt, Desc_Pda, Composicao 
-                FROM Rel_Comp_CodArt 
-                WHERE Char_Length(Trim(Desc_Pda)) > 2 AND listar = 'S' 
-                ORDER BY Desc_Pda
-            """)
-            composicoes = cursor.fetchall()
-            
-            # Buscar Tipos de Processo
-            cursor.execute("""
-                SELECT Tipo, Descricao 
-                FROM Tipo_Processo 
-                ORDER BY Descricao
-            """)
-            tipo_processo = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            flash(f'Erro ao carregar dados: {str(e)}', 'warning')
-            if conn:
-                conn.close()
-    
     return render_template('existencias.html',
                          tipo_artigo=tipo_artigo,
                          tipo_ne=tipo_ne,
@@ -310,9 +255,6 @@ def detalhes_lote(codigo):
     API endpoint para buscar detalhes de lote de um artigo.
     Replica a lógica de 'listaexist.php'.
     """
-    lotes = []
-    conn = get_db_connection()
-    
     # DEBUG: Adicionar variáveis de debug
     debug_info = {
         'codigo': codigo,
@@ -323,60 +265,34 @@ def detalhes_lote(codigo):
         'sql': None,
         'error': None
     }
-    
-    if not conn:
-        debug_info['error'] = 'Erro de conexão com a base de dados'
-        return f"""
-        <div class='p-3 text-danger'>
-            <h5>ERRO DE CONEXÃO</h5>
-            <pre>{debug_info}</pre>
-        </div>
-        """, 500
 
     try:
-        # Usar um cursor para a query principal e outro para as queries no loop
-        main_cursor = conn.cursor()
-        lab_cursor = conn.cursor()
-
-        # Use ExistenciasRepository for product details
         enc_forn = session.get('enc_forn', 'S')
         nivel_acesso = session.get('nivel_acesso', 0)
         cd_vend = session.get('cd_vend', session.get('vendedor', ''))
         vendedor = session.get('vendedor', session.get('cd_vend', ''))
-
-        # DEBUG: Show parameters
-        print(f"DEBUG - Executando com parâmetros: codigo={codigo}, enc_forn={enc_forn}")
-        print(f"DEBUG - Sessão: user={session.get('user')}, vendedor={vendedor}, nivel_acesso={nivel_acesso}")
-        
-        # Get product details using repository
-        lotes_data = existencias_repo.get_product_details(codigo, enc_forn)
         
         debug_info['cd_vend'] = cd_vend
         debug_info['vendedor'] = vendedor
         debug_info['nivel_acesso'] = nivel_acesso
         debug_info['nivel_acesso_sessao'] = session.get('nivel_acesso', 'N/A')
 
-        # Convert to dict format and add lab results - using uppercase keys to match template
-        columns = ['RCODIGO', 'RLOTE', 'RLOTEFOR', 'REXIST', 'RSTKDISP', 'RENCCLI', 'RFORNEC', 'RNOMEFOR', 
-                  'RDESCRICAO', 'RTIPOSITUA', 'RPVP1', 'RPVP2', 'RPRECO_UN', 'RMOEDA', 'RCOND_ENTREGA', 
-                  'RCHAVE', 'RTIPONIVEL', 'RNIVEL', 'RPVP3', 'RPVP4', 'RTIPOSITUADESC', 'RCODIGO_COR',
-                  'RARMAZEM', 'RPRECO_COMPRA', 'RSIGLA', 'RFIXACAO', 'RFORMA_PAG_DESC', 'RPRAZO_NDIAS']
-        
-        for row in lotes_data:
-            lote_data = dict(zip(columns, row))
-            
-            # Get lab results using repository
-            lab_results = existencias_repo.get_lab_results(lote_data['RCODIGO'], lote_data['RLOTE'])
-            lote_data['LAB_RESULTS'] = lab_results
-            
-            lotes.append(lote_data)
-            
-        main_cursor.close()
-        lab_cursor.close()
-        conn.close()
+        def render():
+            # Lotes e resultados de laboratório lidos em paralelo (uma query cada)
+            lotes = run_async(lot_panel_service.load_panel(codigo, enc_forn))
+            if not lotes:
+                return None
+            return render_template('_detalhes_lote_partial.html', 
+                                 lotes=lotes, 
+                                 nivel_acesso=nivel_acesso,
+                                 debug=current_app.debug)  # Add app.debug to template context
+
+        # Fragmento em cache por (código, enc_forn, nível de acesso): repetir a expansão não consulta a BD
+        key = ('detalhes_lote', codigo, enc_forn, nivel_acesso, current_app.debug)
+        html, etag = fragment_cache.get_or_render(key, render)
 
         # Se não houver lotes, mostrar mensagem de debug
-        if not lotes:
+        if html is None:
             return f"""
             <div class='p-3 text-warning'>
                 <h5>Nenhum lote encontrado</h5>
@@ -391,15 +307,12 @@ Nível: {nivel_acesso}</pre>
             </div>
             """
 
-        return render_template('_detalhes_lote_partial.html', 
-                             lotes=lotes, 
-                             nivel_acesso=nivel_acesso,
-                             debug=current_app.debug)  # Add app.debug to template context
+        response = make_response(html)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f"private, max-age={CACHE_CONFIG.get('fragment_max_age', 10)}"
+        return response.make_conditional(request)
 
     except Exception as e:
-        if conn:
-            conn.close()
-            
         debug_info['error'] = str(e)
         
         # Mostrar informações de debug detalhadas
@@ -4,8 +4,10 @@ Order management routes for Mobile Sales application
 
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app
 from ..utils import login_required
-from ..database import pedidos_repo
+from ..database import pedidos_repo, artigos_repo, existencias_repo
 from ..database.connection import get_db_connection
+from ..database.executor import parallel, call
+from ..services import access_service
 
 pedidos_bp = Blueprint('pedidos', __name__)
 
@@ -19,7 +21,7 @@ def pedidos():
         vendedor = session.get('vendedor', 0)
         
         # Use PedidosRepository for orders list
-        pedidos_data = pedidos_repo.get_orders_list(vendedor)
+        pedidos_data = pedidos_repo.get_orders_list(access_service.get_scope(vendedor))
         
         # Convert to list of dicts for template use - using uppercase keys to match template
         columns = ['PEDIDO', 'QUANTIDADE', 'PRECO', 'LOTE', 'DESCRICAO', 'CLIENTE', 'ESTADO', 'DT_REGISTO']
@@ -45,7 +47,7 @@ def anular_pedido():
         vendedor = session.get('vendedor', 0)
         
         # Use PedidosRepository for cancellation logic
-        result = pedidos_repo.cancel_order(pedido_num, vendedor)
+        result = pedidos_repo.cancel_order(pedido_num, access_service.get_scope(vendedor))
         
         if result['success']:
             current_app.logger.info(f"Pedido {pedido_num} anulado por utilizador {session.get('user')}")
@@ -120,65 +122,36 @@ def pedido():
     quantidade_disponivel = 0
     precos_produto = {'p_qt1': 0, 'p_qt2': 0}
     
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            
-            # Buscar informações do produto
-            cursor.execute("SELECT Descricao, P_Qt1, P_Qt2 FROM Artigos WHERE Codigo = ?", (codigo,))
-            produto = cursor.fetchone()
-            if produto:
-                produto_info = {
-                    'codigo': codigo,
-                    'descricao': produto[0],
-                    'preco_base': produto[1] or 0,
-                    'preco_alt': produto[2] or 0
-                }
-                precos_produto = {'p_qt1': produto[1] or 0, 'p_qt2': produto[2] or 0}
-            
-            # Buscar quantidade disponível do lote específico - usando configurações de armazém
-            if lote:
-                arm_ini = WAREHOUSE_CONFIG.get('arm_ini', 1)
-                arm_fim = WAREHOUSE_CONFIG.get('arm_fim', 999)
-                
-                cursor.execute("""
-                    SELECT (RExist - REncCli + REncFor) as RStkDisp 
-                    FROM Inq_Exist_Lote_Pda_2(?, ?, ?, ?, 'ACT', 0, '31.12.3000', ?, '31.12.3000', 0, 'S', 1, 2, 2)
-                    WHERE RLote = ?
-                """, (codigo, codigo, arm_ini, arm_fim, session.get('enc_forn', 'S'), lote))
-                resultado = cursor.fetchone()
-                if resultado and resultado[0] > 0:
-                    quantidade_disponivel = resultado[0]
-            
-            # Buscar preços específicos para o lote (se existirem)
-            cursor.execute("SELECT Preco1, Preco2 FROM RelArtLote_Preco WHERE Codigo = ? AND Lote = ?", (codigo, lote))
-            preco_lote = cursor.fetchone()
-            if preco_lote:
-                precos_produto['rel_p_qt1'] = preco_lote[0] or 0
-                precos_produto['rel_p_qt2'] = preco_lote[1] or 0
-            
-            # Buscar lista de clientes do vendedor
-            vendedor = session.get('vendedor', session.get('cd_vend', ''))
-            cursor.execute("""
-                SELECT l.cliente, l.Nome1, c.Situacao, rc2.vendedor
-                FROM Locais_Entrega l
-                LEFT OUTER JOIN clientes c ON c.cliente = l.cliente
-                LEFT OUTER JOIN Rel_Cli_Vend2 rc2 ON rc2.cliente = l.cliente
-                WHERE (c.situacao IN ('ACT', 'MANUT'))
-                AND ((l.vendedor = ?) OR (rc2.vendedor = ?) OR (? = 1))
-                ORDER BY l.Nome1
-            """, (vendedor, vendedor, vendedor))
-            clientes = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            flash(f'Erro ao carregar dados do pedido: {str(e)}', 'error')
-            if conn:
-                conn.close()
-            clientes = []
+    try:
+        # Produto, preços do lote e stock do lote são independentes - consultas em paralelo
+        calls = [
+            call(artigos_repo.get_product_info, codigo),
+            call(artigos_repo.get_product_prices, codigo, lote)
+        ]
+        if lote:
+            warehouses = (WAREHOUSE_CONFIG.get('arm_ini', 1), WAREHOUSE_CONFIG.get('arm_fim', 999))
+            calls.append(call(existencias_repo.get_lot_available, codigo, lote, session.get('enc_forn', 'S'), warehouses))
+        
+        produto, preco_lote, *stock = parallel(*calls)
+        
+        if produto:
+            produto_info = {
+                'codigo': codigo,
+                'descricao': produto['descricao'],
+                'preco_base': produto['p_qt1'],
+                'preco_alt': produto['p_qt2']
+            }
+            precos_produto = {'p_qt1': produto['p_qt1'], 'p_qt2': produto['p_qt2']}
+        
+        quantidade_disponivel = stock[0] if stock else 0
+        
+        # Preços específicos para o lote (se existirem)
+        if preco_lote:
+            precos_produto['rel_p_qt1'] = preco_lote['preco1']
+            precos_produto['rel_p_qt2'] = preco_lote['preco2']
+        
+    except Exception as e:
+        flash(f'Erro ao carregar dados do pedido: {str(e)}', 'error')
     
     # Definir valores padrão se não fornecidos
     if not preco and produto_info:
@@ -206,7 +179,6 @@ def pedido():
                          preco=float(preco or 0),
                          quantidade=float(quant or 0),
                          quantidade_disponivel=quantidade_disponivel,
-                         clientes=clientes,
                          obs=obs)
 
 @pedidos_bp.route('/validapedido', methods=['POST'])
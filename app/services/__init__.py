@@ -0,0 +1,80 @@
+"""
+Service layer for Mobile Sales application
+Cached and composed operations built on top of the repositories
+"""
+
+from ..config import INVALIDATION_CONFIG
+from ..database import (clientes_repo, laboratorio_repo, artigos_repo, pedidos_repo, lembretes_repo,
+                        alteracoes_repo, existencias_repo, auth_repo)
+from ..database.connection import create_connection
+from .access import AccessService
+from .clientes import ClientListService
+from .lab_reports import LabReportService
+from .jobs import JobQueue
+from .sales_stats import SalesStatsService
+from .sales_analytics import SalesAnalyticsService
+from .notifications import ChangeFeed
+from .invalidation import InvalidationBus, FdbEventSource, PollingEventSource
+from .lot_panels import LotPanelService
+from .db_state import DbStateService
+from .fragments import FragmentCache
+
+# Initialize service instances
+access_service = AccessService(clientes_repo)
+client_list_service = ClientListService(clientes_repo, access_service)
+lab_report_service = LabReportService(laboratorio_repo, artigos_repo)
+job_queue = JobQueue()
+sales_stats_service = SalesStatsService(pedidos_repo)
+sales_analytics_service = SalesAnalyticsService(pedidos_repo)
+change_feed = ChangeFeed(lembretes_repo, pedidos_repo)
+lot_panel_service = LotPanelService(existencias_repo)
+db_state_service = DbStateService(auth_repo)
+fragment_cache = FragmentCache()
+
+# Cache invalidation: Firebird events first, change counter polling as fallback
+event_sources = []
+if INVALIDATION_CONFIG.get('enabled'):
+    if INVALIDATION_CONFIG.get('use_events', True):
+        event_sources.append(lambda: FdbEventSource(create_connection))
+    if INVALIDATION_CONFIG.get('use_polling', True):
+        event_sources.append(lambda: PollingEventSource(alteracoes_repo.get_counters, stop=invalidation_bus.stopping))
+invalidation_bus = InvalidationBus(event_sources)
+
+# Client portfolios: own delivery sites (Locais_Entrega) and extra assignments (Rel_Cli_Vend2)
+for table in ('Locais_Entrega', 'Rel_Cli_Vend2'):
+    invalidation_bus.subscribe(table, lambda table: client_list_service.invalidate())
+    invalidation_bus.subscribe(table, lambda table: access_service.invalidate())
+invalidation_bus.subscribe('Pda_Pedidos', lambda table: sales_analytics_service.invalidate())
+invalidation_bus.subscribe('Pda_Pedidos', lambda table: change_feed.wake())
+invalidation_bus.subscribe('Parametros_GC', lambda table: db_state_service.invalidate())
+for table in ('Artigos', 'Lotes', 'Ficha_Lab_Lote', 'Pda_Pedidos'):
+    invalidation_bus.subscribe(table, lambda table: fragment_cache.invalidate('detalhes_lote'))
+
+# Background job handlers
+job_queue.register('lab_pdf', lab_report_service.render_job)
+job_queue.register('lab_email', lab_report_service.email_job)
+
+__all__ = [
+    'AccessService',
+    'ClientListService',
+    'LabReportService',
+    'JobQueue',
+    'SalesStatsService',
+    'SalesAnalyticsService',
+    'ChangeFeed',
+    'InvalidationBus',
+    'LotPanelService',
+    'DbStateService',
+    'FragmentCache',
+    'access_service',
+    'client_list_service',
+    'lab_report_service',
+    'job_queue',
+    'sales_stats_service',
+    'sales_analytics_service',
+    'change_feed',
+    'invalidation_bus',
+    'lot_panel_service',
+    'db_state_service',
+    'fragment_cache'
+]
@@ -0,0 +1,37 @@
+"""
+Vendor access scopes for Mobile Sales application
+The AccessScope of a vendor (rules plus client portfolio) is built at login
+and cached, so requests hand a precomputed scope to the repositories instead
+of re-deriving the vendor rules in every query.
+"""
+
+from ..config import CACHE_CONFIG
+from ..database.connection import DatabaseError
+from ..database.scope import AccessScope
+from ..utils.cache import TTLCache
+
+
+class AccessService:
+    """Builds and caches one AccessScope per vendor"""
+
+    def __init__(self, clientes_repository, ttl: float = None):
+        self.clientes_repository = clientes_repository
+        self.cache = TTLCache('access_scope', ttl or CACHE_CONFIG.get('access_scope_ttl', 900))
+
+    def _build(self, vendedor: int) -> AccessScope:
+        scope = AccessScope.for_vendor(vendedor)
+        if scope.all_clients:
+            return scope
+        return AccessScope.for_vendor(vendedor, self.clientes_repository.get_portfolio_client_ids(vendedor))
+
+    def get_scope(self, vendedor: int) -> AccessScope:
+        return self.cache.get_or_load(vendedor, lambda: self._build(vendedor), stale_on=(DatabaseError,))
+
+    def refresh(self, vendedor: int) -> AccessScope:
+        """Rebuild the vendor's scope (on login)"""
+        scope = self._build(vendedor)
+        self.cache.set(vendedor, scope)
+        return scope
+
+    def invalidate(self, vendedor: int = None):
+        self.cache.invalidate(vendedor)
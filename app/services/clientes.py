@@ -0,0 +1,77 @@
+"""
+Cached vendor -> client list service
+Shared by mapabordocli, pedido and nova_cotacao client pickers. The order and
+quotation forms keep their own rule: only ORDER_CLIENTS_ALL see every client.
+"""
+
+from typing import List, Tuple
+from ..config import CACHE_CONFIG
+from ..database.connection import DatabaseError
+from ..utils.cache import TTLCache
+
+# Scope key shared by every vendor that sees the full client list
+ALL_CLIENTS = '*'
+
+
+class ClientList:
+    """Compact client list with a precomputed upper-case search key per row"""
+
+    __slots__ = ('items', 'keys')
+
+    def __init__(self, items: List[Tuple[str, str]]):
+        self.items = items
+        self.keys = [f"{cliente} {nome}".upper() for cliente, nome in items]
+
+
+class ClientListService:
+    """Serves vendor-scoped client lists from an in-process TTL cache"""
+
+    def __init__(self, repository, access_service, ttl: float = None):
+        self.repository = repository
+        self.access_service = access_service
+        self.cache = TTLCache('client_list', ttl or CACHE_CONFIG.get('client_list_ttl', 300))
+
+    def _sees_all(self, vendedor: int, for_orders: bool = False) -> bool:
+        # Order and quotation forms: only ORDER_CLIENTS_ALL; elsewhere every vendor with a client level
+        scope = self.access_service.get_scope(vendedor)
+        return scope.all_order_clients if for_orders else scope.all_clients
+
+    def scope_key(self, vendedor: int, for_orders: bool = False):
+        """Admins share a single cached list; everybody else is cached per vendor"""
+        if self._sees_all(vendedor, for_orders):
+            return ALL_CLIENTS
+        return vendedor
+
+    def _get_list(self, vendedor: int, for_orders: bool = False) -> ClientList:
+        # While the database is unavailable the last loaded list is served
+        key = self.scope_key(vendedor, for_orders)
+        return self.cache.get_or_load(key, lambda: self._load(vendedor, key == ALL_CLIENTS),
+                                      stale_on=(DatabaseError,))
+
+    def _load(self, vendedor: int, all_clients: bool) -> ClientList:
+        scope = self.access_service.get_scope(vendedor)
+        rows = self.repository.get_clients_for_vendor(scope, all_clients=all_clients) or []
+        return ClientList([(row[0], (row[1] or '').strip()) for row in rows])
+
+    def get_clients(self, vendedor: int, for_orders: bool = False) -> List[Tuple[str, str]]:
+        """Return compact (cliente, nome) tuples visible to vendor (for_orders: order/quotation forms)"""
+        return self._get_list(vendedor, for_orders).items
+
+    def search(self, vendedor: int, q: str = '', offset: int = 0, limit: int = 50,
+               for_orders: bool = False) -> Tuple[int, List[Tuple[str, str]]]:
+        """Filter the cached list by code/name and return (total, page)"""
+        client_list = self._get_list(vendedor, for_orders)
+        q = (q or '').strip().upper()
+        if q:
+            matches = [item for item, key in zip(client_list.items, client_list.keys) if q in key]
+        else:
+            matches = client_list.items
+        return len(matches), matches[offset:offset + limit]
+
+    def invalidate(self, vendedor: int = None):
+        """Drop cached list for vendor, or every list when vendedor is None"""
+        if vendedor is None:
+            self.cache.invalidate()
+        else:
+            for key in {self.scope_key(vendedor), self.scope_key(vendedor, for_orders=True)}:
+                self.cache.invalidate(key)
@@ -0,0 +1,29 @@
+"""
+Database state (maintenance flag) for Mobile Sales application
+Parametros_GC.BD_ESTADO is checked on every login; it is cached for a short
+TTL and dropped by the invalidation bus when Parametros_GC changes.
+"""
+
+from typing import Optional
+from ..config import CACHE_CONFIG
+from ..database.connection import DatabaseError
+from ..utils.cache import TTLCache
+
+MAINTENANCE = 'MANUTENCAO'
+
+
+class DbStateService:
+    """Cached BD_ESTADO flag"""
+
+    def __init__(self, repository, ttl: float = None):
+        self.repository = repository
+        self.cache = TTLCache('db_state', ttl or CACHE_CONFIG.get('db_state_ttl', 30), max_entries=1)
+
+    def get_state(self) -> Optional[str]:
+        return self.cache.get_or_load('BD_ESTADO', self.repository.get_db_state, stale_on=(DatabaseError,))
+
+    def in_maintenance(self) -> bool:
+        return self.get_state() == MAINTENANCE
+
+    def invalidate(self):
+        self.cache.invalidate()
@@ -0,0 +1,44 @@
+"""
+Rendered fragment cache for Mobile Sales application
+HTML partials are cached with a short TTL together with their ETag, so a
+repeated request is a dictionary lookup and a browser revalidation is a 304.
+Keys are tuples whose first item names the fragment, which lets the
+invalidation bus drop every variant of one fragment at once.
+"""
+
+import hashlib
+from typing import Callable, Hashable, Optional, Tuple
+
+from ..config import CACHE_CONFIG
+from ..utils.cache import TTLCache
+
+
+class FragmentCache:
+    """(html, etag) per fragment key in an in-process TTL cache"""
+
+    def __init__(self, ttl: float = None, max_entries: int = 512):
+        self.cache = TTLCache('fragments', ttl or CACHE_CONFIG.get('fragment_ttl', 60), max_entries)
+
+    @staticmethod
+    def make_etag(html: str) -> str:
+        return hashlib.sha1(html.encode('utf-8')).hexdigest()[:16]
+
+    def get_or_render(self, key: Tuple[Hashable, ...], render: Callable[[], Optional[str]]) -> Tuple[Optional[str], Optional[str]]:
+        """Cached (html, etag), rendering on a miss; a render returning None is not cached"""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        html = render()
+        if html is None:
+            return None, None
+        entry = (html, self.make_etag(html))
+        self.cache.set(key, entry)
+        return entry
+
+    def invalidate(self, fragment: str = None):
+        """Drop every variant of a fragment, or everything when fragment is None"""
+        if fragment is None:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate_where(lambda key: key[0] == fragment)
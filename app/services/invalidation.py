@@ -0,0 +1,180 @@
+"""
+Cache invalidation bus for Mobile Sales application
+One listener thread per worker waits for table change notifications and
+calls the invalidation callbacks registered by the in-process caches.
+Notifications come from Firebird events (fdb event conduits) when available,
+otherwise from polling the per-table change counters.
+"""
+
+import logging
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List
+
+from ..config import INVALIDATION_CONFIG
+from ..database.repositories.alteracoes import WATCHED_TABLES, event_name
+
+logger = logging.getLogger(__name__)
+
+
+class EventSource:
+    """Interface: wait(timeout) returns the tables that changed (possibly empty)"""
+
+    def wait(self, timeout: float) -> List[str]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FdbEventSource(EventSource):
+    """Firebird POST_EVENT notifications through an fdb event conduit"""
+
+    def __init__(self, connect: Callable, tables: List[str] = None):
+        self.tables = {event_name(table): table for table in tables or WATCHED_TABLES}
+        self.connection = connect()
+        self.conduit = self.connection.event_conduit(list(self.tables))
+        self.conduit.begin()
+
+    def wait(self, timeout: float) -> List[str]:
+        counts = self.conduit.wait(timeout) or {}
+        return [self.tables[name] for name, count in counts.items() if count and name in self.tables]
+
+    def close(self):
+        for resource in (self.conduit, self.connection):
+            try:
+                resource.close()
+            except Exception:
+                pass
+
+
+class PollingEventSource(EventSource):
+    """Fallback: compare the per-table change counters every interval
+
+    A counter moves before the writing transaction commits, so each change is
+    reported again on the following poll; a reload that raced the commit and
+    cached old data is then invalidated once more.
+    """
+
+    def __init__(self, get_counters: Callable[[], Dict[str, int]], stop: threading.Event = None):
+        self.get_counters = get_counters
+        # The bus's stop event ends a wait early (InvalidationBus.stop does not wait a whole interval)
+        self.stop = stop or threading.Event()
+        self.counters = get_counters()
+        self.settling: List[str] = []
+
+    def wait(self, timeout: float) -> List[str]:
+        if self.stop.wait(timeout):
+            return []
+        counters = self.get_counters()
+        changed = [table for table, value in counters.items() if self.counters.get(table) != value]
+        self.counters = counters
+
+        result = sorted(set(changed) | set(self.settling))
+        self.settling = changed
+        return result
+
+
+class FakeEventSource(EventSource):
+    """In-memory source for tests and scripts: fire() tables, wait() returns them"""
+
+    def __init__(self):
+        self.pending = queue.Queue()
+
+    def fire(self, *tables: str):
+        self.pending.put(list(tables))
+
+    def wait(self, timeout: float) -> List[str]:
+        try:
+            tables = self.pending.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        while not self.pending.empty():
+            tables.extend(self.pending.get_nowait())
+        return tables
+
+
+class InvalidationBus:
+    """Routes table change notifications to in-process cache callbacks"""
+
+    def __init__(self, source_factories: Iterable[Callable[[], EventSource]] = (),
+                 poll_interval: float = None, retry_delay: float = None):
+        self.source_factories = list(source_factories)
+        self.poll_interval = poll_interval or INVALIDATION_CONFIG.get('poll_interval', 10)
+        self.retry_delay = retry_delay or INVALIDATION_CONFIG.get('retry_delay', 30)
+
+        self.callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def stopping(self) -> threading.Event:
+        """Set by stop(); sources that sleep between checks should wait on it"""
+        return self._stop
+
+    def subscribe(self, table: str, callback: Callable[[str], None]):
+        """Call callback(table) whenever table changes"""
+        self.callbacks.setdefault(table, []).append(callback)
+
+    def publish(self, *tables: str):
+        """Run the callbacks of each changed table (also usable directly after local writes)"""
+        for table in tables:
+            for callback in self.callbacks.get(table, []):
+                try:
+                    callback(table)
+                except Exception as e:
+                    logger.error(f"Invalidation callback for {table} failed: {e}")
+
+    def start(self):
+        """Start the listener thread in this process (restarts it after a fork)"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            if not self.source_factories:
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='invalidation-bus', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _open_source(self) -> EventSource:
+        """First source that can be opened, in preference order"""
+        errors = []
+        for factory in self.source_factories:
+            try:
+                return factory()
+            except Exception as e:
+                errors.append(str(e))
+        raise RuntimeError('; '.join(errors) or 'no event source')
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                source = self._open_source()
+            except Exception as e:
+                logger.error(f"Invalidation bus cannot open an event source: {e}")
+                self._stop.wait(self.retry_delay)
+                continue
+
+            logger.info(f"Invalidation bus listening with {type(source).__name__}")
+            try:
+                while not self._stop.is_set():
+                    tables = source.wait(self.poll_interval)
+                    if tables:
+                        self.publish(*sorted(set(tables)))
+            except Exception as e:
+                # Lost connection: everything may have changed meanwhile
+                logger.error(f"Invalidation bus source failed, reconnecting: {e}")
+                self.publish(*self.callbacks)
+                self._stop.wait(self.retry_delay)
+            finally:
+                source.close()
@@ -0,0 +1,222 @@
+"""
+Background job queue for Mobile Sales application
+SQLite-backed queue processed by worker threads, with retries and status polling.
+Several gunicorn workers can share the same queue file; each claim is atomic
+and holds a lease, so jobs of a worker that died mid-run are picked up again.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from ..config import JOBS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueue:
+    """Persistent job queue with a lazily started pool of worker threads"""
+
+    def __init__(self, db_path: str = None, workers: int = None, max_attempts: int = None,
+                 retry_delay: float = None, poll_interval: float = None, lease: float = None):
+        self.db_path = db_path or JOBS_CONFIG.get('db_path', '/tmp/mobile_sales_jobs.sqlite3')
+        self.workers = workers or JOBS_CONFIG.get('workers', 2)
+        self.max_attempts = max_attempts or JOBS_CONFIG.get('max_attempts', 3)
+        self.retry_delay = retry_delay if retry_delay is not None else JOBS_CONFIG.get('retry_delay', 30)
+        self.poll_interval = poll_interval or JOBS_CONFIG.get('poll_interval', 1.0)
+        self.lease = lease or JOBS_CONFIG.get('lease', 600)
+
+        self.handlers: Dict[str, Callable[[Dict], Any]] = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self._schema_ready = False
+
+    def register(self, kind: str, handler: Callable[[Dict], Any]):
+        """Register handler(payload) -> JSON-serialisable result for a job kind"""
+        self.handlers[kind] = handler
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    owner TEXT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    run_after REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claimed_at REAL
+                )
+            """)
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN claimed_at REAL")
+            except sqlite3.OperationalError:
+                # Column already exists, that's ok
+                pass
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_pending ON jobs (status, run_after)")
+            self._schema_ready = True
+        return conn
+
+    def enqueue(self, kind: str, payload: Dict, owner: str = None) -> str:
+        """Queue a job and return its id immediately"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("""
+                INSERT INTO jobs (id, kind, owner, payload, status, attempts, created_at, run_after, updated_at)
+                VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)
+            """, (job_id, kind, owner, json.dumps(payload), QUEUED, now, now, now))
+        finally:
+            conn.close()
+
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def get_status(self, job_id: str, owner: str = None) -> Optional[Dict]:
+        """Return job status dict, or None if unknown (or owned by someone else)"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if not row or (owner is not None and row['owner'] != owner):
+            return None
+
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+
+    def start(self):
+        """Start worker threads in this process (restarts them after a fork)"""
+        with self._lock:
+            if self._pid == os.getpid() and any(t.is_alive() for t in self._threads):
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._threads = []
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5):
+        """Stop worker threads (used by scripts and shutdown hooks)"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Atomically move the oldest runnable job to RUNNING
+
+        RUNNING jobs whose lease expired (their worker was killed or recycled)
+        count as a failed attempt: they are queued again, or marked FAILED
+        once max_attempts is reached.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            conn.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    error = 'Lease expired', run_after = ?, updated_at = ?
+                WHERE status = ? AND COALESCE(claimed_at, updated_at) < ?
+            """, (self.max_attempts, FAILED, QUEUED, now, now, RUNNING, now - self.lease))
+            row = conn.execute("""
+                SELECT * FROM jobs
+                WHERE status = ? AND run_after <= ?
+                ORDER BY created_at
+                LIMIT 1
+            """, (QUEUED, now)).fetchone()
+            if row:
+                conn.execute("""
+                    UPDATE jobs SET status = ?, attempts = attempts + 1, claimed_at = ?, updated_at = ?
+                    WHERE id = ?
+                """, (RUNNING, now, now, row['id']))
+            conn.execute("COMMIT")
+            return row
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: str = None, run_after: float = None):
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute("""
+                UPDATE jobs SET status = ?, result = ?, error = ?, run_after = COALESCE(?, run_after), updated_at = ?
+                WHERE id = ?
+            """, (status, json.dumps(result) if result is not None else None, error, run_after, now, job_id))
+        finally:
+            conn.close()
+
+    def _run(self, row: sqlite3.Row):
+        attempts = row['attempts'] + 1
+        try:
+            handler = self.handlers[row['kind']]
+            result = handler(json.loads(row['payload']))
+            self._finish(row['id'], DONE, result=result)
+        except Exception as e:
+            if attempts < self.max_attempts:
+                logger.warning(f"Job {row['id']} ({row['kind']}) attempt {attempts} failed, retrying: {e}")
+                self._finish(row['id'], QUEUED, error=str(e), run_after=time.time() + self.retry_delay * attempts)
+            else:
+                logger.error(f"Job {row['id']} ({row['kind']}) failed after {attempts} attempts: {e}")
+                self._finish(row['id'], FAILED, error=str(e))
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                row = self._claim()
+            except Exception as e:
+                logger.error(f"Job queue claim failed: {e}")
+                row = None
+
+            if row is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._run(row)
@@ -0,0 +1,344 @@
+"""
+Laboratory report PDF rendering service
+Styles and table layouts are built once per process; generated PDFs are
+kept in an on-disk cache keyed by (codigo, lote, nr_relatorio)
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ..config import CACHE_CONFIG
+from .mailer import send_email
+
+logger = logging.getLogger(__name__)
+
+# Report layouts
+RISATEL = 'risatel'    # Relatório resumo completo (api.laboratorio_pdf)
+SUMMARY = 'summary'    # Tabela resumida enviada por email
+
+
+class LabReportRenderer:
+    """Builds lab report PDFs with reportlab, reusing compiled styles"""
+
+    def __init__(self, format_value):
+        self.format_value = format_value
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _build_templates(self):
+        """Import reportlab and compile styles/table layouts (once per process)"""
+        with self._lock:
+            if self._ready:
+                return
+
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.units import cm, inch
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+            self.A4 = A4
+            self.SimpleDocTemplate = SimpleDocTemplate
+            self.Table = Table
+            self.Paragraph = Paragraph
+            self.Spacer = Spacer
+            self.PageBreak = PageBreak
+            self.cm = cm
+
+            styles = getSampleStyleSheet()
+            self.styles = {
+                'normal': styles['Normal'],
+                'header': ParagraphStyle('Header', parent=styles['Normal'], fontSize=14, alignment=1, spaceAfter=10),
+                'subheader': ParagraphStyle('SubHeader', parent=styles['Normal'], fontSize=12, alignment=1, spaceAfter=20),
+                'obs': ParagraphStyle('Obs', parent=styles['Normal'], fontSize=10, spaceAfter=10),
+                'footer': ParagraphStyle('Footer', parent=styles['Normal'], fontSize=10, alignment=1),
+                'title': ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=16, spaceAfter=30, alignment=1),
+            }
+
+            self.header_widths = [3*cm, 4*cm, 2*cm, 3*cm]
+            self.header_style = TableStyle([
+                ('BOX', (0, 0), (-1, -1), 1, colors.black),
+                ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.black),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                # Span the description across 3 columns (from column 1 to 3)
+                ('SPAN', (1, 3), (3, 3)),
+            ])
+
+            self.main_widths = [3*cm, 1.5*cm, 2.5*cm, 1.5*cm, 2*cm, 1.5*cm]
+            self.main_style = TableStyle([
+                ('BOX', (0, 0), (-1, -1), 1, colors.black),
+                ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.black),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+                ('ALIGN', (3, 0), (3, -1), 'CENTER'),
+                ('ALIGN', (5, 0), (5, -1), 'CENTER'),
+            ])
+
+            self.summary_widths = [1.5*inch, 1*inch, 0.8*inch, 1*inch]
+            self.summary_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), colors.white),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+                ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 11),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+            ])
+
+            self._ready = True
+
+    def risatel_elements(self, lab_data: Dict, info_artigo: Optional[Dict], codigo: str, lote: str) -> list:
+        """Flowables for one RISATEL-format report page"""
+        self._build_templates()
+        fmt = self.format_value
+        styles = self.styles
+        elements = []
+
+        # Title
+        elements.append(self.Paragraph("ANÁLISE LABORATORIAL", styles['header']))
+        elements.append(self.Paragraph("RELATÓRIO RESUMO", styles['subheader']))
+
+        # Header info table (matching PDF format)
+        header_data = [
+            ['Relatório Nº:', str(lab_data.get('nr_relatorio', 'N/A')), 'Data:', str(lab_data.get('data_registo', datetime.now().strftime('%d-%m-%Y')))],
+            ['Lote:', str(lab_data.get('lote', lote)), '', ''],
+            ['Codigo do artigo:', str(lab_data.get('codigo', codigo)), '', ''],
+            ['Descrição:', str(info_artigo.get('descricao', '') if info_artigo else ''), '', '']
+        ]
+        header_table = self.Table(header_data, colWidths=self.header_widths)
+        header_table.setStyle(self.header_style)
+        elements.append(header_table)
+        elements.append(self.Spacer(1, 20))
+
+        # Humidade and Ne section
+        humidade_ne_data = [
+            ['Humidade Relativa (HR%) :', fmt(lab_data.get('hr')), 'Ne :', fmt(lab_data.get('ne_valor')), 'CV% :', fmt(lab_data.get('ne_cv'))]
+        ]
+
+        # Características de Uster section
+        uster_data = [
+            ['Características de Uster', '', '', '', '', ''],
+            ['U% :', fmt(lab_data.get('uster_u')), 'CVm% :', fmt(lab_data.get('uster_cvm')), '', ''],
+            ['Pontos Finos (-40%) :', fmt(lab_data.get('uster_pnt_finos_40')), 'Pontos Finos (-50%) :', fmt(lab_data.get('uster_pnt_finos')), '', ''],
+            ['Pontos Grossos (+35%) :', fmt(lab_data.get('uster_pnt_grossos_35')), 'Pontos Grossos (+50%) :', fmt(lab_data.get('uster_pnt_grossos')), '', ''],
+            ['Neps (+140%) :', fmt(lab_data.get('uster_neps_1')), 'Neps (+200%) :', fmt(lab_data.get('uster_neps_2')), '', ''],
+            ['Pilosidade (H) :', fmt(lab_data.get('uster_pilosidade')), 'CV% :', fmt(lab_data.get('uster_pilosidade_cv')), '', '']
+        ]
+
+        # RKM section
+        rkm_data = [
+            ['RKM (TensoRapid) :', fmt(lab_data.get('rkm_valor')), 'CV% :', fmt(lab_data.get('rkm_cv')), 'RKM (Tenac) :', fmt(lab_data.get('rkm_valor_tenac'))],
+            ['Alongamento % :', fmt(lab_data.get('rkm_along_valor')), 'CV% :', fmt(lab_data.get('rkm_along_cv')), '', '']
+        ]
+
+        # Torção section - only if single thread
+        torcao_data = []
+        if lab_data.get('nr_fios') == 1:
+            torcao_data = [
+                ['Torção Z (Singelo)', '', 'Retorção S', '', '', ''],
+                ['TPI :', fmt(lab_data.get('torcao_tpi_valor')), 'Alfa :', fmt(lab_data.get('torcao_tpi_alfa')), 'CV% :', fmt(lab_data.get('torcao_tpi_cv'))],
+                ['', '', 'TPI :', fmt(lab_data.get('torcao_tpi_valor_s')), 'CV% :', fmt(lab_data.get('torcao_tpi_cv_s'))]
+            ]
+
+        blank = [['', '', '', '', '', '']]
+        main_data = humidade_ne_data + blank + uster_data + blank + rkm_data
+        if torcao_data:
+            main_data += blank + torcao_data
+
+        main_table = self.Table(main_data, colWidths=self.main_widths)
+        main_table.setStyle(self.main_style)
+        elements.append(main_table)
+
+        # Observations section - separate from main grid
+        elements.append(self.Spacer(1, 30))
+        elements.append(self.Paragraph("<b>Obs.:</b> Os resultados são valores médios actuais após acondicionamento do fio.", styles['obs']))
+        if lab_data.get('observacao'):
+            elements.append(self.Paragraph(f"<b>Observações:</b> {str(lab_data.get('observacao'))}", styles['obs']))
+
+        # Footer
+        elements.append(self.Spacer(1, 40))
+        elements.append(self.Paragraph("Laboratório de Controlo da Qualidade", styles['footer']))
+
+        return elements
+
+    def summary_elements(self, lab_data: Dict, info_artigo: Optional[Dict], codigo: str, lote: str, process_type: str) -> list:
+        """Flowables for the short results table sent by email"""
+        self._build_templates()
+        fmt = self.format_value
+        styles = self.styles
+        elements = [self.Paragraph("Resultados Laboratoriais", styles['title'])]
+
+        if info_artigo:
+            elements.append(self.Paragraph(f"<b>Produto:</b> {codigo}<br/><b>Descrição:</b> {info_artigo['descricao']}<br/><b>Lote:</b> {lote}", styles['normal']))
+            elements.append(self.Spacer(1, 20))
+
+        table_data = [
+            ['Ne', fmt(lab_data['ne_valor']), 'Cv %', fmt(lab_data['ne_cv'])],
+            ['Cvm %', fmt(lab_data['uster_cvm']), '', ''],
+            ['PF -50%', fmt(lab_data['uster_pnt_finos']), '', ''],
+            ['PG +50%', fmt(lab_data['uster_pnt_grossos']), '', ''],
+        ]
+
+        # Neps based on process type
+        if process_type == 'O':
+            table_data.append(['N +280%', fmt(lab_data['uster_neps_3']), '', ''])
+        else:
+            table_data.append(['N +200%', fmt(lab_data['uster_neps_2']), '', ''])
+
+        table_data.append(['Rkm', fmt(lab_data['rkm_valor']), 'Cv %', fmt(lab_data['rkm_cv'])])
+
+        # Torsion
+        if lab_data['nr_fios'] == 1:
+            table_data.append(['Torção', fmt(lab_data['torcao_tpi_valor']), str(lab_data['tipo_torcao'] or ''), ''])
+        else:
+            table_data.append(['Retorção', fmt(lab_data['torcao_tpi_valor_s']), str(lab_data['tipo_torcao_s'] or ''), ''])
+
+        table_data.append(['Pilosidade', fmt(lab_data['uster_pilosidade']), 'Cv %', fmt(lab_data['uster_pilosidade_cv'])])
+
+        table = self.Table(table_data, colWidths=self.summary_widths)
+        table.setStyle(self.summary_style)
+        elements.append(table)
+
+        return elements
+
+    def build(self, elements: list, layout: str = RISATEL) -> bytes:
+        """Run one reportlab document build and return the PDF bytes"""
+        self._build_templates()
+        buffer = io.BytesIO()
+        if layout == SUMMARY:
+            doc = self.SimpleDocTemplate(buffer, pagesize=self.A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+        else:
+            cm = self.cm
+            doc = self.SimpleDocTemplate(buffer, pagesize=self.A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
+        doc.build(elements)
+        return buffer.getvalue()
+
+
+class LabReportService:
+    """Lab report PDFs with an on-disk cache invalidated by new report numbers"""
+
+    def __init__(self, repository, artigos_repository, cache_dir: str = None):
+        self.repository = repository
+        self.artigos_repository = artigos_repository
+        self.cache_dir = cache_dir or CACHE_CONFIG.get('lab_pdf_dir', '/tmp/mobile_sales_lab_pdf')
+        self.renderer = LabReportRenderer(repository.format_lab_value)
+
+    def _lot_dir(self, codigo: str, lote: str) -> str:
+        lot_key = hashlib.sha1(f"{codigo}|{lote}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, lot_key[:2], lot_key)
+
+    def _file_name(self, layout: str, nr_relatorio, variant: str = '') -> str:
+        digest = hashlib.sha1(f"{layout}|{nr_relatorio}|{variant}".encode('utf-8')).hexdigest()[:16]
+        return f"{nr_relatorio}_{layout}_{digest}.pdf"
+
+    def _read_cache(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_cache(self, lot_dir: str, file_name: str, nr_relatorio, pdf: bytes):
+        """Store PDF atomically and drop files from older report numbers"""
+        try:
+            os.makedirs(lot_dir, exist_ok=True)
+            tmp_path = os.path.join(lot_dir, f".{file_name}.{os.getpid()}.{threading.get_ident()}")
+            with open(tmp_path, 'wb') as f:
+                f.write(pdf)
+            os.replace(tmp_path, os.path.join(lot_dir, file_name))
+
+            prefix = f"{nr_relatorio}_"
+            for name in os.listdir(lot_dir):
+                if not name.startswith(prefix) and not name.startswith('.'):
+                    try:
+                        os.remove(os.path.join(lot_dir, name))
+                    except OSError:
+                        pass
+        except OSError as e:
+            logger.warning(f"Lab PDF cache write failed ({lot_dir}): {e}")
+
+    def get_pdf(self, codigo: str, lote: str, layout: str = RISATEL, process_type: str = 'O') -> Optional[bytes]:
+        """Return the PDF for the latest report of (codigo, lote), or None if there is none"""
+        nr_relatorio = self.repository.get_latest_report_number(codigo, lote)
+        if nr_relatorio is None:
+            return None
+
+        variant = process_type if layout == SUMMARY else ''
+        lot_dir = self._lot_dir(codigo, lote)
+        file_name = self._file_name(layout, nr_relatorio, variant)
+
+        pdf = self._read_cache(os.path.join(lot_dir, file_name))
+        if pdf is not None:
+            return pdf
+
+        lab_data = self.repository.get_lab_results(codigo, lote)
+        if not lab_data:
+            return None
+        info_artigo = self.artigos_repository.get_product_info(codigo)
+
+        if layout == SUMMARY:
+            elements = self.renderer.summary_elements(lab_data, info_artigo, codigo, lote, process_type)
+        else:
+            elements = self.renderer.risatel_elements(lab_data, info_artigo, codigo, lote)
+        pdf = self.renderer.build(elements, layout)
+
+        # Cache under the report number actually rendered
+        self._write_cache(lot_dir, self._file_name(layout, lab_data.get('nr_relatorio'), variant),
+                          lab_data.get('nr_relatorio'), pdf)
+        return pdf
+
+    def get_bundle_pdf(self, codigo: str, lotes: List[str] = None, max_lots: int = 100) -> Optional[bytes]:
+        """One multi-page RISATEL PDF for many lots: one query, one document build"""
+        if not lotes:
+            lotes = self.repository.get_lab_lots(codigo, max_lots)
+        lotes = [str(lote).strip() for lote in lotes if lote is not None and str(lote).strip()][:max_lots]
+
+        lab_by_lot = self.repository.get_lab_results_for_lots(codigo, lotes)
+        if not lab_by_lot:
+            return None
+        info_artigo = self.artigos_repository.get_product_info(codigo)
+
+        elements = []
+        for lote in lotes:
+            lab_data = lab_by_lot.get(lote)
+            if not lab_data:
+                continue
+            if elements:
+                elements.append(self.renderer.PageBreak())
+            elements.extend(self.renderer.risatel_elements(lab_data, info_artigo, codigo, lote))
+
+        return self.renderer.build(elements, RISATEL)
+
+    def render_job(self, payload: Dict) -> Dict:
+        """Job handler: render (and cache) a report PDF"""
+        pdf = self.get_pdf(payload['codigo'], payload['lote'], payload.get('layout', RISATEL),
+                           payload.get('process_type', 'O'))
+        if pdf is None:
+            raise ValueError('Nenhum resultado laboratorial encontrado')
+        return {'size': len(pdf)}
+
+    def email_job(self, payload: Dict) -> Dict:
+        """Job handler: render the summary PDF and send it by email"""
+        codigo = payload['codigo']
+        lote = payload['lote']
+        pdf = self.get_pdf(codigo, lote, SUMMARY, payload.get('process_type', 'O'))
+        if pdf is None:
+            raise ValueError('Nenhum resultado laboratorial encontrado')
+
+        subject = f"Resultados Laboratoriais - {codigo} (Lote: {lote})"
+        body = payload.get('message') or f"Segue em anexo os resultados laboratoriais do artigo {codigo}, lote {lote}."
+        send_email(payload['email'], subject, body,
+                   [(f"resultados_laboratoriais_{codigo}_{lote}.pdf", pdf, 'application/pdf')])
+        return {'email': payload['email'], 'size': len(pdf)}
@@ -0,0 +1,37 @@
+"""
+Lot detail panels for Mobile Sales application
+The independent reads behind a panel are awaited concurrently on the
+database thread pool, so the panel costs the slowest query, not their sum.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+from ..database.executor import run_in_pool
+
+# Columns returned by ExistenciasRepository.get_product_details
+DETAIL_COLUMNS = ['RCODIGO', 'RLOTE', 'RLOTEFOR', 'REXIST', 'RSTKDISP', 'RENCCLI', 'RFORNEC', 'RNOMEFOR',
+                  'RDESCRICAO', 'RTIPOSITUA', 'RPVP1', 'RPVP2', 'RPRECO_UN', 'RMOEDA', 'RCOND_ENTREGA',
+                  'RCHAVE', 'RTIPONIVEL', 'RNIVEL', 'RPVP3', 'RPVP4', 'RTIPOSITUADESC', 'RCODIGO_COR',
+                  'RARMAZEM', 'RPRECO_COMPRA', 'RSIGLA', 'RFIXACAO', 'RFORMA_PAG_DESC', 'RPRAZO_NDIAS']
+
+
+class LotPanelService:
+    """Concurrent composition of lot detail panels"""
+
+    def __init__(self, existencias_repository):
+        self.existencias_repository = existencias_repository
+
+    async def load_panel(self, codigo: str, enc_forn: str = 'S') -> List[Dict[str, Any]]:
+        """Lots of a product with their latest lab results (stock and lab read concurrently)"""
+        lotes_data, lab_by_lot = await asyncio.gather(
+            run_in_pool(self.existencias_repository.get_product_details, codigo, enc_forn),
+            run_in_pool(self.existencias_repository.get_lab_results_by_lot, codigo)
+        )
+
+        lotes = []
+        for row in lotes_data or []:
+            lote = dict(zip(DETAIL_COLUMNS, row))
+            lote['LAB_RESULTS'] = lab_by_lot.get(str(lote['RLOTE'] or '').strip())
+            lotes.append(lote)
+        return lotes
@@ -0,0 +1,33 @@
+"""
+Outgoing email for Mobile Sales application
+Plain smtplib client configured by SMTP_CONFIG. For local testing point it at
+a stand-in server, e.g. `python -m aiosmtpd -n -l localhost:1025` with
+SMTP_CONFIG['host'] = 'localhost' and SMTP_CONFIG['port'] = 1025.
+"""
+
+from email.message import EmailMessage
+from typing import List, Tuple
+
+from ..config import SMTP_CONFIG
+
+
+def send_email(to: str, subject: str, body: str, attachments: List[Tuple[str, bytes, str]] = None):
+    """Send an email; attachments are (filename, content, mime_type) tuples"""
+    import smtplib   # only loaded by the job worker that sends mail
+    message = EmailMessage()
+    message['From'] = SMTP_CONFIG.get('sender', 'mobile_sales@localhost')
+    message['To'] = to
+    message['Subject'] = subject
+    message.set_content(body)
+
+    for filename, content, mime_type in attachments or []:
+        maintype, subtype = mime_type.split('/', 1)
+        message.add_attachment(content, maintype=maintype, subtype=subtype, filename=filename)
+
+    with smtplib.SMTP(SMTP_CONFIG.get('host', 'localhost'), SMTP_CONFIG.get('port', 25),
+                      timeout=SMTP_CONFIG.get('timeout', 30)) as smtp:
+        if SMTP_CONFIG.get('use_tls'):
+            smtp.starttls()
+        if SMTP_CONFIG.get('user'):
+            smtp.login(SMTP_CONFIG['user'], SMTP_CONFIG.get('password', ''))
+        smtp.send_message(message)
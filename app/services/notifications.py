@@ -0,0 +1,169 @@
+"""
+Real-time notifications for Mobile Sales application
+One shared poller per worker process looks for new reminders (Lembretes) and
+order state changes (Pda_Pedidos.Estado) once per interval and fans the
+events out to every connected Server-Sent Events subscriber.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config import NOTIFY_CONFIG
+from ..database.executor import request_threads
+
+logger = logging.getLogger(__name__)
+
+# Event names sent to the browser
+LEMBRETE = 'lembrete'
+PEDIDO = 'pedido'
+
+
+def default_max_subscribers() -> int:
+    """Half of a worker's request threads (see gunicorn.conf.py): each open stream holds one"""
+    return max(1, request_threads() // 2)
+
+
+class Subscription:
+    """One connected client: a bounded queue of pending events"""
+
+    def __init__(self, utilizador: str, vendedor: int, ver_todos: bool = False, max_pending: int = 100):
+        self.utilizador = utilizador
+        self.vendedor = vendedor
+        self.ver_todos = ver_todos
+        self.events = queue.Queue(maxsize=max_pending)
+
+    def push(self, event: str, data: Dict[str, Any]):
+        try:
+            self.events.put_nowait((event, data))
+        except queue.Full:
+            # Slow client: drop the event, the page still has its own refresh
+            pass
+
+    def next_event(self, timeout: float) -> Optional[tuple]:
+        """Wait for the next (event, data) pair; None on timeout"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class ChangeFeed:
+    """Shared change poller with in-process fan-out to subscribers"""
+
+    def __init__(self, lembretes_repository, pedidos_repository, poll_interval: float = None,
+                 orders_window_days: int = None, max_subscribers: int = None):
+        self.lembretes_repository = lembretes_repository
+        self.pedidos_repository = pedidos_repository
+        self.poll_interval = poll_interval or NOTIFY_CONFIG.get('poll_interval', 5)
+        self.orders_window_days = orders_window_days or NOTIFY_CONFIG.get('orders_window_days', 30)
+        self.max_subscribers = max_subscribers or NOTIFY_CONFIG.get('max_subscribers') or default_max_subscribers()
+
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        # Poller state (reset whenever the poller stops)
+        self._last_msg_id = None
+        self._estados = None
+
+    def subscribe(self, utilizador: str, vendedor: int, ver_todos: bool = False) -> Optional[Subscription]:
+        """Register a client; None when this worker is at max_subscribers"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(utilizador, vendedor, ver_todos)
+            self._subscribers.append(subscription)
+            self._ensure_running()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def wake(self):
+        """Poll now instead of waiting for the interval (e.g. on a database event)"""
+        self._wakeup.set()
+
+    def publish(self, event: str, data: Dict[str, Any], utilizador: str = None, vendedor: int = None):
+        """Deliver an event to the subscribers it concerns"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            if utilizador is not None and subscription.utilizador != utilizador:
+                continue
+            if vendedor is not None and not subscription.ver_todos and subscription.vendedor != vendedor:
+                continue
+            subscription.push(event, data)
+
+    def _ensure_running(self):
+        # Called with self._lock held; restarts the thread after a fork
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._last_msg_id = None
+        self._estados = None
+        self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # Nobody listening: stop until the next subscriber arrives
+                    self._thread = None
+                    return
+
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Change feed poll failed: {e}")
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def poll_once(self):
+        """One round of change queries for all users of this worker"""
+        self._poll_lembretes()
+        self._poll_pedidos()
+
+    def _poll_lembretes(self):
+        if self._last_msg_id is None:
+            self._last_msg_id = self.lembretes_repository.get_last_id()
+            return
+
+        for msg_id, destinatario in self.lembretes_repository.get_new_since(self._last_msg_id):
+            self._last_msg_id = max(self._last_msg_id, msg_id)
+            self.publish(LEMBRETE, {'id': msg_id}, utilizador=destinatario)
+
+    def _poll_pedidos(self):
+        desde = datetime.now() - timedelta(days=self.orders_window_days)
+        estados = {
+            pedido: (vendedor, estado)
+            for pedido, vendedor, estado in self.pedidos_repository.get_recent_states(desde)
+        }
+
+        anteriores, self._estados = self._estados, estados
+        if anteriores is None:
+            return
+
+        for pedido, (vendedor, estado) in estados.items():
+            anterior = anteriores.get(pedido)
+            if anterior is None:
+                self.publish(PEDIDO, {'pedido': pedido, 'estado': estado, 'novo': True}, vendedor=vendedor)
+            elif anterior[1] != estado:
+                self.publish(PEDIDO, {'pedido': pedido, 'estado': estado, 'anterior': anterior[1]},
+                             vendedor=vendedor)
@@ -0,0 +1,190 @@
+"""
+Sales analytics for Mobile Sales application
+Streams a vendor's order lines for a period into columnar NumPy arrays and
+computes per-client, per-article, per-month and per-day breakdowns, moving
+averages and top-N rankings. Results are cached by (vendor, period).
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional dependency, only needed by the analytics endpoint: imported on
+# first use (see _require_numpy) to keep it out of worker startup
+np = None
+
+from ..config import CACHE_CONFIG
+from ..database.connection import DatabaseError
+from ..utils.cache import TTLCache
+
+# Named periods (the current day is always included)
+PERIODS = ('mes', 'trimestre', 'ano', '12m')
+MAX_PERIOD_DAYS = 5 * 366
+
+
+def check_period(desde: date, ate: date):
+    """Reject empty, inverted or longer than MAX_PERIOD_DAYS [desde, ate) ranges"""
+    if (ate - desde).days > MAX_PERIOD_DAYS or ate <= desde:
+        raise ValueError('Período inválido')
+
+
+def period_range(periodo: str, today: date = None) -> Tuple[date, date]:
+    """Half-open [desde, ate) date range for a named period"""
+    today = today or date.today()
+    ate = today + timedelta(days=1)
+
+    if periodo == 'mes':
+        return today.replace(day=1), ate
+    if periodo == 'ano':
+        return today.replace(month=1, day=1), ate
+
+    months = 3 if periodo == 'trimestre' else 12
+    index = today.year * 12 + today.month - months
+    return date(index // 12, index % 12 + 1, 1), ate
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """numpy, needed by the analytics endpoint, is not installed"""
+    pass
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise AnalyticsUnavailable('numpy não está instalado')
+        np = numpy
+
+
+def moving_average(series: 'np.ndarray', window: int) -> List[Optional[float]]:
+    """Trailing moving average; the first window-1 points are None"""
+    if window <= 1:
+        return series.tolist()
+    if len(series) < window:
+        return [None] * len(series)
+    averages = np.convolve(series, np.ones(window) / window, mode='valid')
+    return [None] * (window - 1) + np.round(averages, 2).tolist()
+
+
+class SalesAnalyticsService:
+    """Vectorized sales breakdowns over Pda_Pedidos"""
+
+    COLUMNS = ('dia', 'cliente', 'nome_cliente', 'artigo', 'descricao', 'quantidade', 'valor')
+
+    def __init__(self, repository, ttl: float = None, batch_size: int = 2000):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.cache = TTLCache('sales_analytics',
+                              ttl=ttl if ttl is not None else CACHE_CONFIG.get('sales_analytics_ttl', 600),
+                              max_entries=256)
+
+    def load(self, vendedor: int, desde: date, ate: date) -> Dict[str, 'np.ndarray']:
+        """Stream order lines in [desde, ate) into one array per column"""
+        _require_numpy()
+
+        chunks = {name: [] for name in self.COLUMNS}
+        for batch in self.repository.iter_order_lines(
+                vendedor,
+                datetime.combine(desde, datetime.min.time()),
+                datetime.combine(ate, datetime.min.time()),
+                self.batch_size):
+            dt_registo, cliente, nome, codigo, descricao, quantidade, preco = zip(*batch)
+
+            quantidade = np.nan_to_num(np.array(quantidade, dtype=float))
+            chunks['dia'].append(np.array(dt_registo, dtype='datetime64[D]'))
+            chunks['cliente'].append(np.array([(c or '').strip() for c in cliente], dtype=object))
+            chunks['nome_cliente'].append(np.array([(n or '').strip() for n in nome], dtype=object))
+            chunks['artigo'].append(np.array([(c or '').strip() for c in codigo], dtype=object))
+            chunks['descricao'].append(np.array([(d or '').strip() for d in descricao], dtype=object))
+            chunks['quantidade'].append(quantidade)
+            chunks['valor'].append(quantidade * np.nan_to_num(np.array(preco, dtype=float)))
+
+        empty = {'dia': 'datetime64[D]', 'quantidade': float, 'valor': float}
+        return {
+            name: np.concatenate(parts) if parts else np.array([], dtype=empty.get(name, object))
+            for name, parts in chunks.items()
+        }
+
+    @staticmethod
+    def _ranking(keys, labels, valor, quantidade, top: int) -> List[Dict[str, Any]]:
+        """Group by key and return the top entries by value"""
+        codes, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        valores = np.bincount(inverse, weights=valor, minlength=len(codes))
+        quantidades = np.bincount(inverse, weights=quantidade, minlength=len(codes))
+        linhas = np.bincount(inverse, minlength=len(codes))
+        total = valores.sum()
+
+        order = np.argsort(-valores, kind='stable')[:top]
+        return [{
+            'codigo': codes[i],
+            'nome': labels[first[i]] or codes[i],
+            'valor': round(float(valores[i]), 2),
+            'quantidade': round(float(quantidades[i]), 3),
+            'linhas': int(linhas[i]),
+            'percentagem': round(float(valores[i] / total * 100), 1) if total else 0.0
+        } for i in order]
+
+    @staticmethod
+    def _series(positions, valor, quantidade, length: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        return (np.bincount(positions, weights=valor, minlength=length),
+                np.bincount(positions, weights=quantidade, minlength=length))
+
+    def analyse(self, vendedor: int, desde: date, ate: date, top: int = 10,
+                window: int = 3) -> Dict[str, Any]:
+        """Full breakdown for vendor over [desde, ate)"""
+        data = self.load(vendedor, desde, ate)
+        valor = data['valor']
+        quantidade = data['quantidade']
+
+        # Monthly series over every month in the period (zero-filled)
+        primeiro_mes = np.datetime64(desde, 'M')
+        num_meses = int((np.datetime64(ate - timedelta(days=1), 'M') - primeiro_mes).astype(int)) + 1
+        meses_pos = (data['dia'].astype('datetime64[M]') - primeiro_mes).astype(int)
+        valor_mes, quantidade_mes = self._series(meses_pos, valor, quantidade, num_meses)
+
+        # Daily series with a 7-day moving average
+        primeiro_dia = np.datetime64(desde, 'D')
+        num_dias = (ate - desde).days
+        dias_pos = (data['dia'] - primeiro_dia).astype(int)
+        valor_dia, _ = self._series(dias_pos, valor, quantidade, num_dias)
+
+        return {
+            'vendedor': vendedor,
+            'desde': desde.isoformat(),
+            'ate': ate.isoformat(),
+            'totais': {
+                'linhas': int(len(valor)),
+                'valor': round(float(valor.sum()), 2),
+                'quantidade': round(float(quantidade.sum()), 3),
+                'clientes': int(len(np.unique(data['cliente']))),
+                'artigos': int(len(np.unique(data['artigo'])))
+            },
+            'meses': {
+                'labels': [str(primeiro_mes + i) for i in range(num_meses)],
+                'valor': np.round(valor_mes, 2).tolist(),
+                'quantidade': np.round(quantidade_mes, 3).tolist(),
+                'media_movel': moving_average(np.round(valor_mes, 2), window)
+            },
+            'dias': {
+                'labels': [str(primeiro_dia + i) for i in range(num_dias)],
+                'valor': np.round(valor_dia, 2).tolist(),
+                'media_movel': moving_average(np.round(valor_dia, 2), 7)
+            },
+            'clientes': self._ranking(data['cliente'], data['nome_cliente'], valor, quantidade, top),
+            'artigos': self._ranking(data['artigo'], data['descricao'], valor, quantidade, top)
+        }
+
+    def get_analysis(self, vendedor: int, desde: date, ate: date, top: int = 10) -> Dict[str, Any]:
+        """Cached analyse() keyed by (vendor, period, top)"""
+        check_period(desde, ate)
+        key = (vendedor, desde.isoformat(), ate.isoformat(), top)
+        return self.cache.get_or_load(key, lambda: self.analyse(vendedor, desde, ate, top),
+                                      stale_on=(DatabaseError,))
+
+    def invalidate(self, vendedor: int = None):
+        """Drop cached analyses (all, or those of one vendor)"""
+        if vendedor is None:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate_where(lambda key: key[0] == vendedor)
@@ -0,0 +1,192 @@
+"""
+Sales statistics for Mobile Sales application
+Per-vendor daily and monthly order rollups kept in a local SQLite summary store.
+Each refresh only re-reads the last few days from Pda_Pedidos (half-open
+Dt_Registo range), so building the statistics page is O(months), not O(orders).
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from ..config import STATS_CONFIG
+from ..database.connection import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` away from day's month"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class SalesStatsService:
+    """Incrementally maintained per-vendor order rollups"""
+
+    def __init__(self, repository, db_path: str = None, refresh_interval: float = None,
+                 reopen_days: int = None):
+        self.repository = repository
+        self.db_path = db_path or STATS_CONFIG.get('db_path', '/tmp/mobile_sales_stats.sqlite3')
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else STATS_CONFIG.get('refresh_interval', 60))
+        self.reopen_days = reopen_days if reopen_days is not None else STATS_CONFIG.get('reopen_days', 2)
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._schema_ready:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS daily (
+                    vendedor INTEGER NOT NULL,
+                    dia TEXT NOT NULL,
+                    pedidos INTEGER NOT NULL,
+                    valor REAL NOT NULL,
+                    PRIMARY KEY (vendedor, dia)
+                );
+                CREATE TABLE IF NOT EXISTS monthly (
+                    vendedor INTEGER NOT NULL,
+                    mes TEXT NOT NULL,
+                    pedidos INTEGER NOT NULL,
+                    valor REAL NOT NULL,
+                    PRIMARY KEY (vendedor, mes)
+                );
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    vendedor INTEGER PRIMARY KEY,
+                    synced_until TEXT NOT NULL,
+                    refreshed_at REAL NOT NULL
+                );
+            """)
+            self._schema_ready = True
+        return conn
+
+    def refresh(self, vendedor: int, force: bool = False):
+        """Bring the vendor's rollups up to date (re-reads only the reopened days)"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                state = conn.execute("SELECT synced_until, refreshed_at FROM sync_state WHERE vendedor = ?",
+                                     (vendedor,)).fetchone()
+                if state and not force and time.time() - state[1] < self.refresh_interval:
+                    return
+
+                today = date.today()
+                # First sync reads the whole history once; later ones reopen the last days
+                desde = None
+                if state:
+                    desde = date.fromisoformat(state[0]) - timedelta(days=self.reopen_days)
+                ate = today + timedelta(days=1)
+
+                rows = self.repository.get_daily_totals(
+                    vendedor,
+                    datetime.combine(desde, datetime.min.time()) if desde else None,
+                    datetime.combine(ate, datetime.min.time())
+                )
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if desde:
+                        conn.execute("DELETE FROM daily WHERE vendedor = ? AND dia >= ?",
+                                     (vendedor, desde.isoformat()))
+                    else:
+                        conn.execute("DELETE FROM daily WHERE vendedor = ?", (vendedor,))
+                    conn.executemany(
+                        "INSERT INTO daily (vendedor, dia, pedidos, valor) VALUES (?, ?, ?, ?)",
+                        [(vendedor, dia.isoformat(), pedidos or 0, float(valor or 0))
+                         for dia, pedidos, valor in rows if dia]
+                    )
+
+                    # Rebuild only the months touched by the reopened days
+                    primeiro_mes = month_start(desde).isoformat()[:7] if desde else ''
+                    conn.execute("DELETE FROM monthly WHERE vendedor = ? AND mes >= ?",
+                                 (vendedor, primeiro_mes))
+                    conn.execute("""
+                        INSERT INTO monthly (vendedor, mes, pedidos, valor)
+                        SELECT vendedor, substr(dia, 1, 7), SUM(pedidos), SUM(valor)
+                        FROM daily
+                        WHERE vendedor = ? AND dia >= ?
+                        GROUP BY vendedor, substr(dia, 1, 7)
+                    """, (vendedor, primeiro_mes))
+
+                    conn.execute("""
+                        INSERT OR REPLACE INTO sync_state (vendedor, synced_until, refreshed_at)
+                        VALUES (?, ?, ?)
+                    """, (vendedor, today.isoformat(), time.time()))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+
+    def rebuild(self, vendedor: int = None):
+        """Drop the rollups (one vendor or all) so the next refresh reloads history"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                for table in ('daily', 'monthly', 'sync_state'):
+                    if vendedor is None:
+                        conn.execute(f"DELETE FROM {table}")
+                    else:
+                        conn.execute(f"DELETE FROM {table} WHERE vendedor = ?", (vendedor,))
+            finally:
+                conn.close()
+
+    def monthly_totals(self, vendedor: int, months: int = 12) -> List[Dict[str, Any]]:
+        """Last `months` months (oldest first, zero-filled) as {'mes', 'pedidos', 'valor'}"""
+        primeiro = add_months(date.today(), -(months - 1))
+        conn = self._connect()
+        try:
+            stored = {
+                mes: (pedidos, valor)
+                for mes, pedidos, valor in conn.execute(
+                    "SELECT mes, pedidos, valor FROM monthly WHERE vendedor = ? AND mes >= ?",
+                    (vendedor, primeiro.isoformat()[:7]))
+            }
+        finally:
+            conn.close()
+
+        result = []
+        for i in range(months):
+            mes = add_months(primeiro, i).isoformat()[:7]
+            pedidos, valor = stored.get(mes, (0, 0.0))
+            result.append({'mes': mes, 'pedidos': pedidos, 'valor': valor})
+        return result
+
+    def get_stats(self, vendedor: int, months: int = 12) -> Dict[str, Any]:
+        """Totals, current month and monthly series for the statistics page"""
+        try:
+            self.refresh(vendedor)
+        except DatabaseError as e:
+            # Database unavailable: serve the rollups from the last successful sync
+            logger.warning(f"Sales stats refresh failed for vendor {vendedor}, serving stored rollups: {e}")
+
+        conn = self._connect()
+        try:
+            total_pedidos, valor_total = conn.execute(
+                "SELECT COALESCE(SUM(pedidos), 0), COALESCE(SUM(valor), 0) FROM monthly WHERE vendedor = ?",
+                (vendedor,)).fetchone()
+        finally:
+            conn.close()
+
+        meses = self.monthly_totals(vendedor, months)
+        return {
+            'total_pedidos': total_pedidos,
+            'valor_total': valor_total,
+            'pedidos_mes': meses[-1]['pedidos'],
+            'valor_mes': meses[-1]['valor'],
+            'meses': meses
+        }
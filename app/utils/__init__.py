@@ -3,7 +3,9 @@ Utility functions and decorators for Mobile Sales application
 """
 
 from .decorators import login_required
+from .cache import TTLCache
 
 __all__ = [
-    'login_required'
+    'login_required',
+    'TTLCache'
 ]
\ No newline at end of file
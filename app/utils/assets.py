@@ -0,0 +1,71 @@
+"""
+Fingerprinted static assets for Mobile Sales application
+scripts/build_static.py copies each CSS/JS file to static/dist/ under a name
+that carries a hash of its content, writes .gz/.br variants next to it and a
+manifest mapping original names to fingerprinted ones. Here url_for('static')
+is rewritten through that manifest, fingerprinted files are served with a
+one-year immutable Cache-Control (a new build means a new URL) and, when the
+client accepts it, from the precompressed variant.
+"""
+
+import json
+import logging
+import mimetypes
+import os
+from typing import Dict
+
+from flask import request, send_from_directory
+
+logger = logging.getLogger(__name__)
+
+# Precompressed variants in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def load_manifest(static_folder: str, manifest: str) -> Dict[str, str]:
+    """Original name -> fingerprinted name; empty when the build step was not run"""
+    path = os.path.join(static_folder, manifest)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring static manifest {path}: {e}")
+        return {}
+
+
+def configure_static(app, config: dict):
+    """Apply STATIC_CONFIG: manifest-aware url_for and the static view"""
+    static_folder = app.static_folder
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = config.get('max_age', 3600)
+    immutable_max_age = config.get('immutable_max_age', 31536000)
+
+    manifest = load_manifest(static_folder, config.get('manifest', 'dist/manifest.json'))
+    fingerprinted = frozenset(manifest.values())
+    if manifest:
+        logger.info(f"Static manifest with {len(manifest)} fingerprinted assets")
+
+    def fingerprint_url(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    def serve_static(filename):
+        if filename not in fingerprinted:
+            return app.send_static_file(filename)
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        for encoding, suffix in ENCODINGS:
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(static_folder, filename + suffix)):
+                response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype,
+                                               max_age=immutable_max_age)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(static_folder, filename, max_age=immutable_max_age)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.immutable = True
+        return response
+
+    app.url_defaults(fingerprint_url)
+    app.view_functions['static'] = serve_static
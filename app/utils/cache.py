@@ -0,0 +1,87 @@
+"""
+In-process caching helpers for Mobile Sales application
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe dictionary cache with per-entry expiry
+
+    Expired entries stay until evicted or replaced so they can still be served
+    as stale data while the source is unavailable (get_or_load stale_on).
+    """
+
+    def __init__(self, name: str, ttl: float = 300, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value for key or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                return default
+            return value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key even if it has expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value for key, evicting the oldest entry when full"""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                    stale_on: Tuple[type, ...] = ()) -> Any:
+        """Return cached value, calling loader and caching its result on a miss
+
+        When loader raises one of the stale_on exceptions and an expired value
+        is still held, that value is returned instead.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            try:
+                value = loader()
+            except stale_on:
+                value = self.get_stale(key, missing)
+                if value is missing:
+                    raise
+                return value
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop a single key, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key for which predicate(key) is true; returns how many"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
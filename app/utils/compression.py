@@ -0,0 +1,65 @@
+"""
+Response compression for Mobile Sales application
+Large dynamic pages (stock search results, order lists) are compressed with
+brotli when the client accepts it and the optional brotli module is installed,
+otherwise with gzip. Small, streamed (SSE, send_file) and already encoded
+responses are left untouched.
+"""
+
+import gzip
+from typing import Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+class ResponseCompressor:
+    """after_request hook compressing text responses above min_size bytes"""
+
+    def __init__(self, config: dict):
+        self.min_size = config.get('min_size', 1024)
+        self.gzip_level = config.get('gzip_level', 6)
+        self.brotli_quality = config.get('brotli_quality', 5)
+        self.mimetypes = frozenset(config.get('mimetypes', ('text/html', 'application/json')))
+
+    def choose_encoding(self) -> Optional[str]:
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def __call__(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes
+                or response.cache_control.no_transform):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.set_data(self.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # The encoded body is a different representation: a strong ETag of the
+        # plain body becomes weak (If-None-Match still matches it)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
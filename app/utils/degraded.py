@@ -0,0 +1,31 @@
+"""
+Degraded (read-only) mode for Mobile Sales
+While the database circuit breaker is open, pages are served from the caches,
+a banner is shown and requests that would change data are refused.
+"""
+
+from flask import request, flash, redirect, url_for, jsonify
+from ..database.connection import connection_breaker
+
+# Endpoints que alteram estado mas não dependem da base de dados
+WRITE_ALLOWED = {'auth.logout'}
+
+MESSAGE = 'Base de dados indisponível: a aplicação está em modo só de leitura. Tente novamente dentro de instantes.'
+
+
+def block_writes():
+    """before_request hook: refuse data changes while degraded"""
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or request.endpoint in WRITE_ALLOWED:
+        return None
+    if not connection_breaker.is_degraded():
+        return None
+
+    if request.blueprint == 'api' or request.is_json:
+        return jsonify({'success': False, 'error': MESSAGE, 'degradado': True}), 503
+    flash(MESSAGE, 'warning')
+    return redirect(request.referrer or url_for('auth.index'))
+
+
+def template_status():
+    """context processor: modo_degradado flag for the banner in base.html"""
+    return {'modo_degradado': connection_breaker.is_degraded()}
@@ -0,0 +1,29 @@
+"""
+Logging setup for Mobile Sales application
+Handlers are attached by create_app instead of at import time, so importing
+the package never touches the filesystem and a missing log directory degrades
+to stderr instead of crashing the worker. The SQL log file is opened lazily,
+on its first record.
+"""
+
+import logging
+import os
+
+
+def configure_logging(config: dict):
+    """Attach the SQL log handler once per process"""
+    sql_logger = logging.getLogger('mobile_sales_sql')
+    sql_logger.setLevel(config.get('sql_level', 'INFO'))
+    if sql_logger.handlers:
+        return
+
+    formatter = logging.Formatter(config.get('format', '%(asctime)s - %(levelname)s - %(message)s'))
+    path = config.get('sql_log')
+    if path and os.access(os.path.dirname(os.path.abspath(path)), os.W_OK):
+        handler = logging.FileHandler(path, delay=True)
+    else:
+        if path:
+            logging.getLogger(__name__).warning(f"SQL log {path} not writable, logging to stderr")
+        handler = logging.StreamHandler()
+    handler.setFormatter(formatter)
+    sql_logger.addHandler(handler)
@@ -0,0 +1,235 @@
+"""
+Server-side sessions for Mobile Sales application
+The cookie only carries an opaque random id; session data lives in a local
+SQLite file shared by the workers. Data is loaded on first access and written
+back only when it changed (or, for unchanged sessions, when half of the
+lifetime has gone by, to keep them alive).
+"""
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+
+
+class SqliteSessionStore:
+    """Session id -> serialized data with an absolute expiry time"""
+
+    def __init__(self, db_path: str, purge_interval: float = 3600):
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self._schema_ready = False
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+
+    def _create_file(self):
+        # Session data is private to the application user; SQLite gives the
+        # -wal/-shm files the permissions of the database file
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.close(os.open(self.db_path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(self.db_path, 0o600)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            self._create_file()
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+            self._schema_ready = True
+        return conn
+
+    def load(self, sid: str) -> Optional[Tuple[str, float]]:
+        """(data, expires) of a live session, None when unknown or expired"""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT data, expires FROM sessions WHERE id = ? AND expires > ?",
+                                (sid, time.time())).fetchone()
+        finally:
+            conn.close()
+
+    def save(self, sid: str, data: str, expires: float):
+        conn = self._connect()
+        try:
+            conn.execute("INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)",
+                         (sid, data, expires))
+        finally:
+            conn.close()
+        self._maybe_purge()
+
+    def delete(self, sid: str):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+        finally:
+            conn.close()
+
+    def _maybe_purge(self):
+        # Expired rows are removed at most once per purge_interval per worker
+        with self._lock:
+            if time.time() - self._last_purge < self.purge_interval:
+                return
+            self._last_purge = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM sessions WHERE expires <= ?", (time.time(),))
+        finally:
+            conn.close()
+
+
+class ServerSession(dict, SessionMixin):
+    """Session dict that loads its data on first use and tracks changes"""
+
+    def __init__(self, sid: str = None, loader=None):
+        super().__init__()
+        self.sid = sid
+        self.expires = None
+        self.modified = False
+        self.accessed = False
+        self.rotated = None
+        self._loader = loader
+        # parallel() reads the session from pool threads (SQL logging)
+        self._load_lock = threading.Lock()
+
+    @property
+    def new(self) -> bool:
+        return self.sid is None
+
+    @property
+    def loaded(self) -> bool:
+        """True once the stored data was read (or there was nothing to read)"""
+        return self._loader is None
+
+    def _load(self):
+        self.accessed = True
+        if self._loader is None:
+            return
+        with self._load_lock:
+            if self._loader is None:
+                return
+            stored = self._loader()
+            if stored is None:
+                # Unknown or expired id: never reuse an id we did not issue
+                self.sid = None
+            else:
+                data, self.expires = stored
+                dict.update(self, data)
+            self._loader = None
+
+    def rotate(self):
+        """Issue a new session id on save (after login, against session fixation)"""
+        self._load()
+        if self.sid is not None:
+            self.rotated = self.sid
+            self.sid = None
+        self.modified = True
+
+
+def _reader(name):
+    method = getattr(dict, name)
+
+    def read(self, *args, **kwargs):
+        self._load()
+        return method(self, *args, **kwargs)
+    read.__name__ = name
+    return read
+
+
+def _writer(name):
+    method = getattr(dict, name)
+
+    def write(self, *args, **kwargs):
+        self._load()
+        self.modified = True
+        return method(self, *args, **kwargs)
+    write.__name__ = name
+    return write
+
+
+for _name in ('__getitem__', '__contains__', '__iter__', '__len__', '__bool__', 'get', 'keys', 'values',
+              'items', 'copy', '__repr__'):
+    if hasattr(dict, _name):
+        setattr(ServerSession, _name, _reader(_name))
+for _name in ('__setitem__', '__delitem__', 'pop', 'popitem', 'setdefault', 'update', 'clear'):
+    setattr(ServerSession, _name, _writer(_name))
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface backed by a SqliteSessionStore"""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store: SqliteSessionStore):
+        self.store = store
+
+    def _load(self, sid: str):
+        stored = self.store.load(sid)
+        if stored is None:
+            return None
+        data, expires = stored
+        try:
+            return self.serializer.loads(data), expires
+        except Exception:
+            return None
+
+    def open_session(self, app, request) -> ServerSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return ServerSession()
+        return ServerSession(sid, loader=lambda: self._load(sid))
+
+    def save_session(self, app, session: ServerSession, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session.accessed:
+            # Session never touched by this request: no I/O at all
+            return
+        response.vary.add('Cookie')
+
+        if session.rotated:
+            self.store.delete(session.rotated)
+
+        if not dict.__len__(session):
+            if session.modified and (session.sid or session.rotated):
+                if session.sid:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app), httponly=self.get_cookie_httponly(app))
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        stale = session.expires is None or session.expires - now < lifetime / 2
+        if not (session.modified or session.new or stale):
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(24)
+        self.store.save(session.sid, self.serializer.dumps(dict(session)), now + lifetime)
+
+        cookie_expires = self.get_expiration_time(app, session)
+        response.set_cookie(
+            name, session.sid,
+            expires=cookie_expires if cookie_expires else None,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
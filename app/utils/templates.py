@@ -0,0 +1,42 @@
+"""
+Jinja environment tuning for Mobile Sales application
+Compiled templates are kept in a filesystem bytecode cache shared by all
+workers, and in production every template is compiled once at startup (or at
+deploy time with scripts/precompile_templates.py) with auto-reload disabled,
+so no request pays for parsing or for template mtime checks.
+"""
+
+import logging
+import os
+import time
+from typing import List
+
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+
+def configure_templates(app, config: dict):
+    """Apply TEMPLATE_CONFIG to the app's Jinja environment"""
+    # Must be set before jinja_env is first created. None lets Flask follow
+    # app.debug, including app.run(debug=True) after create_app()
+    app.config['TEMPLATES_AUTO_RELOAD'] = config.get('auto_reload')
+
+    cache_dir = config.get('bytecode_cache_dir')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir, 'mobile_sales_%s.cache')
+
+    precompile = config.get('precompile')
+    if precompile if precompile is not None else not app.debug:
+        precompile_templates(app.jinja_env)
+
+
+def precompile_templates(env) -> List[str]:
+    """Load (compile, or read from the bytecode cache) every .html template"""
+    started = time.perf_counter()
+    names = [name for name in env.list_templates() if name.endswith('.html')]
+    for name in names:
+        env.get_template(name)
+    logger.info(f"Precompiled {len(names)} templates in {time.perf_counter() - started:.2f}s")
+    return names
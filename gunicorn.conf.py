@@ -0,0 +1,57 @@
+"""
+Gunicorn configuration for Mobile Sales (production)
+The application is created once in the master (preload_app) and forked into
+the workers, so templates are compiled a single time and worker recycling
+only pays for the fork. Connection pools, the statement watchdog and the
+background threads are fork-aware and start inside each worker.
+
+Workers and threads are sized from the CPU count and the database budget:
+each worker keeps up to POOL_CONFIG['max_size'] Firebird connections, shared
+by the request threads, the parallel() executor and the background threads
+(see app.database.executor.request_threads), so no thread waits on the pool.
+
+Usage:
+    gunicorn                      # reads ./gunicorn.conf.py
+    gunicorn --workers 4 --bind 127.0.0.1:8000
+"""
+
+import multiprocessing
+
+from app.config import SERVER_CONFIG, POOL_CONFIG
+from app.database.executor import request_threads
+
+
+def _pool_size() -> int:
+    return POOL_CONFIG.get('max_size', 10) if POOL_CONFIG.get('enabled', True) else 1
+
+
+def _workers() -> int:
+    if SERVER_CONFIG.get('workers'):
+        return SERVER_CONFIG['workers']
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    by_database = SERVER_CONFIG.get('max_db_connections', 60) // _pool_size()
+    return max(1, min(by_cpu, by_database))
+
+
+wsgi_app = 'app:create_app()'
+bind = SERVER_CONFIG.get('bind', '0.0.0.0:8000')
+preload_app = True
+
+worker_class = 'gthread'
+workers = _workers()
+threads = request_threads()
+
+max_requests = SERVER_CONFIG.get('max_requests', 2000)
+max_requests_jitter = SERVER_CONFIG.get('max_requests_jitter', 200)
+timeout = SERVER_CONFIG.get('timeout', 60)
+graceful_timeout = SERVER_CONFIG.get('graceful_timeout', 30)
+keepalive = SERVER_CONFIG.get('keepalive', 5)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = 'info'
+
+
+def when_ready(server):
+    server.log.info(f"Mobile Sales: {workers} workers x {threads} threads, "
+                    f"up to {workers * _pool_size()} database connections")
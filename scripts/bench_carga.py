@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Teste de carga com sessões de vendedor
+Cada utilizador virtual (corrotina asyncio com a sua ligação keep-alive e o
+seu cookie de sessão) entra na aplicação e repete o percurso de um vendedor:
+
+  1. POST /existencias/consulta   pesquisa de existências
+  2. GET  /api/detalhes_lote/...  lotes de um artigo do resultado
+  3. GET  /api/reservas/... + /api/requisicoes/...   encomendas de um lote
+  4. GET  /api/clientes           carteira de clientes (picker)
+  5. GET  /pedido + POST /validapedido   pedido de um lote para um cliente
+  6. POST /listamapabordocli      mapa de bordo do cliente
+
+e no fim mostra pedidos/s e p50/p95/p99 por rota. Os resultados podem ser
+gravados em JSON e comparados com uma execução anterior (regressões).
+
+Pode correr contra uma instância já em execução (--url, ex. ligada a uma base
+de dados de teste) ou arrancar o servidor com o driver fdb falso de
+scripts/fake_fdb (--servidor gunicorn|flask), que simula Inq_Exist_Lote_Pda,
+Inq_Exist_Lote_Pda_2, Inq_Exist_Lote_Enc2 e Busca_MapaBordo_Cli com latência
+configurável.
+
+Uso:
+    python3 scripts/bench_carga.py --servidor gunicorn --utilizadores 30 --duracao 60
+    python3 scripts/bench_carga.py --servidor gunicorn --latencia "Busca_MapaBordo_Cli=400,*=5" --json novo.json
+    python3 scripts/bench_carga.py --servidor gunicorn --json novo.json --comparar base.json --tolerancia 10
+    python3 scripts/bench_carga.py --url http://staging:8000 --senha teste --primeiro 1 --utilizadores 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_FDB_DIR = os.path.join(ROOT, 'scripts', 'fake_fdb')
+
+# Filtros da pesquisa de existências (tipo de artigo, Ne, cabos) usados à vez
+SEARCHES = [
+    {'tipo_artigo': 'A', 'tipo_ne': '30', 'n_cabos': '1'},
+    {'tipo_artigo': 'A', 'tipo_ne': '20', 'n_cabos': '2'},
+    {'tipo_artigo': 'P', 'tipo_ne': '40', 'n_cabos': '1'},
+    {'tipo_artigo': 'M', 'tipo_ne': '24', 'n_cabos': '1'},
+]
+
+
+class HttpError(Exception):
+    pass
+
+
+class HttpSession:
+    """Cliente HTTP/1.1 mínimo sobre asyncio: uma ligação keep-alive e cookies"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = self._writer = None
+
+    async def close(self):
+        if self._writer:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def request(self, method, path, form=None):
+        body = urllib.parse.urlencode(form).encode() if form is not None else b''
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", 'Accept-Encoding: identity',
+                   'Connection: keep-alive', f"Content-Length: {len(body)}"]
+        if form is not None:
+            headers.append('Content-Type: application/x-www-form-urlencoded')
+        if self.cookies:
+            headers.append('Cookie: ' + '; '.join(f"{name}={value}" for name, value in self.cookies.items()))
+        payload = ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+        for attempt in (1, 2):
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+                return await asyncio.wait_for(self._read_response(), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Ligação keep-alive fechada pelo servidor (ex. worker reciclado): tentar uma vez numa nova
+                await self.close()
+                if attempt == 2:
+                    raise
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _read_response(self):
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await self._reader.readuntil(b'\r\n')).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie_name, _, rest = value.partition('=')
+                cookie_value = rest.split(';', 1)[0]
+                if cookie_value and 'expires=thu, 01 jan 1970' not in value.lower():
+                    self.cookies[cookie_name] = cookie_value
+                else:
+                    self.cookies.pop(cookie_name, None)
+            headers[name] = value
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunks.append(await self._reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            content = b''.join(chunk[:-2] for chunk in chunks)
+        else:
+            content = await self._reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, content.decode('utf-8', 'replace')
+
+
+class Results:
+    """Latências por rota (só depois do aquecimento)"""
+
+    def __init__(self, warmup_until):
+        self.warmup_until = warmup_until
+        self.times = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = None
+
+    def record(self, route, seconds, ok):
+        if time.perf_counter() < self.warmup_until:
+            return
+        if self.started is None:
+            self.started = time.perf_counter()
+        if ok:
+            self.times[route].append(seconds)
+        else:
+            self.errors[route] += 1
+
+    def summary(self, elapsed):
+        routes = {}
+        for route in sorted(set(self.times) | set(self.errors)):
+            times = sorted(self.times[route])
+            routes[route] = {
+                'pedidos': len(times),
+                'erros': self.errors[route],
+                'por_segundo': round(len(times) / elapsed, 2) if elapsed else 0,
+                'p50': round(percentile(times, 50) * 1000, 1),
+                'p95': round(percentile(times, 95) * 1000, 1),
+                'p99': round(percentile(times, 99) * 1000, 1)
+            }
+        return routes
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed(session, results, route, method, path, form=None, expect=(200,)):
+    started = time.perf_counter()
+    try:
+        status, headers, body = await session.request(method, path, form)
+    except Exception:
+        results.record(route, time.perf_counter() - started, False)
+        return None
+    ok = status in expect
+    results.record(route, time.perf_counter() - started, ok)
+    return body if ok else None
+
+
+async def salesperson(index, args, host, port, results, deadline):
+    """Percurso de um vendedor, repetido até ao fim do teste"""
+    rnd = random.Random(index)
+    session = HttpSession(host, port, args.timeout)
+    user = f"{args.primeiro + index:02d}"
+    think = args.pausa / 1000
+
+    try:
+        await asyncio.sleep(rnd.uniform(0, args.rampa))   # chegadas espalhadas pela rampa
+        if await timed(session, results, 'POST /login', 'POST', '/login',
+                       {'user': user, 'password': args.senha}, expect=(302,)) is None:
+            return
+
+        clientes = []
+        while time.perf_counter() < deadline:
+            filtros = dict(rnd.choice(SEARCHES), enc_forn='S', composicao='', tipo_processo='*', utilizacao='',
+                           action='consultar')
+            html = await timed(session, results, 'POST /existencias/consulta', 'POST', '/existencias/consulta', filtros)
+            codigos = re.findall(r'data-codigo="([^"]+)"', html or '')
+            await asyncio.sleep(think)
+
+            if codigos:
+                codigo = rnd.choice(codigos)
+                fragment = await timed(session, results, 'GET /api/detalhes_lote', 'GET',
+                                       f"/api/detalhes_lote/{urllib.parse.quote(codigo)}")
+                lotes = re.findall(r"abrirPedido\('[^']*', '([^']*)'\)", fragment or '')
+                await asyncio.sleep(think)
+
+                # Reservas e requisições de um lote (Inq_Exist_Lote_Enc2)
+                encomendas = re.findall(r"abrirReservas\('([^']*)', '([^']*)', '([^']*)'\)", fragment or '')
+                if encomendas:
+                    codigo_lote, lote, fornecedor = rnd.choice(encomendas)
+                    caminho = f"{urllib.parse.quote(codigo_lote)}/{urllib.parse.quote(lote)}"
+                    await timed(session, results, 'GET /api/reservas', 'GET',
+                                f"/api/reservas/{caminho}?" + urllib.parse.urlencode({'fornecedor': fornecedor}))
+                    await asyncio.sleep(think)
+                    await timed(session, results, 'GET /api/requisicoes', 'GET', f"/api/requisicoes/{caminho}")
+                    await asyncio.sleep(think)
+
+                if not clientes:
+                    body = await timed(session, results, 'GET /api/clientes', 'GET', '/api/clientes?limit=50')
+                    clientes = [item[0] for item in json.loads(body)['items']] if body else []
+
+                if lotes and clientes:
+                    lote = rnd.choice(lotes)
+                    cliente = rnd.choice(clientes)
+                    await timed(session, results, 'GET /pedido', 'GET',
+                                '/pedido?' + urllib.parse.urlencode({'codigo': codigo, 'lote': lote}))
+                    await asyncio.sleep(think)
+                    await timed(session, results, 'POST /validapedido', 'POST', '/validapedido', {
+                        'Lote': lote, 'Cliente': cliente, 'Preco': '4,50', 'Quantidade': '100',
+                        'Entrega': '', 'LocalEntrega': 'Morada do Cliente', 'Obs': '', 'Obs2': ''
+                    })
+                    await asyncio.sleep(think)
+
+            if clientes:
+                await timed(session, results, 'POST /listamapabordocli', 'POST', '/listamapabordocli',
+                            {'cliente': rnd.choice(clientes)})
+                await asyncio.sleep(think)
+    finally:
+        await session.close()
+
+
+async def run_load(args, host, port):
+    started = time.perf_counter()
+    results = Results(started + args.aquecimento)
+    deadline = started + args.aquecimento + args.duracao
+    await asyncio.gather(*(salesperson(i, args, host, port, results, deadline) for i in range(args.utilizadores)))
+    elapsed = time.perf_counter() - (results.started or started)
+    return results.summary(elapsed), elapsed
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, port, args):
+    """Arranca a aplicação com o driver fdb falso; devolve o processo"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [FAKE_FDB_DIR, os.environ.get('PYTHONPATH')])))
+    if args.latencia:
+        env['FAKE_FDB_LATENCIA'] = args.latencia
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f"127.0.0.1:{port}"]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+    else:
+        command = [sys.executable, '-c',
+                   f"from app import create_app; create_app().run(host='127.0.0.1', port={port}, threaded=True)"]
+    log = open(args.log_servidor, 'w')
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"o servidor terminou (ver {args.log_servidor})")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('o servidor não respondeu em 30s')
+
+
+def print_summary(routes, elapsed, baseline=None, tolerance=None):
+    total = sum(route['pedidos'] for route in routes.values())
+    errors = sum(route['erros'] for route in routes.values())
+    print(f"{elapsed:.1f}s medidos: {total} pedidos, {total / elapsed:.1f} pedidos/s, erros: {errors}")
+    print(f"  {'rota':30} {'pedidos/s':>9} {'erros':>6} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+
+    regressions = []
+    for name, route in routes.items():
+        line = (f"  {name:30} {route['por_segundo']:9.1f} {route['erros']:6d} "
+                f"{route['p50']:8.1f} {route['p95']:8.1f} {route['p99']:8.1f}")
+        base = (baseline or {}).get(name)
+        if base:
+            deltas = []
+            for key in ('p50', 'p95', 'p99'):
+                change = (route[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+                deltas.append(f"{key} {change:+.0f}%")
+                if key == 'p95' and tolerance is not None and change > tolerance:
+                    regressions.append(name)
+            line += '   vs base: ' + ', '.join(deltas)
+        print(line)
+    return errors, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga com sessões de vendedor')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Instância em execução (sem --servidor)')
+    parser.add_argument('--servidor', choices=['gunicorn', 'flask'], help='Arrancar a aplicação com o driver fdb falso')
+    parser.add_argument('--workers', type=int, help='Workers do gunicorn (por omissão, gunicorn.conf.py)')
+    parser.add_argument('--latencia', help='Latências do driver falso em ms, ex: "Inq_Exist_Lote_Pda=150,*=2"')
+    parser.add_argument('--log-servidor', default='/tmp/bench_carga_servidor.log', help='Saída do servidor arrancado')
+    parser.add_argument('--utilizadores', type=int, default=20, help='Vendedores em simultâneo')
+    parser.add_argument('--primeiro', type=int, default=10, help='Número do primeiro vendedor (U10, U11, ...)')
+    parser.add_argument('--senha', default='carga', help='Senha dos vendedores (o driver falso aceita qualquer)')
+    parser.add_argument('--duracao', type=float, default=30, help='Segundos medidos')
+    parser.add_argument('--aquecimento', type=float, default=5, help='Segundos iniciais não medidos')
+    parser.add_argument('--rampa', type=float, default=2, help='Segundos para todos os vendedores entrarem')
+    parser.add_argument('--pausa', type=float, default=200, help='Pausa entre ações de um vendedor (ms)')
+    parser.add_argument('--timeout', type=float, default=60, help='Segundos por pedido')
+    parser.add_argument('--json', help='Gravar os resultados neste ficheiro')
+    parser.add_argument('--comparar', help='Resultados JSON de referência')
+    parser.add_argument('--tolerancia', type=float, default=10, help='Aumento máximo do p95 (%%) face à referência')
+    args = parser.parse_args()
+
+    process = None
+    if args.servidor:
+        host, port = '127.0.0.1', free_port()
+        try:
+            process = start_server(args.servidor, port, args)
+        except RuntimeError as e:
+            print(f"✗ Não foi possível arrancar o servidor: {e}")
+            return 1
+    else:
+        parsed = urllib.parse.urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+
+    try:
+        routes, elapsed = asyncio.run(run_load(args, host, port))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+    baseline = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            baseline = json.load(f)['rotas']
+    errors, regressions = print_summary(routes, elapsed, baseline, args.tolerancia if baseline else None)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'configuracao': {key: value for key, value in vars(args).items()
+                                        if key not in ('json', 'comparar', 'senha')},
+                       'duracao': round(elapsed, 1), 'rotas': routes}, f, indent=2, ensure_ascii=False)
+        print(f"✓ Resultados gravados em {args.json}")
+
+    if regressions:
+        print(f"✗ p95 piorou mais de {args.tolerancia:.0f}% em: {', '.join(regressions)}")
+        return 1
+    if errors:
+        print(f"✗ {errors} pedidos falhados")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP simples
+N clientes em simultâneo fazem GET aos caminhos indicados durante um tempo
+fixo, contra uma instância em execução, e mostra débito e latências por
+caminho. Serve para comparar configurações do servidor (servidor de
+desenvolvimento do Flask vs gunicorn, nº de workers/threads); ver
+docs/servidor_producao.md.
+
+Uso:
+    python3 scripts/bench_http.py --url http://localhost:8000
+    python3 scripts/bench_http.py --url http://localhost:5000 --caminhos /login /api/saude --clientes 32 --duracao 20
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga HTTP (GET) com clientes em simultâneo')
+    parser.add_argument('--url', default='http://localhost:8000', help='Endereço da aplicação')
+    parser.add_argument('--caminhos', nargs='+', default=['/login', '/api/saude'], help='Caminhos a pedir, à vez')
+    parser.add_argument('--clientes', type=int, default=16, help='Clientes em simultâneo')
+    parser.add_argument('--duracao', type=float, default=10, help='Segundos de teste')
+    parser.add_argument('--timeout', type=float, default=30, help='Segundos por pedido')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    results = {path: [] for path in args.caminhos}
+    failures = {path: 0 for path in args.caminhos}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duracao
+
+    def client(index):
+        request_number = index
+        while time.perf_counter() < deadline:
+            path = args.caminhos[request_number % len(args.caminhos)]
+            request_number += 1
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + path, timeout=args.timeout) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    results[path].append(elapsed)
+                else:
+                    failures[path] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clientes) as executor:
+        list(executor.map(client, range(args.clientes)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(times) for times in results.values())
+    total_failures = sum(failures.values())
+    print(f"{args.clientes} clientes, {elapsed:.1f}s: {total} pedidos, {total / elapsed:.1f} pedidos/s, "
+          f"falhados: {total_failures}")
+    for path, times in results.items():
+        if not times:
+            print(f"  {path:30} sem respostas ({failures[path]} falhados)")
+            continue
+        print(f"  {path:30} {len(times) / elapsed:7.1f}/s  média {statistics.mean(times) * 1000:6.1f}  "
+              f"p50 {percentile(times, 50) * 1000:6.1f}  p95 {percentile(times, 95) * 1000:6.1f}  "
+              f"p99 {percentile(times, 99) * 1000:6.1f} ms")
+    return 1 if total_failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
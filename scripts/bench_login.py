@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark do login
+Simula N vendedores a entrar ao mesmo tempo (por omissão 50), cada um com a
+sua sessão, contra uma instância em execução, e mostra latências e débito.
+
+O ficheiro de credenciais tem uma linha "utilizador:senha" por vendedor, com o
+número tal como é escrito no formulário (ex: 01:segredo).
+
+Uso:
+    python3 scripts/bench_login.py --url http://localhost:5000 --credenciais users.txt
+    python3 scripts/bench_login.py --url http://staging --credenciais users.txt --utilizadores 50 --voltas 5
+"""
+
+import argparse
+import http.cookiejar
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_credentials(path):
+    credentials = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                user, _, password = line.partition(':')
+                credentials.append((user, password))
+    return credentials
+
+
+def login_once(base_url, user, password, timeout):
+    """Um login completo numa sessão nova; devolve (segundos, sucesso)"""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    data = urllib.parse.urlencode({'user': user, 'password': password}).encode()
+
+    started = time.perf_counter()
+    try:
+        with opener.open(f"{base_url}/login", data=data, timeout=timeout) as response:
+            response.read()
+            ok = urllib.parse.urlparse(response.geturl()).path.endswith('/menu')
+    except Exception:
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de logins simultâneos')
+    parser.add_argument('--url', default='http://localhost:5000', help='Endereço da aplicação')
+    parser.add_argument('--credenciais', required=True, help='Ficheiro com linhas utilizador:senha')
+    parser.add_argument('--utilizadores', type=int, default=50, help='Vendedores em simultâneo')
+    parser.add_argument('--voltas', type=int, default=3, help='Logins por vendedor')
+    parser.add_argument('--timeout', type=float, default=30, help='Segundos por pedido')
+    args = parser.parse_args()
+
+    credentials = load_credentials(args.credenciais)
+    if not credentials:
+        print("✗ Ficheiro de credenciais vazio")
+        return 1
+
+    base_url = args.url.rstrip('/')
+    results = []
+    lock = threading.Lock()
+    start_line = threading.Barrier(args.utilizadores)
+
+    def salesperson(index):
+        user, password = credentials[index % len(credentials)]
+        start_line.wait()   # todos começam ao mesmo tempo (a "hora de ponta")
+        for _ in range(args.voltas):
+            result = login_once(base_url, user, password, args.timeout)
+            with lock:
+                results.append(result)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.utilizadores) as executor:
+        list(executor.map(salesperson, range(args.utilizadores)))
+    elapsed = time.perf_counter() - started
+
+    times = [seconds for seconds, _ in results]
+    failures = sum(1 for _, ok in results if not ok)
+    print(f"Logins: {len(results)} ({args.utilizadores} vendedores x {args.voltas}), falhados: {failures}")
+    print(f"Tempo total: {elapsed:.2f}s, débito: {len(results) / elapsed:.1f} logins/s")
+    print(f"Latência (ms): média {statistics.mean(times) * 1000:.0f}  p50 {percentile(times, 50) * 1000:.0f}  "
+          f"p95 {percentile(times, 95) * 1000:.0f}  p99 {percentile(times, 99) * 1000:.0f}  "
+          f"máx {max(times) * 1000:.0f}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark do arranque a frio
+Lança N processos Python novos (como um worker do gunicorn reciclado) e mede
+em cada um: import do pacote app, create_app() e o primeiro pedido (GET
+/login, que não usa a base de dados). Indica também se módulos pesados que
+deviam ser carregados só quando usados (fdb, reportlab, numpy) entraram no
+arranque. Não precisa de base de dados.
+
+Uso:
+    python3 scripts/bench_startup.py
+    python3 scripts/bench_startup.py --processos 20 --modulos 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED = ('fdb', 'reportlab', 'numpy', 'smtplib')
+
+CHILD = f"""
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+app.test_client().get('/login')
+served = time.perf_counter()
+print(json.dumps({{
+    'import': imported - started,
+    'create_app': created - imported,
+    'primeiro_pedido': served - created,
+    'carregados': [name for name in {DEFERRED!r} if name in sys.modules]
+}}))
+"""
+
+
+def run_child(extra_args=()):
+    result = subprocess.run([sys.executable, *extra_args, '-c', CHILD], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'erro')
+    return result
+
+
+def slowest_imports(count):
+    """Módulos com maior tempo de import acumulado (python -X importtime)"""
+    stderr = run_child(('-X', 'importtime')).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.rstrip()))
+    # Pacotes de topo (flask, jinja2, ...) e módulos da aplicação, sem o próprio pacote app
+    names = [(us, name.strip()) for us, name in rows]
+    top = [(us, name) for us, name in names if name != 'app' and (name.startswith('app.') or '.' not in name)]
+    return sorted(top, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do arranque a frio da aplicação')
+    parser.add_argument('--processos', type=int, default=10, help='Arranques a medir')
+    parser.add_argument('--modulos', type=int, default=10, help='Imports mais lentos a mostrar (0 = nenhum)')
+    args = parser.parse_args()
+
+    run_child()   # aquecer a cache de bytecode (.pyc e templates)
+    samples = []
+    for _ in range(args.processos):
+        try:
+            samples.append(json.loads(run_child().stdout.strip().splitlines()[-1]))
+        except Exception as e:
+            print(f"✗ Arranque falhou: {e}")
+            return 1
+
+    print(f"Arranques: {args.processos}")
+    for phase in ('import', 'create_app', 'primeiro_pedido'):
+        times = sorted(sample[phase] for sample in samples)
+        print(f"  {phase:16} p50 {statistics.median(times) * 1000:7.1f} ms   máx {times[-1] * 1000:7.1f} ms")
+    total = sorted(sample['import'] + sample['create_app'] + sample['primeiro_pedido'] for sample in samples)
+    print(f"  {'total':16} p50 {statistics.median(total) * 1000:7.1f} ms   máx {total[-1] * 1000:7.1f} ms")
+
+    loaded = samples[-1]['carregados']
+    if loaded:
+        print(f"✗ Carregados no arranque: {', '.join(loaded)}")
+    else:
+        print(f"✓ Nenhum de {', '.join(DEFERRED)} carregado no arranque")
+
+    if args.modulos:
+        print("Imports mais lentos (acumulado):")
+        for us, name in slowest_imports(args.modulos):
+            print(f"  {us / 1000:7.1f} ms  {name}")
+    return 1 if loaded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos templates
+Mede, para as páginas maiores com um número realista de linhas:
+  - compilação a frio (sem cache de bytecode)
+  - carregamento a partir da cache de bytecode (arranque de um worker)
+  - tempo de render (p50/p95) com os templates já compilados
+Não precisa de base de dados: os dados são gerados e url_for devolve '#'.
+
+Uso:
+    python3 scripts/bench_templates.py
+    python3 scripts/bench_templates.py --artigos 500 --pedidos 100 --lotes 60 --repeticoes 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, render_template
+from app.utils.templates import configure_templates
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+
+def make_app(cache_dir=None):
+    app = Flask(__name__, template_folder=TEMPLATES_DIR)
+    app.secret_key = 'bench'
+    configure_templates(app, {'bytecode_cache_dir': cache_dir, 'auto_reload': False, 'precompile': False})
+    # Sem blueprints registados: qualquer url_for devolve '#'
+    app.url_build_error_handlers.append(lambda error, endpoint, values: '#')
+    return app
+
+
+def make_contexts(artigos, pedidos, lotes):
+    """Dados sintéticos com a forma devolvida pelos repositórios"""
+    rnd = random.Random(42)
+    resultados = [
+        (f"FIO ALGODAO {i} NE {rnd.randint(10, 60)}/1", f"{rnd.randint(100, 999)}.{i:05d}", '' if i % 7 else f"999.{i:05d}",
+         rnd.uniform(0, 5000), rnd.uniform(0, 1000), rnd.uniform(-500, 4000))
+        for i in range(artigos)
+    ]
+    agora = datetime.now()
+    lista_pedidos = [
+        {'PEDIDO': 10000 + i, 'QUANTIDADE': rnd.uniform(1, 500), 'PRECO': rnd.uniform(1, 20), 'LOTE': f"L{i:06d}",
+         'DESCRICAO': f"ARTIGO {i}", 'CLIENTE': f"CLIENTE {i % 40}", 'ESTADO': rnd.choice('PAFC'),
+         'DT_REGISTO': agora - timedelta(hours=i)}
+        for i in range(pedidos)
+    ]
+    lista_lotes = []
+    for i in range(lotes):
+        lote = {'RCODIGO': '100.00001', 'RLOTE': f"L{i:06d}", 'REXIST': rnd.uniform(0, 900),
+                'RENCCLI': rnd.uniform(0, 100), 'RSTKDISP': rnd.uniform(-50, 800), 'RPVP1': rnd.uniform(2, 9),
+                'RPVP2': rnd.uniform(2, 9), 'RPRECO_COMPRA': rnd.uniform(1, 5), 'RFIXACAO': 'N',
+                'RFORNEC': 12, 'RNOMEFOR': 'FORNECEDOR', 'RTIPOSITU': 'ACT',
+                'LAB_RESULTS': {'pf': 1, 'pg': 2, 'np': 3, 'rk': 14.2}}
+        lista_lotes.append(lote)
+
+    return {
+        'existencias_resultado.html': {'resultados': resultados, 'artigos_sem_stock': [],
+                                       'codigo_pesquisa': '100', 'enc_forn': 'S'},
+        'pedidos.html': {'pedidos': lista_pedidos},
+        '_detalhes_lote_partial.html': {'lotes': lista_lotes, 'nivel_acesso': 1, 'debug': False},
+    }
+
+
+def time_loading(app, names):
+    started = time.perf_counter()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de compilação e render dos templates')
+    parser.add_argument('--artigos', type=int, default=300, help='Linhas em existencias_resultado.html')
+    parser.add_argument('--pedidos', type=int, default=100, help='Linhas em pedidos.html (a lista tem FIRST 100)')
+    parser.add_argument('--lotes', type=int, default=40, help='Lotes em _detalhes_lote_partial.html')
+    parser.add_argument('--repeticoes', type=int, default=100, help='Renders por template')
+    args = parser.parse_args()
+
+    contexts = make_contexts(args.artigos, args.pedidos, args.lotes)
+    names = list(contexts) + ['base.html']
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = time_loading(make_app(), names)
+        time_loading(make_app(cache_dir), names)          # preencher a cache
+        cached = time_loading(make_app(cache_dir), names)  # novo worker com cache
+        print(f"Compilação a frio: {cold * 1000:.1f} ms   com cache de bytecode: {cached * 1000:.1f} ms "
+              f"({len(names)} templates)")
+
+        app = make_app(cache_dir)
+        for name, context in contexts.items():
+            with app.test_request_context('/'):
+                render_template(name, **context)   # aquecimento
+                times = []
+                for _ in range(args.repeticoes):
+                    started = time.perf_counter()
+                    html = render_template(name, **context)
+                    times.append(time.perf_counter() - started)
+            times.sort()
+            print(f"{name:32} {len(html) / 1024:7.0f} KB  p50 {statistics.median(times) * 1000:6.2f} ms  "
+                  f"p95 {times[int(len(times) * 0.95) - 1] * 1000:6.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Build dos ficheiros estáticos
+Copia cada ficheiro CSS/JS de static/ para static/dist/ com a impressão digital
+do conteúdo no nome (custom.css -> custom.3f9a1c2e.css), o CSS sem comentários
+nem espaços desnecessários, e grava ao lado as versões .gz (e .br, se o módulo
+brotli estiver instalado) para serem servidas já comprimidas. O manifest.json
+gerado é lido no arranque da aplicação: url_for('static', ...) passa a apontar
+para o ficheiro com impressão digital, servido com cache de um ano.
+
+Correr em cada deploy, antes de reiniciar a aplicação.
+
+Uso:
+    python3 scripts/build_static.py
+    python3 scripts/build_static.py --limpar
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import STATIC_CONFIG
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+DIST = 'dist'
+EXTENSIONS = ('.css', '.js')
+
+
+def minify_css(source: str) -> str:
+    """Minificação conservadora: comentários e espaços à volta de separadores"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip()
+
+
+def find_assets():
+    for root, dirs, files in os.walk(STATIC_DIR):
+        if os.path.relpath(root, STATIC_DIR).split(os.sep)[0] == DIST:
+            dirs[:] = []
+            continue
+        for name in sorted(files):
+            if name.endswith(EXTENSIONS):
+                yield os.path.relpath(os.path.join(root, name), STATIC_DIR).replace(os.sep, '/')
+
+
+def build_asset(name):
+    with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+        data = f.read()
+    if name.endswith('.css'):
+        data = minify_css(data.decode('utf-8')).encode('utf-8')
+
+    digest = hashlib.sha256(data).hexdigest()[:8]
+    stem, ext = os.path.splitext(name)
+    target = f"{DIST}/{stem}.{digest}{ext}"
+    path = os.path.join(STATIC_DIR, target)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'wb') as f:
+        f.write(data)
+    sizes = [len(data)]
+    with open(path + '.gz', 'wb') as f:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        f.write(compressed)
+        sizes.append(len(compressed))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            compressed = brotli.compress(data, quality=11)
+            f.write(compressed)
+            sizes.append(len(compressed))
+    return target, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Impressão digital e pré-compressão dos ficheiros estáticos')
+    parser.add_argument('--limpar', action='store_true', help='Apagar static/dist antes de gerar')
+    args = parser.parse_args()
+
+    if args.limpar:
+        shutil.rmtree(os.path.join(STATIC_DIR, DIST), ignore_errors=True)
+    if brotli is None:
+        print("Módulo brotli não instalado: só versões .gz")
+
+    manifest = {}
+    for name in find_assets():
+        try:
+            target, sizes = build_asset(name)
+        except Exception as e:
+            print(f"✗ {name}: {e}")
+            return 1
+        manifest[name] = target
+        print(f"✓ {name} -> {target}  ({' / '.join(f'{size / 1024:.1f} KB' for size in sizes)})")
+
+    manifest_path = os.path.join(STATIC_DIR, STATIC_CONFIG.get('manifest', f'{DIST}/manifest.json'))
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"✓ Manifest com {len(manifest)} ficheiros: {manifest_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
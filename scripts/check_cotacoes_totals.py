@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Verificador de consistência dos totais das cotações
+Os totais e o número de itens são mantidos incrementalmente; este script
+(ex: cron diário) compara Cotacoes.Valor_Total/Num_Itens com os itens e
+corrige desvios.
+
+Uso:
+    python3 scripts/check_cotacoes_totals.py            # verificar e corrigir
+    python3 scripts/check_cotacoes_totals.py --dry-run  # só verificar
+    python3 scripts/check_cotacoes_totals.py --migrate  # criar coluna Num_Itens e índice
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import cotacoes_repo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verificar totais das cotações')
+    parser.add_argument('--dry-run', action='store_true', help='Não corrigir, apenas listar desvios')
+    parser.add_argument('--migrate', action='store_true', help='Criar/preencher Cotacoes.Num_Itens e índice da lista')
+    args = parser.parse_args()
+
+    if args.migrate:
+        cotacoes_repo.create_list_columns()
+        print("✓ Coluna Num_Itens e índice IX_Cotacoes_Vend_Data preparados")
+
+    mismatches = cotacoes_repo.check_totals(fix=not args.dry_run)
+
+    if not mismatches:
+        print("✓ Todos os totais das cotações estão consistentes")
+        return 0
+
+    for mismatch in mismatches:
+        print(f"✗ Cotação #{mismatch['id']}: guardado {mismatch['stored']:.2f} ({mismatch['stored_itens']} itens), "
+              f"real {mismatch['actual']:.2f} ({mismatch['actual_itens']} itens)")
+
+    action = 'listadas' if args.dry_run else 'corrigidas'
+    print(f"{len(mismatches)} cotações inconsistentes {action}")
+    return 1 if args.dry_run else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
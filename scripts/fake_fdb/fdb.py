@@ -0,0 +1,366 @@
+"""
+Driver fdb falso para testes de carga
+Substitui o módulo fdb quando esta pasta está no PYTHONPATH (o
+scripts/bench_carga.py faz isso ao arrancar o servidor). Responde com dados
+sintéticos e determinísticos às consultas dos percursos de um vendedor e
+simula a latência de cada procedimento/tabela com time.sleep, que liberta o
+GIL como uma chamada real ao Firebird:
+
+  - Inq_Exist_Lote_Pda     pesquisa de existências (agregada por artigo)
+  - Inq_Exist_Lote_Pda_2   lotes de um artigo (detalhes, stock de um lote)
+  - Inq_Exist_Lote_Enc2    encomendas de clientes ('E', reservas) e
+                           requisições ('O') de um lote
+  - Busca_MapaBordo_Cli    mapa de bordo do cliente
+  - Ficha_Lab_Lote, Locais_Entrega, Utiliza_Web, ...
+
+As restantes consultas recebem uma linha com valores plausíveis para os
+nomes das colunas. Escritas (INSERT/UPDATE/DELETE) não guardam nada.
+
+Variáveis de ambiente:
+  FAKE_FDB_LATENCIA  ms por procedimento/tabela ("connect" = abrir ligação,
+                     "*" = restantes), ex: "Inq_Exist_Lote_Pda=150,*=2"
+  FAKE_FDB_VARIACAO  variação aleatória da latência (0.2 = ±20%)
+  FAKE_FDB_ARTIGOS   artigos devolvidos por pesquisa (60)
+  FAKE_FDB_LOTES     lotes por artigo (8)
+  FAKE_FDB_CLIENTES  clientes na carteira de cada vendedor (40)
+"""
+
+import hashlib
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_LATENCY_MS = {
+    'inq_exist_lote_pda': 150,
+    'inq_exist_lote_pda_2': 60,
+    'inq_exist_lote_enc2': 80,
+    'busca_mapabordo_cli': 250,
+    'ficha_lab_lote': 20,
+    'connect': 20,
+    '*': 2
+}
+
+
+def parse_latency(spec):
+    latency = dict(DEFAULT_LATENCY_MS)
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, value = item.partition('=')
+        latency[name.strip().lower()] = float(value)
+    return latency
+
+
+LATENCY_MS = parse_latency(os.environ.get('FAKE_FDB_LATENCIA'))
+JITTER = float(os.environ.get('FAKE_FDB_VARIACAO', '0.2'))
+ARTICLES = int(os.environ.get('FAKE_FDB_ARTIGOS', '60'))
+LOTS = int(os.environ.get('FAKE_FDB_LOTES', '8'))
+CLIENTS = int(os.environ.get('FAKE_FDB_CLIENTES', '40'))
+
+BASE_DATE = datetime(2025, 1, 1)
+_attachments = itertools.count(1)
+
+
+# --- Exceções com os nomes do fdb -------------------------------------------
+
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+# --- Dados sintéticos -------------------------------------------------------
+
+def _rng(*key):
+    """Gerador determinístico para uma chave (o mesmo artigo dá sempre os mesmos lotes)"""
+    return random.Random(hashlib.md5('|'.join(map(str, key)).encode()).hexdigest())
+
+
+def portfolio(vendedor):
+    """Clientes da carteira de um vendedor"""
+    return [f"{int(vendedor):02d}{i:04d}" for i in range(CLIENTS)]
+
+
+def article_rows(prefix):
+    rnd = _rng('artigos', prefix)
+    rows = []
+    for i in range(ARTICLES):
+        exist = round(rnd.uniform(0, 5000), 2)
+        enc_cli = round(rnd.uniform(0, exist), 2)
+        rows.append({'RDESCRICAO': f"FIO {prefix} NE {rnd.randint(10, 60)}/1 ART {i}",
+                     'RCODIGO': f"{prefix}{i:05d}",
+                     'RCODIGOSUBSTITUTO': '' if i % 9 else f"{prefix}{i + 1:05d}",
+                     'TOTALEXIST': exist, 'TOTALENCCLI': enc_cli, 'DISPONIVEL': exist - enc_cli})
+    return rows
+
+
+def lot_rows(codigo):
+    rnd = _rng('lotes', codigo)
+    base = int(hashlib.md5(codigo.encode()).hexdigest()[:4], 16) % 10000
+    rows = []
+    for i in range(LOTS):
+        exist = round(rnd.uniform(10, 900), 2)
+        enc_cli = round(rnd.uniform(0, exist / 2), 2)
+        enc_for = round(rnd.uniform(0, 100), 2)
+        pvp1 = round(rnd.uniform(3, 9), 2)
+        rows.append({
+            'RCODIGO': codigo, 'RLOTE': f"L{base:04d}{i:02d}", 'RLOTEFOR': f"F{i:03d}",
+            'REXIST': exist, 'RENCCLI': enc_cli, 'RENCFOR': enc_for, 'RSTKDISP': exist - enc_cli + enc_for,
+            'RFORNEC': 100 + i % 5, 'RNOMEFOR': f"FORNECEDOR {i % 5}", 'RDESCRICAO': f"ARTIGO {codigo}",
+            'RTIPOSITUA': 'ACT', 'RPVP1': pvp1, 'RPVP2': round(pvp1 * 0.9, 2), 'RPVP3': round(pvp1 * 0.85, 2),
+            'RPVP4': round(pvp1 * 0.8, 2), 'RPRECO_UN': pvp1, 'RMOEDA': 'EUR', 'RCOND_ENTREGA': 'FABRICA',
+            'RCHAVE': i, 'RTIPONIVEL': 'N', 'RNIVEL': 1, 'RTIPOSITUADESC': 'ACTIVO', 'RCODIGO_COR': '',
+            'RARMAZEM': 3 + i % 2, 'RPRECO_COMPRA': round(pvp1 * 0.6, 2), 'RSIGLA': 'PT', 'RFIXACAO': 'N',
+            'RFORMA_PAG_DESC': '60 DIAS', 'RPRAZO_NDIAS': 60
+        })
+    return rows
+
+
+def lab_rows(codigo):
+    rows = []
+    for lote in lot_rows(codigo):
+        rnd = _rng('lab', lote['RLOTE'])
+        row = {'LOTE': lote['RLOTE'], 'TIPO_PROCESSO': 'C', 'NR_FIOS': 1}
+        for name in ('NE_VALOR', 'NE_CV', 'USTER_CVM', 'USTER_PNTFINOS2', 'USTER_PNTGROSSOS2', 'USTER_NEPS_2',
+                     'RKM_VALOR', 'RKM_CV', 'RKM_ALONG_VALOR', 'RKM_ALONG_CV', 'TORCAO_TPI_VALOR',
+                     'TORCAO_TPI_VALOR_S', 'USTER_PILOSIDADE', 'USTER_PILOSIDADE_CV', 'USTER_NEPS_3'):
+            row[name] = round(rnd.uniform(1, 30), 2)
+        row.update(TIPO_TORCAO='Z', TIPO_TORCAO_S='S')
+        rows.append(row)
+    return rows
+
+
+def order_rows(codigo, lote, tipo):
+    """Linhas de Inq_Exist_Lote_Enc2: clientes de vários vendedores, parte já entregue"""
+    rnd = _rng('enc', codigo, lote, tipo)
+    rows = []
+    for i in range(rnd.randint(2, 12)):
+        vendedor = rnd.randint(1, 40)
+        cliente = f"{vendedor:02d}{rnd.randrange(CLIENTS):04d}"
+        pedida = round(rnd.uniform(50, 800), 2)
+        entregue = round(pedida * rnd.choice((0, 0, 0.25, 0.5, 1)), 2)
+        data = BASE_DATE + timedelta(days=rnd.randint(0, 365))
+        rows.append({
+            'RDATA': data, 'RDATAENT': data + timedelta(days=rnd.randint(7, 60)),
+            'RQUANT1': pedida, 'RQUANT2': entregue, 'RQTENC': round(pedida - entregue, 2),
+            'RPRECO_UN': round(rnd.uniform(3, 9), 2), 'RCODIGO': codigo, 'RLOTE': lote,
+            'RTERCEIRO': cliente, 'RNOMETERC': client_name(cliente), 'VENDEDOR': vendedor,
+            'RSERIE': tipo, 'RNUMERO': 1000 + i, 'RLINHA': i + 1, 'RARMAZEM': 3 + i % 2,
+            'RSITUACAO': 'PENDENTE' if entregue < pedida else 'SATISFEITA', 'RORDEMSITUA': i % 3,
+            'DESCRICAO': f"ARTIGO {codigo}"
+        })
+    return rows
+
+
+def client_name(cliente):
+    return f"CLIENTE {cliente} LDA"
+
+
+def mapa_bordo(cliente, vendedor=1):
+    rnd = _rng('mapa', cliente)
+    row = {'R_CLIENTE': cliente, 'R_NOME': client_name(cliente), 'R_DATA': BASE_DATE,
+           'R_DATA_CORT': None, 'R_VENDEDOR': vendedor}
+    for name in ('R_PLAFOND', 'R_PLAFOND_EXT', 'R_PLAFOND_RESP', 'R_OBJ_VENDAS', 'R_PERC_OBJ', 'R_CREDITO_CORT',
+                 'R_VAL_LETRAS', 'R_VAL_CC', 'R_VAL_FACTORING', 'R_VAL_PREDATA', 'R_VAL_ENCOM', 'R_VENDAS_ACTUAL',
+                 'R_VENDAS_ANT', 'R_PLAFOND_OCDE'):
+        row[name] = round(rnd.uniform(0, 50000), 2)
+    return [row]
+
+
+def _vendor_param(params):
+    return next((param for param in params if isinstance(param, int)), None)
+
+
+def locais_entrega(sql, params):
+    vendedor = _vendor_param(params)
+    if vendedor is not None:
+        clientes = portfolio(vendedor)
+    elif params:
+        clientes = [str(params[0]).strip()]
+    else:
+        clientes = [cliente for vendedor in range(1, 21) for cliente in portfolio(vendedor)]
+    return [{'CLIENTE': cliente, 'NOME1': client_name(cliente), 'ZONA': 'NORTE', 'TELEFONE1': '220000000',
+             'EMAIL': f"{cliente}@example.com"} for cliente in clientes]
+
+
+def utiliza_web(sql, params):
+    utilizador = str(params[0]) if params else 'U01'
+    digits = ''.join(ch for ch in utilizador if ch.isdigit()) or '1'
+    return [{'UTILIZADOR': utilizador, 'SENHA': params[1] if len(params) > 1 else '',
+             'VENDEDOR': int(digits), 'NIVEL': 0}]
+
+
+def _filter_lot(rows, sql, params):
+    if re.search(r'\bWHERE\s+RLote\s*=\s*\?', sql, re.I) and params:
+        return [row for row in rows if row['RLOTE'] == str(params[-1])]
+    return rows
+
+
+# Primeiro procedimento/tabela no FROM -> linhas como dicionários (nome da coluna em maiúsculas)
+HANDLERS = {
+    'inq_exist_lote_pda': lambda sql, params: article_rows(str(params[-1]) if params else ''),
+    'inq_exist_lote_pda_2': lambda sql, params: _filter_lot(lot_rows(str(params[0])), sql, params),
+    'inq_exist_lote_enc2': lambda sql, params: order_rows(str(params[0]), str(params[1]),
+                                                           'O' if "'O'" in sql else 'E'),
+    'busca_mapabordo_cli': lambda sql, params: mapa_bordo(str(params[0]).strip()),
+    'ficha_lab_lote': lambda sql, params: lab_rows(str(params[0])),
+    'locais_entrega': locais_entrega,
+    'rel_cli_vend2': locais_entrega,
+    'utiliza_web': utiliza_web,
+    'parametros_gc': lambda sql, params: [{'VALOR': 'NORMAL'}],
+    'lotes': lambda sql, params: [{'LOTE': params[0] if params else ''}],
+}
+
+
+# --- Conversão da lista de colunas do SELECT --------------------------------
+
+_FROM = re.compile(r'\bFROM\s+([A-Za-z0-9_$]+)', re.I)
+_TOP_FROM = re.compile(r'\s+FROM\s', re.I)
+_SELECT = re.compile(r'^\s*SELECT\s+(?:FIRST\s+\d+\s+)?(?:SKIP\s+\d+\s+)?(?:DISTINCT\s+)?', re.I)
+
+
+def split_columns(sql):
+    """Nomes (alias ou último identificador) das colunas do SELECT de topo"""
+    body = _SELECT.sub('', sql, count=1)
+    columns, depth, current = [], 0, ''
+    for index, char in enumerate(body):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if depth == 0 and char.isspace() and _TOP_FROM.match(body, index):
+            break
+        if char == ',' and depth == 0:
+            columns.append(current)
+            current = ''
+        else:
+            current += char
+    columns.append(current)
+
+    names = []
+    for column in columns:
+        column = ' '.join(column.split())
+        alias = re.search(r'\s+AS\s+([A-Za-z0-9_$]+)$', column, re.I)
+        if alias:
+            names.append(alias.group(1).upper())
+        elif '(' in column:
+            names.append(column.upper())
+        else:
+            names.append(column.split('.')[-1].upper())
+    return names
+
+
+def guess_value(name, rnd):
+    """Valor plausível para uma coluna sem dados sintéticos próprios"""
+    if name == '*':
+        return None
+    if name.startswith('COUNT') or name.startswith('GEN_ID'):
+        return 0
+    if 'DATA' in name or name.startswith('DT_') or name.startswith('DT'):
+        return BASE_DATE + timedelta(days=rnd.randint(0, 365))
+    if any(part in name for part in ('NOME', 'DESC', 'OBS', 'MORADA', 'SIGLA', 'MOEDA', 'COND', 'SITUA', 'TIPO',
+                                     'CODIGO', 'LOTE', 'CLIENTE', 'UTILIZADOR', 'SENHA', 'ESTADO', 'EMAIL', 'ZONA',
+                                     'TELEFONE', 'JSON')):
+        return f"{name.title()} {rnd.randint(1, 999)}"
+    return round(rnd.uniform(1, 1000), 2)
+
+
+def project(rows, names, sql, params):
+    rnd = _rng(sql, params)
+    return [tuple(row[name] if name in row else guess_value(name, rnd) for name in names) for row in rows]
+
+
+# --- API do fdb usada pela aplicação ----------------------------------------
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._rows = []
+        self.rowcount = -1
+
+    def execute(self, sql, params=()):
+        if self.connection.closed:
+            raise DatabaseError('Ligação fechada')
+        params = tuple(params or ())
+        match = _FROM.search(sql)
+        source = match.group(1).lower() if match else ''
+
+        latency = LATENCY_MS.get(source, LATENCY_MS.get('*', 0)) / 1000
+        if latency:
+            time.sleep(latency * random.uniform(1 - JITTER, 1 + JITTER))
+
+        if not sql.lstrip().upper().startswith('SELECT'):
+            self._rows = []
+            self.rowcount = 1
+            return self
+
+        handler = HANDLERS.get(source)
+        rows = handler(sql, params) if handler else [{}]
+        self._rows = project(rows, split_columns(sql), sql, params)
+        self.rowcount = len(self._rows)
+        return self
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        self._rows = []
+
+
+class EventConduit:
+    """Sem alterações: wait() só espera"""
+
+    def __init__(self):
+        self._closed = threading.Event()
+
+    def begin(self):
+        pass
+
+    def wait(self, timeout=None):
+        self._closed.wait(timeout)
+        return {}
+
+    def close(self):
+        self._closed.set()
+
+
+class Connection:
+    def __init__(self):
+        self.attachment_id = next(_attachments)
+        self.closed = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def event_conduit(self, names):
+        return EventConduit()
+
+    def close(self):
+        self.closed = True
+
+
+def connect(**kwargs):
+    time.sleep(LATENCY_MS.get('connect', 20) / 1000)
+    return Connection()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Instalação dos triggers de invalidação de caches
+Cria, para cada tabela vigiada, um generator e um trigger que faz POST_EVENT
+na confirmação das alterações. Depois ativar INVALIDATION_CONFIG['enabled'].
+
+Uso:
+    python3 scripts/install_invalidation_triggers.py            # criar/atualizar triggers
+    python3 scripts/install_invalidation_triggers.py --drop     # remover triggers
+    python3 scripts/install_invalidation_triggers.py --listen   # mostrar eventos recebidos (Ctrl+C para sair)
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import alteracoes_repo
+from app.database.connection import create_connection
+from app.database.repositories.alteracoes import WATCHED_TABLES
+from app.services.invalidation import FdbEventSource, PollingEventSource
+
+
+def listen(use_events: bool):
+    """Mostrar as tabelas alteradas à medida que chegam notificações"""
+    if use_events:
+        source = FdbEventSource(create_connection)
+    else:
+        source = PollingEventSource(alteracoes_repo.get_counters)
+    print(f"A escutar com {type(source).__name__} ({', '.join(WATCHED_TABLES)})")
+    try:
+        while True:
+            for table in source.wait(5):
+                print(f"✓ {table} alterada")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Triggers de invalidação de caches')
+    parser.add_argument('--drop', action='store_true', help='Remover os triggers')
+    parser.add_argument('--listen', action='store_true', help='Escutar notificações')
+    parser.add_argument('--polling', action='store_true', help='Com --listen, usar contadores em vez de eventos')
+    args = parser.parse_args()
+
+    if args.listen:
+        listen(not args.polling)
+        return 0
+
+    if args.drop:
+        alteracoes_repo.drop_schema()
+        print("✓ Triggers de invalidação removidos")
+        return 0
+
+    alteracoes_repo.create_schema()
+    print(f"✓ Triggers criados para: {', '.join(WATCHED_TABLES)}")
+    print(f"  Contadores atuais: {alteracoes_repo.get_counters()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
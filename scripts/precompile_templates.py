@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Pré-compilação dos templates Jinja
+Preenche a cache de bytecode (TEMPLATE_CONFIG['bytecode_cache_dir']) com todos
+os templates de templates/, para que nenhum worker tenha de os compilar.
+Correr em cada deploy, depois de atualizar os templates.
+
+Uso:
+    python3 scripts/precompile_templates.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from app.config import TEMPLATE_CONFIG
+from app.utils.templates import configure_templates, precompile_templates
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+
+def main():
+    if not TEMPLATE_CONFIG.get('bytecode_cache_dir'):
+        print("✗ TEMPLATE_CONFIG['bytecode_cache_dir'] não está definido")
+        return 1
+
+    app = Flask(__name__, template_folder=TEMPLATES_DIR)
+    configure_templates(app, dict(TEMPLATE_CONFIG, precompile=False))
+    names = precompile_templates(app.jinja_env)
+    print(f"✓ {len(names)} templates compilados para {TEMPLATE_CONFIG['bytecode_cache_dir']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
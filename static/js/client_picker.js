@@ -0,0 +1,167 @@
+/* Mobile Sales - Client picker */
+/* Virtualized list fed page by page from /api/clientes */
+
+(function () {
+    'use strict';
+
+    const ROW_HEIGHT = 36;
+    const PAGE_SIZE = 100;
+    const SEARCH_DELAY = 250;
+
+    function ClientPicker(root) {
+        this.root = root;
+        this.url = root.dataset.url;
+        this.ambito = root.dataset.ambito || '';
+        this.rows = parseInt(root.dataset.rows || '6', 10);
+        this.hidden = root.querySelector('input[type="hidden"]');
+        this.search = root.querySelector('.client-picker-search');
+        this.viewport = root.querySelector('.client-picker-viewport');
+        this.spacer = root.querySelector('.client-picker-spacer');
+        this.list = root.querySelector('.client-picker-rows');
+        this.status = root.querySelector('.client-picker-status');
+
+        this.query = '';
+        this.total = 0;
+        this.items = [];        // sparse array indexed by absolute row
+        this.pending = {};      // page offset -> true while in flight
+        this.generation = 0;    // bumped on every new query to drop stale pages
+        this.timer = null;
+
+        this.viewport.style.height = (this.rows * ROW_HEIGHT) + 'px';
+        this.bind();
+        this.updateValidity();
+        this.reset('');
+    }
+
+    ClientPicker.prototype.bind = function () {
+        const self = this;
+
+        this.search.addEventListener('input', function () {
+            if (self.hidden.value) {
+                self.hidden.value = '';
+                self.hidden.dataset.nome = '';
+                self.updateValidity();
+                self.hidden.dispatchEvent(new Event('change', { bubbles: true }));
+            }
+            clearTimeout(self.timer);
+            self.timer = setTimeout(function () {
+                self.reset(self.search.value.trim());
+            }, SEARCH_DELAY);
+        });
+
+        this.viewport.addEventListener('scroll', function () {
+            self.render();
+        });
+
+        this.list.addEventListener('click', function (event) {
+            const row = event.target.closest('.client-picker-row');
+            if (row) {
+                self.select(parseInt(row.dataset.index, 10));
+            }
+        });
+    };
+
+    ClientPicker.prototype.reset = function (query) {
+        this.query = query;
+        this.total = 0;
+        this.items = [];
+        this.pending = {};
+        this.generation += 1;
+        this.viewport.scrollTop = 0;
+        this.fetchPage(0);
+    };
+
+    ClientPicker.prototype.fetchPage = function (offset) {
+        if (this.pending[offset]) {
+            return;
+        }
+        this.pending[offset] = true;
+
+        const self = this;
+        const generation = this.generation;
+        const params = new URLSearchParams({ q: this.query, offset: offset, limit: PAGE_SIZE });
+        if (this.ambito) {
+            params.set('ambito', this.ambito);
+        }
+
+        fetch(this.url + '?' + params.toString(), { credentials: 'same-origin' })
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                if (generation !== self.generation) {
+                    return;
+                }
+                if (data.error) {
+                    self.status.textContent = data.error;
+                    return;
+                }
+                self.total = data.total;
+                data.items.forEach(function (item, i) {
+                    self.items[data.offset + i] = item;
+                });
+                self.spacer.style.height = (self.total * ROW_HEIGHT) + 'px';
+                self.status.textContent = self.total ? '' : 'Nenhum cliente encontrado';
+                self.render();
+            })
+            .catch(function () {
+                if (generation === self.generation) {
+                    delete self.pending[offset];
+                    self.status.textContent = 'Erro ao carregar clientes';
+                }
+            });
+    };
+
+    ClientPicker.prototype.render = function () {
+        const first = Math.floor(this.viewport.scrollTop / ROW_HEIGHT);
+        const last = Math.min(this.total, first + this.rows + 2);
+        const html = [];
+
+        for (let index = first; index < last; index++) {
+            const item = this.items[index];
+            if (!item) {
+                this.fetchPage(Math.floor(index / PAGE_SIZE) * PAGE_SIZE);
+                continue;
+            }
+            const selected = item[0] === this.hidden.value ? ' selected' : '';
+            html.push(
+                '<div class="client-picker-row' + selected + '" data-index="' + index + '"' +
+                ' style="top:' + (index * ROW_HEIGHT) + 'px">' +
+                escapeHtml(item[1]) + ' <small>(' + escapeHtml(item[0]) + ')</small></div>'
+            );
+        }
+
+        this.list.innerHTML = html.join('');
+    };
+
+    ClientPicker.prototype.select = function (index) {
+        const item = this.items[index];
+        if (!item) {
+            return;
+        }
+        this.hidden.value = item[0];
+        this.hidden.dataset.nome = item[1];
+        this.search.value = item[1];
+        this.updateValidity();
+        this.render();
+        this.hidden.dispatchEvent(new Event('change', { bubbles: true }));
+    };
+
+    ClientPicker.prototype.updateValidity = function () {
+        if (this.root.dataset.required === 'true') {
+            this.search.setCustomValidity(this.hidden.value ? '' : 'Selecione um cliente');
+        }
+    };
+
+    function escapeHtml(value) {
+        return String(value == null ? '' : value)
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;');
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('.client-picker').forEach(function (root) {
+            root.clientPicker = new ClientPicker(root);
+        });
+    });
+})();
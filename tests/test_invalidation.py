@@ -0,0 +1,81 @@
+"""
+Invalidation bus wiring: a table change published through FakeEventSource
+clears the caches subscribed in app.services
+"""
+
+import time
+
+import pytest
+
+from app.services import invalidation_bus, client_list_service, access_service, fragment_cache
+from app.services.invalidation import FakeEventSource, InvalidationBus, PollingEventSource
+from app.utils.cache import TTLCache
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def fake_source(monkeypatch):
+    source = FakeEventSource()
+    monkeypatch.setattr(invalidation_bus, 'source_factories', [lambda: source])
+    monkeypatch.setattr(invalidation_bus, 'poll_interval', 0.05)
+    invalidation_bus.start()
+    yield source
+    invalidation_bus.stop()
+
+
+def test_client_tables_clear_client_and_scope_caches(fake_source):
+    client_list_service.cache.set('*', 'lista')
+    access_service.cache.set(5, 'ambito')
+
+    fake_source.fire('Rel_Cli_Vend2')
+
+    assert wait_until(lambda: client_list_service.cache.get('*') is None)
+    assert wait_until(lambda: access_service.cache.get(5) is None)
+
+
+def test_lot_tables_clear_only_lot_fragments(fake_source):
+    fragment_cache.cache.set(('detalhes_lote', 'A', 'L1'), ('<div></div>', 'etag'))
+    fragment_cache.cache.set(('outro', 'A'), ('<p></p>', 'etag'))
+
+    fake_source.fire('Lotes')
+
+    assert wait_until(lambda: fragment_cache.cache.get(('detalhes_lote', 'A', 'L1')) is None)
+    assert fragment_cache.cache.get(('outro', 'A')) == ('<p></p>', 'etag')
+
+
+def test_unwatched_table_leaves_caches_alone():
+    cache = TTLCache('test', ttl=60)
+    cache.set('chave', 'valor')
+    source = FakeEventSource()
+    bus = InvalidationBus([lambda: source], poll_interval=0.05)
+    bus.subscribe('Artigos', lambda table: cache.invalidate())
+    bus.start()
+    try:
+        source.fire('Clientes')
+        time.sleep(0.2)
+        assert cache.get('chave') == 'valor'
+
+        source.fire('Artigos')
+        assert wait_until(lambda: cache.get('chave') is None)
+    finally:
+        bus.stop()
+
+
+def test_stop_interrupts_polling_wait():
+    bus = InvalidationBus([lambda: PollingEventSource(lambda: {}, stop=bus.stopping)], poll_interval=10)
+    bus.start()
+    time.sleep(0.1)
+    thread = bus._thread
+
+    started = time.monotonic()
+    bus.stop()
+    assert time.monotonic() - started < 1
+    assert not thread.is_alive()
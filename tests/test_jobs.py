@@ -0,0 +1,69 @@
+"""
+JobQueue claims and leases (worker threads are not started)
+"""
+
+from app.services.jobs import JobQueue, RUNNING, DONE, FAILED
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = JobQueue(db_path=str(tmp_path / 'jobs.sqlite3'), **kwargs)
+    queue.register('noop', lambda payload: payload)
+    queue.start = lambda: None
+    return queue
+
+
+def age_claim(queue, job_id, seconds):
+    conn = queue._connect()
+    try:
+        conn.execute("UPDATE jobs SET claimed_at = claimed_at - ? WHERE id = ?", (seconds, job_id))
+    finally:
+        conn.close()
+
+
+def test_claim_marks_job_running_once(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue('noop', {'n': 1})
+
+    assert queue._claim()['id'] == job_id
+    assert queue.get_status(job_id)['status'] == RUNNING
+    assert queue._claim() is None
+
+
+def test_expired_lease_requeues_job(tmp_path):
+    queue = make_queue(tmp_path, lease=60)
+    job_id = queue.enqueue('noop', {'n': 1})
+    queue._claim()
+
+    # Still within the lease: nobody else may take it
+    assert queue._claim() is None
+
+    age_claim(queue, job_id, 120)
+    row = queue._claim()
+    assert row['id'] == job_id
+    status = queue.get_status(job_id)
+    assert status['status'] == RUNNING
+    assert status['attempts'] == 2
+
+
+def test_expired_lease_fails_job_after_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, lease=60, max_attempts=1)
+    job_id = queue.enqueue('noop', {'n': 1})
+    queue._claim()
+
+    age_claim(queue, job_id, 120)
+    assert queue._claim() is None
+    status = queue.get_status(job_id)
+    assert status['status'] == FAILED
+    assert status['error'] == 'Lease expired'
+
+
+def test_finished_job_is_not_reclaimed(tmp_path):
+    queue = make_queue(tmp_path, lease=60)
+    job_id = queue.enqueue('noop', {'n': 1})
+    queue._run(queue._claim())
+
+    age_claim(queue, job_id, 120)
+    assert queue._claim() is None
+    status = queue.get_status(job_id)
+    assert status['status'] == DONE
+    assert status['result'] == {'n': 1}
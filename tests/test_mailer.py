@@ -0,0 +1,86 @@
+"""
+send_email against a local SMTP stand-in (no real mail server needed)
+"""
+
+import email
+import socketserver
+import threading
+
+import pytest
+
+from app.config import SMTP_CONFIG
+from app.services.mailer import send_email
+
+
+class SmtpStandIn(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts one or more messages and keeps them in server.messages"""
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply('220 localhost stand-in')
+        envelope = {}
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                envelope = {'from': line.split(':', 1)[1].strip(), 'to': []}
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                envelope['to'].append(line.split(':', 1)[1].strip())
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b'.\r\n', b''):
+                        break
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                envelope['data'] = b''.join(lines)
+                self.server.messages.append(envelope)
+                self.reply('250 OK queued')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SmtpStandIn)
+    server.daemon_threads = True
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setitem(SMTP_CONFIG, 'host', '127.0.0.1')
+    monkeypatch.setitem(SMTP_CONFIG, 'port', server.server_address[1])
+    monkeypatch.setitem(SMTP_CONFIG, 'use_tls', False)
+    monkeypatch.setitem(SMTP_CONFIG, 'user', '')
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_send_email_delivers_message_with_attachment(smtp_server):
+    send_email('cliente@example.com', 'Resultados laboratoriais', 'Segue em anexo.',
+               attachments=[('lab_data_A_L1.pdf', b'%PDF-1.4 stand-in', 'application/pdf')])
+
+    assert len(smtp_server.messages) == 1
+    envelope = smtp_server.messages[0]
+    assert envelope['to'] == ['<cliente@example.com>']
+
+    message = email.message_from_bytes(envelope['data'])
+    assert message['To'] == 'cliente@example.com'
+    assert message['Subject'] == 'Resultados laboratoriais'
+    attachments = [part for part in message.walk() if part.get_filename()]
+    assert [part.get_filename() for part in attachments] == ['lab_data_A_L1.pdf']
+    assert attachments[0].get_payload(decode=True) == b'%PDF-1.4 stand-in'